@@ -0,0 +1,48 @@
+import time
+
+from ewvmapi.batch import run_batch
+from ewvmapi.ewvm_api import EWVMClient
+from ewvmapi.local_server import LocalEWVMServer
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+PROGRAMS = 200
+LATENCY = 0.02
+
+
+def main():
+    parser = ForthParser(ForthLex().build())
+    programs = [
+        "\n".join(EWVMTranslator([]).translate(parser.parse(f"{n} 0 DO I . LOOP")))
+        for n in range(PROGRAMS)
+    ]
+
+    with LocalEWVMServer(latency=LATENCY) as server:
+        with EWVMClient(server.url) as client:
+            start = time.perf_counter()
+            for code in programs:
+                client.run_code(code)
+            sequential = time.perf_counter() - start
+
+        print(f"{PROGRAMS} programs, {LATENCY * 1000:.0f} ms injected latency")
+        print(f"{'concurrency':>11} {'time (s)':>9} {'programs/s':>11} {'speedup':>8}")
+        print(
+            f"{'sequential':>11} {sequential:>9.3f} "
+            f"{PROGRAMS / sequential:>11.1f} {1:>7.1f}x"
+        )
+        for concurrency in (2, 4, 8, 16, 32):
+            start = time.perf_counter()
+            results = list(
+                run_batch(programs, concurrency=concurrency, base_url=server.url)
+            )
+            elapsed = time.perf_counter() - start
+            assert all(result.ok for result in results)
+            print(
+                f"{concurrency:>11} {elapsed:>9.3f} "
+                f"{PROGRAMS / elapsed:>11.1f} {sequential / elapsed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
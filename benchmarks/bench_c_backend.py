@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from ewvmapi.vm import EWVM
+from forthpiler.c_translator import CBackend
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+PROGRAMS = {
+    "sum loop": "0 100000 0 DO I + LOOP .",
+    "nested loops": "0 300 0 DO 300 0 DO I J * + LOOP LOOP .",
+    "collatz": """
+        variable steps
+        : collatz BEGIN DUP 2 MOD IF 3 * 1 + ELSE 2 / THEN
+                  steps @ 1 + steps ! DUP 1 = UNTIL ;
+        0 steps ! 2000 1 DO I collatz drop LOOP steps @ .
+    """,
+}
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    if shutil.which("cc") is None:
+        print("No C compiler available")
+        return
+
+    parser = ForthParser(ForthLex().build())
+    cache_dir = Path(tempfile.mkdtemp())
+    backend = CBackend([], cache_dir=cache_dir)
+
+    print(
+        f"{'program':<14} {'ewvm (s)':>10} {'cc build (s)':>13} "
+        f"{'native (s)':>11} {'speedup':>8}"
+    )
+    for name, code in PROGRAMS.items():
+        result = parser.parse(code)
+        ewvm = "\n".join(EWVMTranslator([]).translate(result))
+
+        expected, vm_time = timed(lambda: EWVM(ewvm).run())
+        _, build_time = timed(lambda: backend.build(result))
+        output, native_time = timed(lambda: backend.run(result))
+        assert output == expected, name
+
+        print(
+            f"{name:<14} {vm_time:>10.4f} {build_time:>13.4f} "
+            f"{native_time:>11.4f} {vm_time / native_time:>7.1f}x"
+        )
+
+    shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
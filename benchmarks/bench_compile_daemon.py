@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from forthpiler.client import CompileClient
+
+SPAWNED_REQUESTS = 20
+CONNECTED_REQUESTS = 2000
+PROGRAM = ": sq dup * ; 10 0 DO I sq . LOOP 2 spaces"
+
+
+def wait_for_daemon(socket: Path) -> None:
+    for _ in range(200):
+        if socket.exists():
+            return
+        time.sleep(0.05)
+    raise RuntimeError("The compile daemon did not start")
+
+
+def requests_per_second(function, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        function()
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        source, socket = directory / "program.fs", directory / "forthpiler.sock"
+        source.write_text(PROGRAM)
+        env = {**os.environ, "FORTHPILER_CACHE_DIR": str(directory / "cache")}
+
+        def spawn(*command):
+            subprocess.run(
+                [sys.executable, "-m", *command],
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+
+        cli = requests_per_second(
+            lambda: spawn("forthpiler", "compile", "-q", str(source)), SPAWNED_REQUESTS
+        )
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "forthpiler", "daemon", "--socket", str(socket)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_daemon(socket)
+            thin_client = requests_per_second(
+                lambda: spawn(
+                    "forthpiler.client", "--socket", str(socket), str(source)
+                ),
+                SPAWNED_REQUESTS,
+            )
+            with CompileClient(socket) as client:
+                connected = requests_per_second(
+                    lambda: client.compile(source, source.with_suffix(".ewvm")),
+                    CONNECTED_REQUESTS,
+                )
+                client.request("shutdown")
+        finally:
+            daemon.wait(timeout=10)
+
+    print(f"{'compile requests through':>32} {'req/s':>8} {'speedup':>8}")
+    for name, rate in (
+        ("python -m forthpiler compile", cli),
+        ("python -m forthpiler.client", thin_client),
+        ("an open client connection", connected),
+    ):
+        print(f"{name:>32} {rate:>8.1f} {rate / cli:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
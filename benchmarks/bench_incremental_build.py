@@ -0,0 +1,49 @@
+import tempfile
+import time
+from pathlib import Path
+
+from forthpiler.build import IncrementalBuild
+from forthpiler.compiler import find_sources
+
+FILES = 500
+WORDS_PER_FILE = 30
+
+
+def write_corpus(directory: Path) -> None:
+    for n in range(FILES):
+        words = " ".join(f": w{i} {i} dup * . ;" for i in range(WORDS_PER_FILE))
+        calls = " ".join(f"w{i}" for i in range(WORDS_PER_FILE))
+        (directory / f"file{n}.fs").write_text(f"{words}\n{calls} 2 spaces")
+
+
+def timed_build(directory: Path, build_dir: Path) -> float:
+    start = time.perf_counter()
+    report = IncrementalBuild(build_dir).run(find_sources([directory]))
+    elapsed = time.perf_counter() - start
+    assert not report.failed
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        sources, build_dir = Path(root) / "src", Path(root) / "build"
+        sources.mkdir()
+        write_corpus(sources)
+
+        full = timed_build(sources, build_dir)
+        no_op = timed_build(sources, build_dir)
+        (sources / "file0.fs").write_text(": w0 42 . ; w0")
+        one_changed = timed_build(sources, build_dir)
+
+    print(f"{FILES} files, {WORDS_PER_FILE} words each")
+    print(f"{'build':>12} {'time (s)':>9} {'speedup':>8}")
+    for name, elapsed in (
+        ("full", full),
+        ("no-op", no_op),
+        ("one changed", one_changed),
+    ):
+        print(f"{name:>12} {elapsed:>9.3f} {full / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
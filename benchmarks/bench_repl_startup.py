@@ -0,0 +1,52 @@
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 5
+
+# Stands in for the REPL without prompt_toolkit, which costs the same to
+# import either way. "blocking" builds everything before the first prompt,
+# like the REPL used to, "warmup" shows the prompt right away
+REPL = """
+import sys
+from forthpiler.warmup import Warmup
+
+warmup = Warmup(sys.argv[2])
+if sys.argv[1] == "blocking":
+    warmup.session
+print("prompt", flush=True)
+print(warmup.session.run(warmup.parser.parse("1 2 + .")), flush=True)
+"""
+
+
+def startup(mode: str, module_cache: str) -> tuple[float, float]:
+    start = time.perf_counter()
+    repl = subprocess.Popen(
+        [sys.executable, "-c", REPL, mode, module_cache],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert repl.stdout.readline() == "prompt\n"
+    first_prompt = time.perf_counter() - start
+    assert repl.stdout.readline() == "3\n"
+    first_result = time.perf_counter() - start
+    repl.wait()
+    return first_prompt, first_result
+
+
+def main():
+    print(f"{'startup':>9} {'first prompt (ms)':>18} {'first result (ms)':>18}")
+    with tempfile.TemporaryDirectory() as module_cache:
+        for mode in ("blocking", "warmup"):
+            times = [startup(mode, module_cache) for _ in range(RUNS)]
+            first_prompt = statistics.median(prompt for prompt, _ in times)
+            first_result = statistics.median(result for _, result in times)
+            print(
+                f"{mode:>9} {first_prompt * 1000:>18.1f} {first_result * 1000:>18.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
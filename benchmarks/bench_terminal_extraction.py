@@ -0,0 +1,50 @@
+import time
+
+from bs4 import BeautifulSoup
+
+from ewvmapi.terminal import extract_terminal
+
+ROUNDS = 3
+
+
+def page_of(size: int) -> str:
+    line = "<span>1 2 3 &amp; 4 &lt;5&gt;</span><br>\n"
+    lines = "".join(line for _ in range(size // len(line)))
+    return (
+        "<html><head><script>var state = {};</script></head><body>"
+        f'<nav>{"<a href=#>link</a>" * 100}</nav>'
+        f'<div class="terminal">{lines}</div>'
+        "</body></html>"
+    )
+
+
+def beautifulsoup_extract(page: str) -> str:
+    html = BeautifulSoup(page, "html.parser")
+    return "".join(element.text for element in html.find_all(class_="terminal"))
+
+
+def best_of(function, page: str) -> float:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(page)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'page (KiB)':>10} {'bs4 (ms)':>9} {'single pass (ms)':>17} {'speedup':>8}")
+    for size in (10_000, 100_000, 1_000_000, 2_000_000):
+        page = page_of(size)
+        assert extract_terminal(page) == beautifulsoup_extract(page)
+
+        soup = best_of(beautifulsoup_extract, page)
+        single_pass = best_of(extract_terminal, page)
+        print(
+            f"{len(page) / 1024:>10.0f} {soup * 1000:>9.1f} "
+            f"{single_pass * 1000:>17.1f} {soup / single_pass:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
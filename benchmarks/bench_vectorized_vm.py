@@ -0,0 +1,46 @@
+import time
+
+from ewvmapi.vectorized_vm import VectorizedEWVM
+from ewvmapi.vm import EWVM, Program
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+PROGRAM = """
+variable steps
+: collatz BEGIN DUP 2 MOD IF 3 * 1 + ELSE 2 / THEN
+          steps @ 1 + steps ! DUP 1 = UNTIL ;
+0 steps ! collatz drop steps @ .
+"""
+
+
+def bench_scalar(program: Program, initial_stacks) -> float:
+    start = time.perf_counter()
+    for initial in initial_stacks:
+        EWVM(program).run(initial)
+    return time.perf_counter() - start
+
+
+def bench_vectorized(program: Program, initial_stacks) -> float:
+    start = time.perf_counter()
+    VectorizedEWVM(program).run(initial_stacks)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = ForthParser(ForthLex().build())
+    program = Program("\n".join(EWVMTranslator([]).translate(parser.parse(PROGRAM))))
+
+    print(f"{'inputs':>8} {'scalar (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for batch_size in (10, 100, 1000, 10000):
+        initial_stacks = [[n] for n in range(2, batch_size + 2)]
+        scalar = bench_scalar(program, initial_stacks)
+        vectorized = bench_vectorized(program, initial_stacks)
+        print(
+            f"{batch_size:>8} {scalar:>12.4f} {vectorized:>15.4f} "
+            f"{scalar / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import io
+import time
+import tracemalloc
+
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+from forthpiler.visualizer import DotWriter, GraphvizTranslator
+
+WORDS = (100, 1_000, 10_000)
+
+
+def program(words: int) -> str:
+    # Many words sharing a handful of bodies, each with a long arithmetic run
+    return "\n".join(
+        f": w{i} {i % 7} 0 do i 1 2 3 4 5 6 7 8 + + + + + + + . loop ;"
+        for i in range(words)
+    )
+
+
+def measure(draw) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    draw()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = ForthParser(ForthLex().build())
+    print(f"{'words':>6} {'drawer':>9} {'nodes':>7} {'time (s)':>9} {'peak (MB)':>10}")
+    for words in WORDS:
+        tree = parser.parse(program(words))
+
+        graphviz = GraphvizTranslator()
+        elapsed, peak = measure(
+            lambda: graphviz.translate(tree) and graphviz.graph.source
+        )
+        print(
+            f"{words:>6} {'graphviz':>9} {graphviz.current_id:>7} "
+            f"{elapsed:>9.3f} {peak / 1e6:>10.1f}"
+        )
+
+        writer = DotWriter(io.StringIO())
+        elapsed, peak = measure(lambda: writer.translate(tree))
+        print(
+            f"{words:>6} {'dot':>9} {writer.nodes:>7} "
+            f"{elapsed:>9.3f} {peak / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import time
+
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+WORDS = 10_000
+
+
+def dictionary_source() -> str:
+    # Every word uses the word at half its index, so the dictionary is a
+    # binary tree and the users of a word are the subtree below it
+    words = [": w0 1 ;"]
+    words += [f": w{i} w{(i - 1) // 2} {i} + ;" for i in range(1, WORDS)]
+    return "\n".join(words)
+
+
+def main():
+    parser = ForthParser(ForthLex().build())
+    dictionary = parser.parse(dictionary_source())
+
+    start = time.perf_counter()
+    translator = EWVMTranslator([], redefinable=True)
+    translator.translate(dictionary)
+    full = time.perf_counter() - start
+
+    print(f"{WORDS} words, translated from scratch in {full * 1000:.1f} ms")
+    print(f"{'word':>6} {'users':>6} {'time (ms)':>10} {'speedup':>8}")
+    for name in (f"w{WORDS - 1}", f"w{WORDS // 2}", "w100", "w10", "w0"):
+        users = len(translator.who_uses(name, transitive=True))
+        redefinition = parser.parse(f": {name} 2 ;")
+
+        start = time.perf_counter()
+        translator.translate(redefinition)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>6} {users:>6} {elapsed * 1000:>10.2f} {full / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from typing import Callable, Dict
+
+# Synthetic Forth programs, sized so a scale of 1 takes a fraction of a
+# second per phase. Every program translates and runs without errors.
+
+
+def arithmetic_chain(scale: float = 1.0) -> str:
+    # Parsing is superlinear in the number of expressions, so longer chains
+    # quickly take minutes
+    length = int(2_500 * scale)
+    return "1 " + "2 + 3 * 7 MOD " * length + ".\n"
+
+
+def deep_nesting(scale: float = 1.0) -> str:
+    # The translators recurse once per level, so the depth stays bounded and
+    # the size comes from repeating the nest
+    depth = 60
+    nest = "1 IF " * depth + "7 ." + " THEN" * depth
+    return "\n".join(nest for _ in range(max(1, int(40 * scale)))) + "\n"
+
+
+def many_words(scale: float = 1.0) -> str:
+    words = int(2_000 * scale)
+    definitions = "\n".join(f": w{i} {i} + DUP 2 * SWAP DROP ;" for i in range(words))
+    calls = " ".join(f"w{i}" for i in range(words))
+    return f"{definitions}\n0 {calls} .\n"
+
+
+def heavy_loops(scale: float = 1.0) -> str:
+    iterations = int(200 * scale**0.5)
+    return (
+        "VARIABLE acc 0 acc !\n"
+        f"{iterations} 0 DO {iterations} 0 DO I J + acc @ + acc ! LOOP LOOP\n"
+        "acc @ .\n"
+    )
+
+
+def string_output(scale: float = 1.0) -> str:
+    lines = int(5_000 * scale)
+    return '." The quick brown fox jumps over the lazy dog " CR\n' * lines
+
+
+GENERATORS: Dict[str, Callable[[float], str]] = {
+    "arithmetic_chain": arithmetic_chain,
+    "deep_nesting": deep_nesting,
+    "many_words": many_words,
+    "heavy_loops": heavy_loops,
+    "string_output": string_output,
+}
@@ -0,0 +1,286 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from benchmarks.generators import GENERATORS
+from benchmarks.suite import PHASES, BenchmarkResult, format_result, run_suite
+
+BASELINE_FORMAT = 1
+# One baseline per environment fingerprint, since timings only mean
+# something on the machine and interpreter that took them
+BASELINES = Path(__file__).parent / "baselines"
+# Phases whose slowdowns fail the comparison, the others are only reported
+GATED_PHASES = ("parse", "translate", "run")
+
+
+def environment_fingerprint() -> dict:
+    # Timings are only comparable between runs with the same fingerprint
+    environment = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "ply": metadata.version("ply"),
+    }
+    encoded = json.dumps(environment, sort_keys=True).encode()
+    environment["id"] = hashlib.sha256(encoded).hexdigest()[:16]
+    return environment
+
+
+def baseline_path(environment: dict) -> Path:
+    return BASELINES / f"{environment['id']}.json"
+
+
+@dataclass
+class BaselineEntry:
+    median: float
+    variance: float
+    samples: int
+    throughput: float
+    unit: str
+
+    @staticmethod
+    def of(result: BenchmarkResult) -> "BaselineEntry":
+        variance = statistics.variance(result.times) if len(result.times) > 1 else 0
+        return BaselineEntry(
+            result.median,
+            variance,
+            len(result.times),
+            result.throughput,
+            result.unit,
+        )
+
+
+class Baseline:
+    def __init__(
+        self, entries: Dict[str, BaselineEntry], environment: dict, scale: float
+    ):
+        self.entries = entries
+        self.environment = environment
+        self.scale = scale
+
+    @staticmethod
+    def of(results: List[BenchmarkResult]) -> "Baseline":
+        return Baseline(
+            {result.name: BaselineEntry.of(result) for result in results},
+            environment_fingerprint(),
+            results[0].scale if results else 1.0,
+        )
+
+    @staticmethod
+    def load(path: Path) -> "Baseline":
+        document = json.loads(path.read_text())
+        if document.get("format") != BASELINE_FORMAT:
+            raise ValueError(f"'{path}' was written by another version")
+        return Baseline(
+            {
+                name: BaselineEntry(**entry)
+                for name, entry in document["benchmarks"].items()
+            },
+            document["environment"],
+            document["scale"],
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "format": BASELINE_FORMAT,
+            "environment": self.environment,
+            "scale": self.scale,
+            "benchmarks": {
+                name: vars(entry) for name, entry in sorted(self.entries.items())
+            },
+        }
+        path.write_text(json.dumps(document, indent=2) + "\n")
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[BaselineEntry]
+    current: Optional[BaselineEntry]
+    status: str
+
+    @property
+    def change(self) -> Optional[float]:
+        if self.baseline is None or self.current is None:
+            return None
+        return self.current.median / self.baseline.median - 1
+
+
+def compare(
+    baseline: Baseline,
+    current: Baseline,
+    threshold: float = 0.20,
+    sigmas: float = 3.0,
+    min_difference: float = 0.001,
+    gated_phases: Sequence[str] = GATED_PHASES,
+) -> List[Comparison]:
+    # A benchmark regressed when its median got slower by more than the
+    # threshold, by more than `sigmas` standard deviations of the difference
+    # and by more than `min_difference` seconds, so noisy and very short
+    # benchmarks need a larger slowdown to fail
+    comparisons = []
+    for name in sorted(baseline.entries.keys() | current.entries.keys()):
+        old, new = baseline.entries.get(name), current.entries.get(name)
+        if old is None:
+            status = "new"
+        elif new is None:
+            status = "missing"
+        else:
+            difference = new.median - old.median
+            noise = sigmas * math.sqrt(
+                old.variance / old.samples + new.variance / new.samples
+            )
+            significant = abs(difference) > max(
+                threshold * old.median, noise, min_difference
+            )
+            if not significant:
+                status = "ok"
+            elif difference < 0:
+                status = "faster"
+            elif name.split("/")[0] in gated_phases:
+                status = "REGRESSION"
+            else:
+                status = "slower"
+        comparisons.append(Comparison(name, old, new, status))
+    return comparisons
+
+
+def format_report(
+    comparisons: List[Comparison], baseline: Baseline, current: Baseline
+) -> str:
+    lines = []
+    if baseline.environment.get("id") != current.environment.get("id"):
+        changed = [
+            f"{key} {baseline.environment.get(key)} -> {value}"
+            for key, value in current.environment.items()
+            if key != "id" and baseline.environment.get(key) != value
+        ]
+        lines.append(
+            "warning: the baseline was recorded in another environment "
+            f"({', '.join(changed)}), timings may not be comparable"
+        )
+    if baseline.scale != current.scale:
+        lines.append(
+            f"warning: the baseline was recorded at scale {baseline.scale}, "
+            f"this run used {current.scale}"
+        )
+
+    lines.append(
+        f"{'benchmark':<28} {'baseline (ms)':>13} {'current (ms)':>13} "
+        f"{'change':>8}  status"
+    )
+    for comparison in comparisons:
+        old = f"{comparison.baseline.median * 1000:.2f}" if comparison.baseline else "-"
+        new = f"{comparison.current.median * 1000:.2f}" if comparison.current else "-"
+        change = comparison.change
+        change_text = "-" if change is None else f"{change:+.1%}"
+        lines.append(
+            f"{comparison.name:<28} {old:>13} {new:>13} "
+            f"{change_text:>8}  {comparison.status}"
+        )
+
+    regressions = [c for c in comparisons if c.status == "REGRESSION"]
+    lines.append(
+        f"{len(regressions)} regressions in {', '.join(GATED_PHASES)}"
+        if regressions
+        else "No regressions"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.regression",
+        description="Record benchmark baselines and compare new runs against them",
+    )
+    parser.add_argument("command", choices=("record", "compare"))
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="baseline file, the one of this environment by default",
+    )
+    parser.add_argument("--phase", action="append", choices=PHASES)
+    parser.add_argument("--program", action="append", choices=list(GENERATORS))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="smallest relative slowdown that counts, 0.20 by default",
+    )
+    parser.add_argument(
+        "--sigmas",
+        type=float,
+        default=3.0,
+        help="how many standard deviations a slowdown has to exceed",
+    )
+    parser.add_argument(
+        "--min-difference",
+        type=float,
+        default=0.001,
+        help="smallest slowdown in seconds that counts",
+    )
+    args = parser.parse_args(argv)
+    args.baseline = args.baseline or baseline_path(environment_fingerprint())
+
+    # Without a baseline no slowdown could ever fail the comparison
+    if args.command == "compare" and not args.baseline.exists():
+        print(
+            f"No baseline at {args.baseline}, record one for this environment "
+            "with `python -m benchmarks.regression record`",
+            file=sys.stderr,
+        )
+        return 2
+
+    results = run_suite(
+        args.phase or PHASES,
+        args.program,
+        args.scale,
+        args.repeat,
+        lambda result: print(format_result(result), file=sys.stderr, flush=True),
+    )
+    current = Baseline.of(results)
+
+    if args.command == "record":
+        current.save(args.baseline)
+        print(f"{len(results)} benchmarks recorded in {args.baseline}")
+        return 0
+
+    try:
+        baseline = Baseline.load(args.baseline)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Cannot read the baseline: {e}", file=sys.stderr)
+        return 2
+
+    # Benchmarks left out of this run are not reported as missing
+    selected = {
+        f"{phase}/{program}"
+        for phase in args.phase or PHASES
+        for program in args.program or GENERATORS
+    }
+    baseline.entries = {
+        name: entry for name, entry in baseline.entries.items() if name in selected
+    }
+    comparisons = compare(
+        baseline, current, args.threshold, args.sigmas, args.min_difference
+    )
+    print(format_report(comparisons, baseline, current))
+    return 1 if any(c.status == "REGRESSION" for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
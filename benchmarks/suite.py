@@ -0,0 +1,179 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from benchmarks.generators import GENERATORS
+from ewvmapi.vm import EWVM, Program
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+from forthpiler.syntax import AbstractSyntaxTree
+
+PHASES = ("lex", "parse", "translate", "graphviz", "run")
+
+
+@dataclass
+class BenchmarkResult:
+    phase: str
+    program: str
+    scale: float
+    times: List[float]
+    # What one run processes, e.g. 1200 tokens, and peak traced memory
+    items: int
+    unit: str
+    peak_memory: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.phase}/{self.program}"
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.median if self.median else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            **asdict(self),
+            "median": self.median,
+            "throughput": self.throughput,
+        }
+
+
+class Workload:
+    # A generated program and what every phase needs as input, prepared
+    # outside of the measurements
+    def __init__(self, program: str, source: str, parser: ForthParser):
+        self.program = program
+        self.source = source
+        self.lexer = ForthLex().build()
+        self.parser = parser
+        self.tree: AbstractSyntaxTree = parser.parse(source)
+        self.code = Program("\n".join(EWVMTranslator([]).translate(self.tree)))
+
+    def lex(self) -> Tuple[int, str]:
+        self.lexer.lexer.input(self.source)
+        tokens = 0
+        while self.lexer.lexer.token():
+            tokens += 1
+        return tokens, "tokens"
+
+    def parse(self) -> Tuple[int, str]:
+        self.parser.parse(self.source)
+        return len(self.source.encode()), "bytes"
+
+    def translate(self) -> Tuple[int, str]:
+        return len(EWVMTranslator([]).translate(self.tree)), "instructions"
+
+    def graphviz(self) -> Tuple[int, str]:
+        from forthpiler.visualizer import GraphvizTranslator
+
+        translator = GraphvizTranslator()
+        translator.translate(self.tree)
+        # graphviz only writes the DOT source when it is asked for it
+        return len(translator.graph.source.encode()), "bytes"
+
+    def run(self) -> Tuple[int, str]:
+        vm = EWVM(self.code)
+        vm.run()
+        return vm.usage.steps, "steps"
+
+
+def measure(
+    phase: Callable[[], Tuple[int, str]], repeats: int
+) -> Tuple[List[float], int, str, int]:
+    # Tracing slows everything down, so memory is measured on a separate run
+    items, unit = phase()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        phase()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        phase()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, items, unit, peak
+
+
+def run_suite(
+    phases: Sequence[str] = PHASES,
+    programs: Optional[Sequence[str]] = None,
+    scale: float = 1.0,
+    repeats: int = 5,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    parser = ForthParser(ForthLex().build())
+    results = []
+    for program in programs or GENERATORS:
+        workload = Workload(program, GENERATORS[program](scale), parser)
+        for phase in phases:
+            times, items, unit, peak = measure(getattr(workload, phase), repeats)
+            result = BenchmarkResult(phase, program, scale, times, items, unit, peak)
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def format_result(result: BenchmarkResult) -> str:
+    return (
+        f"{result.name:<28} {result.median * 1000:>10.2f} "
+        f"{result.throughput:>14,.0f} {result.unit:<12} "
+        f"{result.peak_memory / 1e6:>9.1f}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Time the lexer, parser, translators and VM on generated programs",
+    )
+    parser.add_argument("--phase", action="append", choices=PHASES)
+    parser.add_argument("--program", action="append", choices=list(GENERATORS))
+    parser.add_argument("--scale", type=float, default=1.0, help="program size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--json", metavar="FILE", help="also write the results as JSON, - for stdout"
+    )
+    args = parser.parse_args(argv)
+
+    # The table goes to stderr when the JSON goes to stdout
+    table = sys.stderr if args.json == "-" else sys.stdout
+    print(
+        f"{'benchmark':<28} {'median (ms)':>10} {'throughput (/s)':>14} "
+        f"{'':<12} {'peak (MB)':>9}",
+        file=table,
+    )
+    results = run_suite(
+        args.phase or PHASES,
+        args.program,
+        args.scale,
+        args.repeat,
+        lambda result: print(format_result(result), file=table, flush=True),
+    )
+
+    if args.json:
+        document = json.dumps([result.to_dict() for result in results], indent=2)
+        if args.json == "-":
+            print(document)
+        else:
+            with open(args.json, "w") as file:
+                file.write(document + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
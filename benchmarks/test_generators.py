@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.generators import GENERATORS
+from ewvmapi.vm import EWVM
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+parser = ForthParser(ForthLex().build())
+
+
+@pytest.mark.parametrize("name", GENERATORS)
+def test_generator_translates_and_runs(name):
+    tree = parser.parse(GENERATORS[name](0.05))
+    assert tree is not None and not parser.errors and not parser.lexer.errors
+
+    vm = EWVM("\n".join(EWVMTranslator([]).translate(tree)))
+    assert vm.run()
+    assert vm.usage.steps > 0
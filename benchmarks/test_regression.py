@@ -0,0 +1,75 @@
+from benchmarks.regression import (
+    Baseline,
+    BaselineEntry,
+    compare,
+    format_report,
+    main,
+)
+
+ENVIRONMENT = {"python": "3.12.0", "cpus": 4, "id": "a"}
+
+
+def entry(median: float, variance: float = 0.0) -> BaselineEntry:
+    return BaselineEntry(median, variance, 5, 1 / median, "tokens")
+
+
+def statuses(old: dict, new: dict, **options) -> dict:
+    comparisons = compare(
+        Baseline(old, ENVIRONMENT, 1.0), Baseline(new, ENVIRONMENT, 1.0), **options
+    )
+    return {comparison.name: comparison.status for comparison in comparisons}
+
+
+def test_compare_threshold():
+    old = {"parse/a": entry(0.1), "parse/b": entry(0.1)}
+    new = {"parse/a": entry(0.115), "parse/b": entry(0.13)}
+    assert statuses(old, new) == {"parse/a": "ok", "parse/b": "REGRESSION"}
+    assert statuses(old, new, threshold=0.1)["parse/a"] == "REGRESSION"
+
+
+def test_compare_noise_and_floor():
+    # Three standard deviations of the difference are about 0.042 s here
+    noisy = {"run/a": entry(0.1, 0.0005)}
+    slower = {"run/a": entry(0.14, 0.0005)}
+    assert statuses(noisy, slower) == {"run/a": "ok"}
+    assert statuses(noisy, slower, sigmas=1) == {"run/a": "REGRESSION"}
+    assert statuses(noisy, {"run/a": entry(0.15, 0.0005)}) == {"run/a": "REGRESSION"}
+
+    # Doubling a very short benchmark stays under the floor
+    short = {"translate/a": entry(0.0004)}
+    assert statuses(short, {"translate/a": entry(0.0008)}) == {"translate/a": "ok"}
+    assert statuses(short, {"translate/a": entry(0.0008)}, min_difference=0) == {
+        "translate/a": "REGRESSION"
+    }
+
+
+def test_compare_gated_phases():
+    old = {"lex/a": entry(0.1), "graphviz/a": entry(0.1), "run/a": entry(0.1)}
+    new = {"lex/a": entry(0.2), "graphviz/a": entry(0.05), "run/b": entry(0.1)}
+    assert statuses(old, new) == {
+        "graphviz/a": "faster",
+        "lex/a": "slower",
+        "run/a": "missing",
+        "run/b": "new",
+    }
+    assert statuses(old, new, gated_phases=("lex",))["lex/a"] == "REGRESSION"
+
+
+def test_format_report():
+    old = Baseline({"parse/a": entry(0.1)}, ENVIRONMENT, 1.0)
+    new = Baseline({"parse/a": entry(0.2)}, {**ENVIRONMENT, "cpus": 8, "id": "b"}, 2.0)
+    report = format_report(compare(old, new), old, new)
+
+    assert "another environment (cpus 4 -> 8)" in report
+    assert "recorded at scale 1.0, this run used 2.0" in report
+    assert "parse/a" in report and "+100.0%" in report
+    assert report.endswith("1 regressions in parse, translate, run")
+
+    same = format_report(compare(old, old), old, old)
+    assert "warning" not in same and same.endswith("No regressions")
+
+
+def test_compare_needs_a_baseline(tmp_path, capsys):
+    assert main(["compare", "--baseline", str(tmp_path / "none.json")]) == 2
+    assert "No baseline" in capsys.readouterr().err
+    assert not (tmp_path / "none.json").exists()
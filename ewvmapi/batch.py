@@ -0,0 +1,57 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional
+
+from ewvmapi.ewvm_api import EWVMClient
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    index: int
+    output: Optional[str]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_batch(
+    programs: Iterable[str],
+    concurrency: int = 8,
+    max_connections: Optional[int] = None,
+    client: Optional[EWVMClient] = None,
+    base_url: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    # Results are yielded as soon as each run finishes, tagged with the
+    # position of the program, and at most `concurrency` runs are in flight
+    # so programs are only read from the iterable when there is room
+    owns_client = client is None
+    if client is None:
+        client = EWVMClient(
+            base_url, pool_size=max_connections or concurrency, pool_block=True
+        )
+
+    pending: Dict[Future, int] = {}
+    numbered_programs = enumerate(programs)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for index, code in numbered_programs:
+                pending[executor.submit(client.run_code, code)] = index
+                if len(pending) >= concurrency:
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    error = future.exception()
+                    yield BatchResult(index, None if error else future.result(), error)
+
+                    for next_index, code in numbered_programs:
+                        pending[executor.submit(client.run_code, code)] = next_index
+                        break
+    finally:
+        if owns_client:
+            client.close()
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    # Outputs of EWVM runs, addressed by a hash of the code and of the VM that
+    # ran it. Recently used results stay in memory; when a directory is given
+    # they are also kept on disk, evicting the least recently used files once
+    # the directory grows beyond `max_disk_bytes`.
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        memory_entries: int = 256,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.directory = Path(directory) if directory is not None else None
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.stats = CacheStats()
+
+        self.memory: OrderedDict[str, str] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_bytes = sum(p.stat().st_size for p in self._disk_entries())
+
+    @staticmethod
+    def key(code: str, endpoint: str, version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (endpoint, version, code):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return self.memory[key]
+
+            output = self._read_disk(key)
+            if output is None:
+                self.stats.misses += 1
+                return None
+
+            self.stats.disk_hits += 1
+            self._remember(key, output)
+            return output
+
+    def put(self, key: str, output: str) -> None:
+        with self.lock:
+            self._remember(key, output)
+            self._write_disk(key, output)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.memory.clear()
+            for path in self._disk_entries():
+                path.unlink(missing_ok=True)
+            self.disk_bytes = 0
+
+    def _remember(self, key: str, output: str) -> None:
+        self.memory[key] = output
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            output = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+        # The modification time doubles as the last use for eviction
+        os.utime(path)
+        return output
+
+    def _write_disk(self, key: str, output: str) -> None:
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        if path.exists():
+            self.disk_bytes -= path.stat().st_size
+
+        temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+        temporary.write_text(output, encoding="utf-8")
+        os.replace(temporary, path)
+        self.disk_bytes += path.stat().st_size
+
+        if self.disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def _disk_entries(self):
+        if self.directory is None:
+            return []
+        return [
+            path
+            for path in self.directory.glob("*/*")
+            if path.is_file() and path.suffix != ".tmp"
+        ]
+
+    def _evict(self) -> None:
+        entries = [(path, path.stat()) for path in self._disk_entries()]
+        self.disk_bytes = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self.stats.evictions += 1
+            self.disk_bytes -= stat.st_size
@@ -1,10 +1,136 @@
+import functools
 import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from ewvmapi.cache import ResultCache
+from ewvmapi.terminal import extract_terminal
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@functools.cache
+def load_environment() -> None:
+    # The settings in .env are read the first time a client needs them
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+class EWVMError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CallMetrics:
+    latency: float
+    attempts: int
+    status: Optional[int]
+    response_bytes: int
+
+
+class EWVMClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        pool_size: int = 10,
+        pool_block: bool = False,
+        metrics_size: int = 1000,
+        cache: Optional[ResultCache] = None,
+        vm_version: Optional[str] = None,
+    ):
+        load_environment()
+        self.base_url = (base_url or os.environ["EWVM_URL"]).rstrip("/")
+        self.cache = cache
+        self.vm_version = vm_version or os.environ.get("EWVM_VERSION", "")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics: Deque[CallMetrics] = deque(maxlen=metrics_size)
+
+        # One session keeps the connections to the VM alive between runs, and
+        # a blocking pool never opens more than `pool_size` of them at once
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=pool_block
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def run_code(self, code: str, use_cache: bool = True) -> str:
+        if self.cache is None or not self.cache.enabled or not use_cache:
+            return extract_terminal(self.post_code(code))
+
+        key = ResultCache.key(code, self.base_url, self.vm_version)
+        output = self.cache.get(key)
+        if output is None:
+            output = extract_terminal(self.post_code(code))
+            self.cache.put(key, output)
+        return output
+
+    def post_code(self, code: str) -> str:
+        start = time.perf_counter()
+        status = None
+        error = None
+
+        for attempt in range(1, self.retries + 2):
+            if attempt > 1:
+                time.sleep(self.backoff * 2 ** (attempt - 2))
+
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/run", json={"code": code}, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+
+            status = response.status_code
+            if status in RETRY_STATUSES:
+                error = EWVMError(f"EWVM answered with status {status}")
+                continue
+
+            self._record(start, attempt, status, len(response.content))
+            if not response.ok:
+                raise EWVMError(f"EWVM answered with status {status}")
+            return response.text
+
+        self._record(start, self.retries + 1, status, 0)
+        raise EWVMError(
+            f"EWVM request failed after {self.retries + 1} attempts: {error}"
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _record(self, start: float, attempts: int, status, response_bytes) -> None:
+        self.metrics.append(
+            CallMetrics(time.perf_counter() - start, attempts, status, response_bytes)
+        )
+
+
+default_client: Optional[EWVMClient] = None
 
 
 def run_code(code: str):
-    response = requests.post(f"{os.environ['EWVM_URL']}/run", json={"code": code})
-    html = BeautifulSoup(response.text, "html.parser")
-    return "".join(element.text for element in html.find_all(class_="terminal"))
+    global default_client
+    if default_client is None:
+        load_environment()
+        cache_dir = os.environ.get("EWVM_CACHE_DIR")
+        default_client = EWVMClient(cache=ResultCache(cache_dir))
+    return default_client.run_code(code)
@@ -0,0 +1,127 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from ewvmapi.ewvm_api import EWVMClient, EWVMError
+from ewvmapi.local_server import LocalEWVMServer
+
+DEFAULT_PROGRAM = "start\npushi 6\npushi 7\nmul\nwritei\nstop"
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    # Nearest rank, so the result is always one of the measured values
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: List[float]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 0.5)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 0.99)
+
+    def format(self) -> str:
+        return (
+            f"{self.requests} requests, {self.errors} errors in {self.elapsed:.2f} s\n"
+            f"throughput {self.throughput:.1f} req/s, "
+            f"p50 {self.p50 * 1000:.1f} ms, p99 {self.p99 * 1000:.1f} ms"
+        )
+
+
+def run_load(
+    base_url: str,
+    programs: Sequence[str] = (DEFAULT_PROGRAM,),
+    requests: int = 1000,
+    concurrency: int = 8,
+    retries: int = 0,
+    client: Optional[EWVMClient] = None,
+) -> LoadReport:
+    # Sends `requests` runs through the client, cycling over the programs,
+    # from `concurrency` threads sharing one connection pool. Latencies are
+    # those seen by the caller of `run_code`, retries included
+    owns_client = client is None
+    if client is None:
+        client = EWVMClient(base_url, retries=retries, pool_size=concurrency)
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def send(index: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            client.run_code(programs[index % len(programs)], use_cache=False)
+            failed = False
+        except EWVMError:
+            failed = True
+        latency = time.perf_counter() - start
+        with lock:
+            latencies.append(latency)
+            errors += failed
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send, range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if owns_client:
+            client.close()
+
+    return LoadReport(requests, errors, elapsed, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure throughput and latency of EWVM runs through the client"
+    )
+    parser.add_argument(
+        "--url", help="EWVM to load; by default a local server is started"
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="local server")
+    parser.add_argument("--jitter", type=float, default=0.0, help="local server")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="local server")
+    parser.add_argument("programs", nargs="*", help="files with EWVM code")
+    args = parser.parse_args()
+
+    programs = [open(path).read() for path in args.programs] or [DEFAULT_PROGRAM]
+
+    def load(url: str) -> LoadReport:
+        return run_load(url, programs, args.requests, args.concurrency, args.retries)
+
+    if args.url is not None:
+        report = load(args.url)
+    else:
+        with LocalEWVMServer(
+            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+        ) as server:
+            report = load(server.url)
+
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
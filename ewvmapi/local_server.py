@@ -0,0 +1,169 @@
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from ewvmapi.vm import EWVM, ExecutionLimits, VMError
+
+# Programs sent to the server must not keep a thread busy forever
+RUN_LIMITS = ExecutionLimits(max_steps=10_000_000, max_output_size=1_000_000)
+
+
+class LocalEWVMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which would otherwise stall
+    # keep-alive connections on delayed acknowledgements
+    disable_nagle_algorithm = True
+    server: "LocalEWVMServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._answer(404, "Not found")
+            return
+
+        try:
+            length = int(self.headers["Content-Length"])
+            if length < 0:
+                raise ValueError(f"invalid Content-Length {length}")
+            code = json.loads(self.rfile.read(length))["code"]
+            if not isinstance(code, str):
+                raise TypeError("the code must be a string")
+        except (ValueError, KeyError, TypeError) as e:
+            # The rest of the body cannot be told apart from the next request
+            self.close_connection = True
+            self._answer(400, f"Bad request: {html.escape(str(e))}")
+            return
+
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.failures > 0
+            if failing:
+                self.server.failures -= 1
+            else:
+                failing = self.server.random.random() < self.server.error_rate
+            delay = self.server.latency + self.server.random.uniform(
+                0, self.server.jitter
+            )
+
+        if failing:
+            with self.server.lock:
+                self.server.errors += 1
+            self._answer(self.server.error_status, "Service unavailable")
+            return
+
+        time.sleep(delay)
+        try:
+            output = EWVM(code, self.server.limits).run()
+        except VMError as e:
+            self._answer(422, f'<div class="terminal">{html.escape(str(e))}</div>')
+            return
+
+        self._answer(200, f'<div class="terminal">{html.escape(output)}</div>')
+
+    def _answer(self, status: int, page: str):
+        content = page.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *_):
+        pass
+
+
+class LocalEWVMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        failures: int = 0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+        limits: ExecutionLimits = RUN_LIMITS,
+    ):
+        super().__init__(address, LocalEWVMHandler)
+        # Every run waits `latency` plus up to `jitter` seconds. The next
+        # `failures` requests fail, and after them each request fails with
+        # probability `error_rate`
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = failures
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.limits = limits
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalEWVMServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out close the connection before the answer is sent
+        pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the EWVM /run endpoint from the local interpreter"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = LocalEWVMServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Serving EWVM on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
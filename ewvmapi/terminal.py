@@ -0,0 +1,106 @@
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# Elements that never have content, so they are never closed
+VOID_ELEMENTS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+# Elements whose text is not part of the page text
+HIDDEN_TEXT_ELEMENTS = frozenset(("script", "style", "template"))
+
+
+class TerminalExtractor(HTMLParser):
+    # Collects, in a single pass over the parser events, the text of every
+    # element with the `terminal` class, giving the same result as joining
+    # the text of BeautifulSoup's `find_all(class_="terminal")`
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # Open elements, with the fragments of the terminal each one starts
+        self.open_elements: List[Tuple[str, Optional[List[str]]]] = []
+        self.collecting: List[List[str]] = []
+        self.terminals: List[List[str]] = []
+        # Text inside scripts, styles and templates only counts for terminals
+        # that are themselves elements of the same kind
+        self.hidden_elements: List[Tuple[str, Optional[List[str]]]] = []
+
+    def handle_starttag(self, tag, attrs):
+        fragments = None
+        if self._is_terminal(attrs):
+            fragments = []
+            self.terminals.append(fragments)
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self.open_elements.append((tag, fragments))
+        if tag in HIDDEN_TEXT_ELEMENTS:
+            self.hidden_elements.append((tag, fragments))
+        if fragments is not None:
+            self.collecting.append(fragments)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._is_terminal(attrs):
+            self.terminals.append([])
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _ in self.open_elements):
+            return
+
+        # Like BeautifulSoup, a closing tag also closes every element that
+        # was left open inside it
+        while True:
+            open_tag, fragments = self.open_elements.pop()
+            if fragments is not None:
+                self.collecting.pop()
+            if open_tag in HIDDEN_TEXT_ELEMENTS:
+                self.hidden_elements.pop()
+            if open_tag == tag:
+                return
+
+    def handle_data(self, data):
+        if not self.hidden_elements:
+            for fragments in self.collecting:
+                fragments.append(data)
+            return
+
+        kind = self.hidden_elements[-1][0]
+        for tag, fragments in reversed(self.hidden_elements):
+            if tag != kind:
+                break
+            if fragments is not None:
+                fragments.append(data)
+
+    def text(self) -> str:
+        return "".join(fragment for terminal in self.terminals for fragment in terminal)
+
+    @staticmethod
+    def _is_terminal(attrs) -> bool:
+        return any(
+            name == "class" and value and "terminal" in value.split()
+            for name, value in attrs
+        )
+
+
+def extract_terminal(page: str) -> str:
+    if "terminal" not in page:
+        return ""
+
+    extractor = TerminalExtractor()
+    extractor.feed(page)
+    extractor.close()
+    return extractor.text()
@@ -0,0 +1,333 @@
+import http.client
+import time
+
+import pytest
+
+import forthpiler.syntax as ast
+from ewvmapi.batch import run_batch
+from ewvmapi.cache import ResultCache
+from ewvmapi.ewvm_api import EWVMClient, EWVMError
+from ewvmapi.load_test import percentile, run_load
+from ewvmapi.local_server import LocalEWVMServer
+from ewvmapi.terminal import extract_terminal
+from ewvmapi.vectorized_vm import VectorizedEWVM
+from ewvmapi.vm import EWVM, ExecutionLimits, ResourceLimitExceeded, VMError
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+lexer = ForthLex().build()
+parser = ForthParser(lexer)
+standard_lib_words = [ast.Word("spaces", parser.parse("0 DO SPACE LOOP"))]
+
+
+def translate(code: str) -> str:
+    return "\n".join(EWVMTranslator(standard_lib_words).translate(parser.parse(code)))
+
+
+def test_vm_do_loop():
+    assert EWVM(translate("10 0 DO I . LOOP")).run() == "0123456789"
+
+
+def test_vm_nested_loops_and_words():
+    code = ": sq dup * ; 3 0 DO 3 0 DO I J * sq . SPACE LOOP CR LOOP"
+    assert EWVM(translate(code)).run() == "0 0 0 \n0 1 4 \n0 4 16 \n"
+
+
+def test_vm_plus_loop_in_both_directions():
+    assert EWVM(translate("10 0 DO I . 2 +LOOP")).run() == "02468"
+    assert EWVM(translate("0 10 DO I . -2 +LOOP")).run() == "108642"
+
+
+def test_vm_stack_words():
+    assert EWVM(translate("1 2 2DUP . . . .")).run() == "2121"
+    assert EWVM(translate("17 5 /MOD . .")).run() == "32"
+
+
+def test_vm_variables_and_constants():
+    assert EWVM(translate("variable x 5 x ! x @ x @ * .")).run() == "25"
+    assert EWVM(translate("220 CONSTANT LIMIT 10 LIMIT + .")).run() == "230"
+
+
+def test_vm_strings_and_chars():
+    assert EWVM(translate('." hello" 3 spaces CHAR A EMIT')).run() == "hello   A"
+
+
+def test_vm_initial_stack():
+    code = translate("variable acc 0 acc ! 0 DO I acc @ + acc ! LOOP acc @ .")
+    assert EWVM(code).run([10]) == "45"
+
+
+def test_vm_stack_underflow():
+    try:
+        EWVM(translate("1 + .")).run()
+        assert False
+    except VMError:
+        pass
+
+
+def test_vectorized_vm_matches_scalar_vm():
+    code = translate(
+        """
+        variable total
+        : collatz BEGIN DUP 2 MOD IF 3 * 1 + ELSE 2 / THEN
+                  total @ 1 + total ! DUP 1 = UNTIL ;
+        0 total ! collatz drop total @ . SPACE
+        0 DO I 3 MOD 0= IF I . THEN LOOP
+        """
+    )
+    initial_stacks = [[n, n + 1] for n in range(1, 40)]
+
+    expected = [EWVM(code).run(initial) for initial in initial_stacks]
+    results = VectorizedEWVM(code).run(initial_stacks)
+    assert [result.output for result in results] == expected
+
+
+def test_vectorized_vm_grows_stack():
+    code = translate("0 DO I LOOP 0 DO . LOOP")
+    initial_stacks = [[n, n] for n in range(0, 200, 7)]
+
+    expected = [EWVM(code).run(initial) for initial in initial_stacks]
+    results = VectorizedEWVM(code, capacity=4).run(initial_stacks)
+    assert [result.output for result in results] == expected
+
+
+def test_vectorized_vm_errors_per_lane():
+    results = VectorizedEWVM(translate("100 swap / .")).run([[1], [0], [5]])
+
+    assert [result.output for result in results] == ["100", None, "20"]
+    assert not results[1].ok and "Division by zero" in str(results[1].error)
+
+
+def test_vectorized_vm_overflow():
+    code = translate("dup * . SPACE dup + .")
+    initial_stacks = [[2**40, 2**40], [3, 3], [-(2**70), 1], [2**62, 2**62]]
+
+    expected = [EWVM(code).run(initial) for initial in initial_stacks]
+    results = VectorizedEWVM(code).run(initial_stacks)
+    assert [result.output for result in results] == expected
+    assert expected[0] == f"{2**80} {2**41}"
+
+
+def test_vm_step_limit_points_at_source():
+    translator = EWVMTranslator([])
+    code = "\n".join(
+        translator.translate(parser.parse('BEGIN ." spin" AGAIN', "loop.fs"))
+    )
+    vm = EWVM(code, ExecutionLimits(max_steps=100), translator.source_map)
+
+    try:
+        vm.run()
+        assert False
+    except ResourceLimitExceeded as error:
+        assert error.resource == "step"
+        assert error.pc is not None
+        assert str(error.location).startswith("loop.fs:1:")
+    assert vm.usage.steps == 100
+
+
+def test_vm_memory_limits():
+    for limits, resource in [
+        (ExecutionLimits(max_stack_depth=10), "stack depth"),
+        (ExecutionLimits(max_output_size=10), "output size"),
+    ]:
+        try:
+            EWVM(translate("BEGIN 1 DUP . AGAIN"), limits).run()
+            assert False
+        except ResourceLimitExceeded as error:
+            assert error.resource == resource
+
+    nested = translate("2 0 DO 2 0 DO 2 0 DO I . LOOP LOOP LOOP")
+    try:
+        EWVM(nested, ExecutionLimits(max_heap_cells=5)).run()
+        assert False
+    except ResourceLimitExceeded as error:
+        assert error.resource == "heap cell"
+
+
+def test_vm_reports_usage():
+    vm = EWVM(translate("3 0 DO 3 0 DO I . LOOP LOOP"))
+    vm.run()
+
+    assert vm.usage.output_size == 9
+    assert vm.usage.peak_heap_cells == 4
+    assert vm.usage.steps > 0 and vm.usage.peak_stack_depth > 0
+
+
+@pytest.fixture
+def fake_ewvm():
+    with LocalEWVMServer() as server:
+        yield server
+
+
+def test_client_reuses_connections(fake_ewvm):
+    url = fake_ewvm.url
+    with EWVMClient(url) as client:
+        outputs = [client.run_code(translate(f"{n} .")) for n in range(5)]
+
+    assert outputs == ["0", "1", "2", "3", "4"]
+    assert fake_ewvm.connections == 1
+    assert len(client.metrics) == 5
+    assert all(metric.attempts == 1 for metric in client.metrics)
+
+
+def test_client_retries_with_backoff(fake_ewvm):
+    fake_ewvm.failures = 2
+    url = fake_ewvm.url
+    with EWVMClient(url, retries=2, backoff=0.01) as client:
+        assert client.run_code(translate("42 .")) == "42"
+
+    assert fake_ewvm.requests == 3
+    assert client.metrics[-1].attempts == 3
+
+
+def test_client_gives_up(fake_ewvm):
+    fake_ewvm.failures = 10
+    url = fake_ewvm.url
+    with EWVMClient(url, retries=1, backoff=0.01) as client:
+        with pytest.raises(EWVMError):
+            client.run_code(translate("42 ."))
+
+    assert fake_ewvm.requests == 2
+
+
+def test_server_rejects_bad_requests(fake_ewvm):
+    host, port = fake_ewvm.server_address[:2]
+    for body in (b"{", b'{"program": ""}', b'{"code": 1}', None):
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.putrequest("POST", "/run")
+        if body is not None:
+            connection.putheader("Content-Length", str(len(body)))
+        connection.endheaders(body)
+        response = connection.getresponse()
+        assert response.status == 400 and b"Bad request" in response.read()
+        connection.close()
+
+
+def test_server_reports_vm_errors(fake_ewvm):
+    fake_ewvm.limits = ExecutionLimits(max_steps=1000)
+    url = fake_ewvm.url
+    with EWVMClient(url, retries=0) as client:
+        with pytest.raises(EWVMError, match="422"):
+            client.run_code(translate("1 + ."))
+        with pytest.raises(EWVMError, match="422"):
+            client.run_code(translate("BEGIN AGAIN"))
+        assert client.run_code(translate("42 .")) == "42"
+
+
+def test_client_read_timeout(fake_ewvm):
+    fake_ewvm.latency = 0.5
+    url = fake_ewvm.url
+    with EWVMClient(url, read_timeout=0.05, retries=0) as client:
+        with pytest.raises(EWVMError):
+            client.run_code(translate("42 ."))
+
+
+def test_batch_runs_concurrently(fake_ewvm):
+    fake_ewvm.latency = 0.1
+    programs = [translate(f"{n} .") for n in range(8)]
+
+    start = time.perf_counter()
+    results = list(run_batch(programs, concurrency=8, base_url=fake_ewvm.url))
+
+    assert time.perf_counter() - start < 0.5
+    assert sorted((r.index, r.output) for r in results) == [
+        (n, str(n)) for n in range(8)
+    ]
+
+
+def test_batch_reports_failures_per_program(fake_ewvm):
+    fake_ewvm.failures = 100
+    programs = (translate(f"{n} .") for n in range(3))
+    with EWVMClient(fake_ewvm.url, retries=0) as client:
+        results = list(run_batch(programs, concurrency=2, client=client))
+
+    assert sorted(r.index for r in results) == [0, 1, 2]
+    assert all(isinstance(r.error, EWVMError) and not r.ok for r in results)
+
+
+def test_batch_caps_connections(fake_ewvm):
+    fake_ewvm.latency = 0.02
+    programs = [translate(f"{n} .") for n in range(20)]
+    results = list(
+        run_batch(programs, concurrency=8, max_connections=2, base_url=fake_ewvm.url)
+    )
+
+    assert all(r.ok for r in results)
+    assert fake_ewvm.connections <= 2
+
+
+def test_cache_avoids_repeated_runs(fake_ewvm, tmp_path):
+    cache = ResultCache(tmp_path)
+    code = translate("6 7 * .")
+    with EWVMClient(fake_ewvm.url, cache=cache) as client:
+        assert [client.run_code(code) for _ in range(3)] == ["42"] * 3
+        assert client.run_code(code, use_cache=False) == "42"
+
+    assert fake_ewvm.requests == 2
+    assert cache.stats.memory_hits == 2 and cache.stats.misses == 1
+
+    # A fresh cache on the same directory answers from disk
+    with EWVMClient(fake_ewvm.url, cache=ResultCache(tmp_path)) as client:
+        assert client.run_code(code) == "42"
+        assert client.cache.stats.disk_hits == 1
+    assert fake_ewvm.requests == 2
+
+
+def test_cache_keys_depend_on_vm():
+    assert ResultCache.key("start", "http://a", "1") != ResultCache.key(
+        "start", "http://b", "1"
+    )
+    assert ResultCache.key("start", "http://a", "1") != ResultCache.key(
+        "start", "http://a", "2"
+    )
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, memory_entries=1, max_disk_bytes=250)
+    for n in range(5):
+        cache.put(f"{n:064}", "x" * 100)
+
+    assert cache.disk_bytes <= 250 and cache.stats.evictions == 3
+    assert cache.get(f"{0:064}") is None
+    assert cache.get(f"{3:064}") == "x" * 100
+    assert cache.stats.hit_rate == 0.5
+
+
+TERMINAL_PAGES = [
+    '<html><body><div class="terminal">1 2 3 </div></body></html>',
+    '<div class="output terminal">a &amp; b&lt;c&gt; &#65;&eacute;<br>next</div>',
+    '<div class="terminal"><span>nested <b>text</b></span> tail</div><p>ignored</p>',
+    '<div class="terminal">one</div><pre class="terminal">two\n</pre>',
+    '<div class="terminal">x<script>var y = "<b>";</script>y<!-- note --></div>',
+    '<div class="terminal"><div class="terminal">inner</div>outer</div>',
+    '<div class="terminal">unclosed <p>paragraph</div>after',
+    '<div class="terminals">not a terminal</div><br class="terminal"/>',
+    "<p>no output</p>",
+]
+
+
+@pytest.mark.parametrize("page", TERMINAL_PAGES)
+def test_extract_terminal_matches_beautifulsoup(page):
+    bs4 = pytest.importorskip("bs4")
+    soup = bs4.BeautifulSoup(page, "html.parser")
+    expected = "".join(element.text for element in soup.find_all(class_="terminal"))
+    assert extract_terminal(page) == expected
+
+
+def test_server_injects_errors_and_latency():
+    with LocalEWVMServer(latency=0.01, jitter=0.01, error_rate=0.5, seed=1) as server:
+        report = run_load(server.url, requests=40, concurrency=4)
+
+    assert report.requests == 40 and len(report.latencies) == 40
+    assert report.errors == server.errors and 0 < report.errors < 40
+    # Injected errors are answered without the latency
+    assert report.p50 <= report.p99 and report.p99 >= 0.01
+    assert report.throughput > 0
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
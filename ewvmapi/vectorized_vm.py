@@ -0,0 +1,369 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ewvmapi.vm import EWVM, Program, Segment, VMError
+
+# Every stack, global and struct cell is a row with one column (lane) per
+# input, and each value carries a tag telling integers and addresses apart.
+INTEGER = -1
+STACK = Segment.STACK.value
+STRUCT = Segment.STRUCT.value
+STRING = Segment.STRING.value
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+# Results that stay below this magnitude in floating point fit in an int64
+# even with the rounding error of the float computation
+EXACT_MAGNITUDE = 2.0**62
+
+Column = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class LaneResult:
+    output: Optional[str]
+    error: Optional[VMError]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Diverted(Exception):
+    # Raised by a step for the lanes it cannot execute exactly, because they
+    # fail or leave the int64 range. Those lanes are run on the scalar VM.
+    def __init__(self, lanes: np.ndarray):
+        super().__init__()
+        self.lanes = lanes
+
+
+def exact(operation):
+    return lambda a, b: np.abs(operation(a.astype(np.float64), b)) < EXACT_MAGNITUDE
+
+
+class VectorizedEWVM:
+    def __init__(self, program: Union[Program, str], capacity: int = 64):
+        self.program = program if isinstance(program, Program) else Program(program)
+        self.capacity = capacity
+        self.strings: List[str] = []
+
+        # String literals are constants of the program, so they are interned
+        # once and their address is the same in every lane
+        self.string_indexes = {}
+        for instruction in self.program.instructions:
+            if (
+                instruction.opcode == "pushs"
+                and instruction.argument not in self.string_indexes
+            ):
+                self.string_indexes[instruction.argument] = len(self.strings)
+                self.strings.append(instruction.argument)
+
+    def run(self, initial_stacks: Sequence[Sequence[int]]) -> List[LaneResult]:
+        lanes = len(initial_stacks)
+
+        self.pc = np.zeros(lanes, dtype=np.int64)
+        self.alive = np.ones(lanes, dtype=bool)
+        self.diverted = np.zeros(lanes, dtype=bool)
+        self.sp = np.zeros(lanes, dtype=np.int64)
+        self.fp = np.zeros(lanes, dtype=np.int64)
+        self.stack = np.zeros((self.capacity, lanes), dtype=np.int64)
+        self.tags = np.full((self.capacity, lanes), INTEGER, dtype=np.int8)
+
+        self.hp = np.zeros(lanes, dtype=np.int64)
+        self.heap = np.zeros((self.capacity, lanes), dtype=np.int64)
+        self.heap_tags = np.full((self.capacity, lanes), INTEGER, dtype=np.int8)
+        self.blocks = np.zeros((self.capacity, lanes), dtype=np.int64)
+        self.block_count = np.zeros(lanes, dtype=np.int64)
+
+        depth = max((len(initial) for initial in initial_stacks), default=0)
+        self.initial_depth = np.array(
+            [len(initial) for initial in initial_stacks], dtype=np.int64
+        )
+        self.initial_values = np.zeros((depth, lanes), dtype=np.int64)
+        for lane, initial in enumerate(initial_stacks):
+            if all(INT64_MIN <= value <= INT64_MAX for value in initial):
+                self.initial_values[: len(initial), lane] = initial
+            else:
+                self.diverted[lane] = True
+        self.alive &= ~self.diverted
+
+        self.output: List[List[str]] = [[] for _ in range(lanes)]
+
+        instructions = self.program.instructions
+        end = len(instructions)
+
+        # Lanes advance in lockstep: each step executes the lowest pending
+        # instruction for the lanes sitting on it, so lanes that branched away
+        # wait for the others and re-converge where the branches join
+        while True:
+            self.alive &= self.pc < end
+            if not self.alive.any():
+                break
+
+            current = int(self.pc[self.alive].min())
+            lane_indexes = np.nonzero(self.alive & (self.pc == current))[0]
+            instruction = instructions[current]
+
+            # Steps only move the stack pointer before they divert lanes, so
+            # the other lanes can execute the instruction again from there
+            sp = self.sp[lane_indexes]
+            self.pc[lane_indexes] = current + 1
+            try:
+                self._execute(instruction.opcode, instruction.argument, lane_indexes)
+            except Diverted as diverted:
+                self.sp[lane_indexes] = sp
+                self.pc[lane_indexes] = current
+                self.alive[diverted.lanes] = False
+                self.diverted[diverted.lanes] = True
+
+        results = [LaneResult("".join(fragments), None) for fragments in self.output]
+        for lane in np.nonzero(self.diverted)[0]:
+            try:
+                output = EWVM(self.program).run(initial_stacks[lane])
+                results[lane] = LaneResult(output, None)
+            except VMError as e:
+                results[lane] = LaneResult(None, e)
+        return results
+
+    def _execute(self, opcode: str, argument, lanes: np.ndarray) -> None:
+        match opcode:
+            case "pushi":
+                if not INT64_MIN <= argument <= INT64_MAX:
+                    raise Diverted(lanes)
+                self._push(lanes, np.full(len(lanes), argument), INTEGER)
+            case "pushn":
+                for _ in range(argument):
+                    self._push(lanes, np.zeros(len(lanes), dtype=np.int64), INTEGER)
+            case "pushg":
+                self._push_column(lanes, self._read_stack(lanes, argument))
+            case "pushl":
+                self._push_column(
+                    lanes, self._read_stack(lanes, self.fp[lanes] + argument)
+                )
+            case "pushs":
+                self._push(
+                    lanes, np.full(len(lanes), self.string_indexes[argument]), STRING
+                )
+            case "pushsp":
+                self._push(lanes, self.sp[lanes] - 1, STACK)
+            case "pushfp":
+                self._push(lanes, self.fp[lanes], STACK)
+            case "pushgp":
+                self._push(lanes, np.zeros(len(lanes), dtype=np.int64), STACK)
+            case "pushst":
+                self._divert(lanes, self.block_count[lanes] <= argument)
+                self._push(lanes, self.blocks[argument, lanes], STRUCT)
+            case "storeg":
+                self._write_stack(lanes, argument, self._pop(lanes))
+            case "storel":
+                column = self._pop(lanes)
+                self._write_stack(lanes, self.fp[lanes] + argument, column)
+            case "load":
+                self._push_column(lanes, self._load(lanes, self._pop(lanes), argument))
+            case "store":
+                column = self._pop(lanes)
+                self._store(lanes, self._pop(lanes), argument, column)
+            case "pop":
+                self._divert(lanes, self.sp[lanes] < argument)
+                self.sp[lanes] -= argument
+            case "popst":
+                self._divert(lanes, self.block_count[lanes] == 0)
+                self.block_count[lanes] -= 1
+                self.hp[lanes] = self.blocks[self.block_count[lanes], lanes]
+            case "dup":
+                self._divert(lanes, self.sp[lanes] < argument)
+                for _ in range(argument):
+                    self._push_column(
+                        lanes, self._read_stack(lanes, self.sp[lanes] - argument)
+                    )
+            case "swap":
+                b = self._pop(lanes)
+                a = self._pop(lanes)
+                self._push_column(lanes, b)
+                self._push_column(lanes, a)
+            case "alloc":
+                self._alloc(lanes, argument)
+            case "add":
+                self._binary(lanes, np.add, exact(np.add))
+            case "sub":
+                self._binary(lanes, np.subtract, exact(np.subtract))
+            case "mul":
+                self._binary(lanes, np.multiply, exact(np.multiply))
+            case "div":
+                self._binary(lanes, self._truncated_div, self._divisible)
+            case "mod":
+                self._binary(
+                    lanes,
+                    lambda a, b: a - b * self._truncated_div(a, b),
+                    self._divisible,
+                )
+            case "not":
+                value = self._pop_int(lanes)
+                self._push(lanes, (value == 0).astype(np.int64), INTEGER)
+            case "equal":
+                (b, b_tags), (a, a_tags) = self._pop(lanes), self._pop(lanes)
+                self._push(
+                    lanes, ((a == b) & (a_tags == b_tags)).astype(np.int64), INTEGER
+                )
+            case "inf":
+                self._binary(lanes, lambda a, b: (a < b).astype(np.int64))
+            case "infeq":
+                self._binary(lanes, lambda a, b: (a <= b).astype(np.int64))
+            case "sup":
+                self._binary(lanes, lambda a, b: (a > b).astype(np.int64))
+            case "supeq":
+                self._binary(lanes, lambda a, b: (a >= b).astype(np.int64))
+            case "writei":
+                for lane, value in zip(lanes, self._pop_int(lanes)):
+                    self.output[lane].append(str(value))
+            case "writechr":
+                for lane, value in zip(lanes, self._pop_int(lanes)):
+                    self.output[lane].append(chr(value))
+            case "writes":
+                values, tags = self._pop(lanes)
+                self._divert(lanes, tags != STRING)
+                for lane, value in zip(lanes, values):
+                    self.output[lane].append(self.strings[value])
+            case "jump":
+                self.pc[lanes] = argument
+            case "jz":
+                values, tags = self._pop(lanes)
+                taken = (values == 0) & (tags == INTEGER)
+                self.pc[lanes[taken]] = argument
+            case "start":
+                self.fp[lanes] = self.sp[lanes]
+                for row in range(len(self.initial_values)):
+                    pushing = lanes[self.initial_depth[lanes] > row]
+                    self._push(pushing, self.initial_values[row, pushing], INTEGER)
+            case "stop":
+                self.alive[lanes] = False
+            case "nop":
+                pass
+
+    def _grow(self, rows: int) -> None:
+        while rows > self.capacity:
+            self.stack = np.concatenate([self.stack, np.zeros_like(self.stack)])
+            self.tags = np.concatenate([self.tags, np.full_like(self.tags, INTEGER)])
+            self.heap = np.concatenate([self.heap, np.zeros_like(self.heap)])
+            self.heap_tags = np.concatenate(
+                [self.heap_tags, np.full_like(self.heap_tags, INTEGER)]
+            )
+            self.blocks = np.concatenate([self.blocks, np.zeros_like(self.blocks)])
+            self.capacity *= 2
+
+    def _push(self, lanes: np.ndarray, values: np.ndarray, tag: int) -> None:
+        self._push_column(lanes, (values, np.full(len(lanes), tag, dtype=np.int8)))
+
+    def _push_column(self, lanes: np.ndarray, column: Column) -> None:
+        values, tags = column
+        if len(lanes):
+            self._grow(int(self.sp[lanes].max()) + 1)
+        rows = self.sp[lanes]
+        self.stack[rows, lanes] = values
+        self.tags[rows, lanes] = tags
+        self.sp[lanes] += 1
+
+    def _divert(self, lanes: np.ndarray, failing: np.ndarray) -> None:
+        if np.any(failing):
+            raise Diverted(lanes[failing])
+
+    def _pop(self, lanes: np.ndarray) -> Column:
+        self._divert(lanes, self.sp[lanes] == 0)
+        self.sp[lanes] -= 1
+        rows = self.sp[lanes]
+        return self.stack[rows, lanes], self.tags[rows, lanes]
+
+    def _pop_int(self, lanes: np.ndarray) -> np.ndarray:
+        values, tags = self._pop(lanes)
+        self._divert(lanes, tags != INTEGER)
+        return values
+
+    def _read_stack(self, lanes: np.ndarray, rows) -> Column:
+        rows = np.broadcast_to(rows, lanes.shape)
+        self._divert(lanes, (rows < 0) | (rows >= self.sp[lanes]))
+        return self.stack[rows, lanes], self.tags[rows, lanes]
+
+    def _write_stack(self, lanes: np.ndarray, rows, column: Column) -> None:
+        rows = np.broadcast_to(rows, lanes.shape)
+        self._divert(lanes, (rows < 0) | (rows >= self.sp[lanes]))
+        self.stack[rows, lanes], self.tags[rows, lanes] = column
+
+    def _load(self, lanes: np.ndarray, address: Column, offset: int) -> Column:
+        rows, tags = address
+        rows = rows + offset
+        values = np.zeros(len(lanes), dtype=np.int64)
+        value_tags = np.full(len(lanes), INTEGER, dtype=np.int8)
+
+        on_stack = tags == STACK
+        on_heap = tags == STRUCT
+        self._divert(lanes, ~(on_stack | on_heap))
+
+        if np.any(on_stack):
+            values[on_stack], value_tags[on_stack] = self._read_stack(
+                lanes[on_stack], rows[on_stack]
+            )
+        if np.any(on_heap):
+            self._check_heap(lanes[on_heap], rows[on_heap])
+            values[on_heap] = self.heap[rows[on_heap], lanes[on_heap]]
+            value_tags[on_heap] = self.heap_tags[rows[on_heap], lanes[on_heap]]
+
+        return values, value_tags
+
+    def _store(
+        self, lanes: np.ndarray, address: Column, offset: int, column: Column
+    ) -> None:
+        rows, tags = address
+        rows = rows + offset
+        values, value_tags = column
+
+        on_stack = tags == STACK
+        on_heap = tags == STRUCT
+        self._divert(lanes, ~(on_stack | on_heap))
+
+        if np.any(on_stack):
+            self._write_stack(
+                lanes[on_stack],
+                rows[on_stack],
+                (values[on_stack], value_tags[on_stack]),
+            )
+        if np.any(on_heap):
+            self._check_heap(lanes[on_heap], rows[on_heap])
+            self.heap[rows[on_heap], lanes[on_heap]] = values[on_heap]
+            self.heap_tags[rows[on_heap], lanes[on_heap]] = value_tags[on_heap]
+
+    def _check_heap(self, lanes: np.ndarray, rows: np.ndarray) -> None:
+        self._divert(lanes, (rows < 0) | (rows >= self.hp[lanes]))
+
+    def _alloc(self, lanes: np.ndarray, size: int) -> None:
+        if len(lanes) == 0:
+            return
+        self._grow(int(self.hp[lanes].max()) + size)
+        self._grow(int(self.block_count[lanes].max()) + 1)
+
+        start = self.hp[lanes]
+        for cell in range(size):
+            self.heap[start + cell, lanes] = 0
+            self.heap_tags[start + cell, lanes] = INTEGER
+
+        self.blocks[self.block_count[lanes], lanes] = start
+        self.block_count[lanes] += 1
+        self.hp[lanes] += size
+        self._push(lanes, start, STRUCT)
+
+    def _binary(self, lanes: np.ndarray, operation, valid=None) -> None:
+        b = self._pop_int(lanes)
+        a = self._pop_int(lanes)
+        if valid is not None:
+            self._divert(lanes, ~valid(a, b))
+        self._push(lanes, operation(a, b), INTEGER)
+
+    @staticmethod
+    def _divisible(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # The magnitude of the smallest int64 does not fit in an int64
+        return (b != 0) & (a != INT64_MIN)
+
+    @staticmethod
+    def _truncated_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        quotient = np.abs(a) // np.abs(b)
+        return np.where((a >= 0) == (b >= 0), quotient, -quotient)
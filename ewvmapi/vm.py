@@ -0,0 +1,546 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+
+class VMError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+        self.pc: Optional[int] = None
+        self.instruction: Optional[Instruction] = None
+        self.location = None
+
+    def __str__(self):
+        if self.pc is None:
+            return self.message
+        position = f"{self.message} at instruction {self.pc} ({self.instruction})"
+        if self.location is not None:
+            position += f", {self.location}"
+        return position
+
+
+class ResourceLimitExceeded(VMError):
+    def __init__(self, resource: str, limit: int):
+        super().__init__(f"{resource.capitalize()} limit of {limit} exceeded")
+        self.resource = resource
+        self.limit = limit
+
+
+@dataclass(frozen=True)
+class ExecutionLimits:
+    max_steps: Optional[int] = None
+    max_stack_depth: Optional[int] = None
+    max_heap_cells: Optional[int] = None
+    max_output_size: Optional[int] = None
+
+
+@dataclass
+class ResourceUsage:
+    steps: int = 0
+    peak_stack_depth: int = 0
+    peak_heap_cells: int = 0
+    output_size: int = 0
+
+
+class Segment(Enum):
+    STACK, STRUCT, STRING = range(3)
+
+
+@dataclass(frozen=True)
+class Address:
+    segment: Segment
+    block: int
+    offset: int = 0
+
+    def __repr__(self):
+        return f"Address({self.segment.name}, {self.block}, {self.offset})"
+
+
+Value = Union[int, Address]
+
+JUMP_OPCODES = ("jump", "jz")
+STRING_OPCODES = ("pushs",)
+NO_ARGUMENT_OPCODES = (
+    "add",
+    "sub",
+    "mul",
+    "div",
+    "mod",
+    "not",
+    "inf",
+    "infeq",
+    "sup",
+    "supeq",
+    "equal",
+    "swap",
+    "pushsp",
+    "pushfp",
+    "pushgp",
+    "popst",
+    "writei",
+    "writechr",
+    "writes",
+    "start",
+    "stop",
+    "nop",
+)
+INTEGER_OPCODES = (
+    "pushi",
+    "pushn",
+    "pushg",
+    "pushl",
+    "pushst",
+    "storeg",
+    "storel",
+    "load",
+    "store",
+    "pop",
+    "dup",
+    "alloc",
+)
+
+
+@dataclass(frozen=True)
+class Instruction:
+    opcode: str
+    argument: Union[int, str, None]
+    line: int
+
+    def __repr__(self):
+        if self.argument is None:
+            return self.opcode
+        return f"{self.opcode} {self.argument}"
+
+
+class Program:
+    def __init__(self, code: str):
+        self.instructions: List[Instruction] = []
+        self.labels: Dict[str, int] = {}
+
+        pending_jumps: List[int] = []
+        for line_number, line in enumerate(code.split("\n")):
+            line = line.strip()
+            if not line or line.startswith("//"):
+                continue
+
+            if line.endswith(":") and " " not in line:
+                self.labels[line[:-1]] = len(self.instructions)
+                continue
+
+            opcode, _, argument = line.partition(" ")
+            opcode = opcode.lower()
+            argument = argument.strip()
+
+            if opcode in JUMP_OPCODES:
+                pending_jumps.append(len(self.instructions))
+                self.instructions.append(Instruction(opcode, argument, line_number))
+            elif opcode in STRING_OPCODES:
+                if len(argument) < 2 or argument[0] != '"' or argument[-1] != '"':
+                    raise VMError(f"Malformed string at line {line_number + 1}")
+                self.instructions.append(
+                    Instruction(opcode, argument[1:-1], line_number)
+                )
+            elif opcode in INTEGER_OPCODES:
+                try:
+                    value = int(argument)
+                except ValueError:
+                    raise VMError(
+                        f"Instruction '{opcode}' expects an integer at line {line_number + 1}"
+                    ) from None
+                self.instructions.append(Instruction(opcode, value, line_number))
+            elif opcode in NO_ARGUMENT_OPCODES:
+                self.instructions.append(Instruction(opcode, None, line_number))
+            else:
+                raise VMError(
+                    f"Unknown instruction '{opcode}' at line {line_number + 1}"
+                )
+
+        # Labels may be used before they are defined, so jumps are resolved
+        # to instruction indexes only once the whole program was read
+        for index in pending_jumps:
+            instruction = self.instructions[index]
+            if instruction.argument not in self.labels:
+                raise VMError(f"Label '{instruction.argument}' not defined")
+            self.instructions[index] = Instruction(
+                instruction.opcode,
+                self.labels[instruction.argument],
+                instruction.line,
+            )
+
+    def __len__(self):
+        return len(self.instructions)
+
+
+def truncated_div(a: int, b: int) -> int:
+    quotient = abs(a) // abs(b)
+    return quotient if (a >= 0) == (b >= 0) else -quotient
+
+
+def truncated_mod(a: int, b: int) -> int:
+    return a - b * truncated_div(a, b)
+
+
+class EWVM:
+    def __init__(
+        self,
+        program: Union[Program, str],
+        limits: ExecutionLimits = ExecutionLimits(),
+        source_map: Optional[Sequence] = None,
+    ):
+        self.limits = limits
+
+        self.stack: List[Value] = []
+        self.structs: List[List[Value]] = []
+        self.strings: List[str] = []
+        self.string_indexes: Dict[str, int] = {}
+        self.output: List[str] = []
+        self.fp = 0
+        self.pc = 0
+        self.halted = False
+        self.initial_stack: Sequence[int] = ()
+        self.instruction_counts: List[int] = []
+        self.instruction_times: List[int] = []
+        self.heap_cells = 0
+        self.output_size = 0
+        self.usage = ResourceUsage()
+
+        handlers: Dict[str, Callable[[Union[int, str, None]], Optional[int]]] = {
+            "pushi": self._pushi,
+            "pushn": self._pushn,
+            "pushg": self._pushg,
+            "pushl": self._pushl,
+            "pushs": self._pushs,
+            "pushsp": self._pushsp,
+            "pushfp": self._pushfp,
+            "pushgp": self._pushgp,
+            "pushst": self._pushst,
+            "storeg": self._storeg,
+            "storel": self._storel,
+            "load": self._load,
+            "store": self._store,
+            "pop": self._pop,
+            "popst": self._popst,
+            "dup": self._dup,
+            "swap": self._swap,
+            "alloc": self._alloc,
+            "add": self._add,
+            "sub": self._sub,
+            "mul": self._mul,
+            "div": self._div,
+            "mod": self._mod,
+            "not": self._not,
+            "equal": self._equal,
+            "inf": self._inf,
+            "infeq": self._infeq,
+            "sup": self._sup,
+            "supeq": self._supeq,
+            "writei": self._writei,
+            "writechr": self._writechr,
+            "writes": self._writes,
+            "jump": self._jump,
+            "jz": self._jz,
+            "start": self._start,
+            "stop": self._stop,
+            "nop": self._nop,
+        }
+        self.handlers = handlers
+        self.load(program, source_map)
+
+    def load(
+        self, program: Union[Program, str], source_map: Optional[Sequence] = None
+    ) -> None:
+        # The stack, the heap and the strings are kept, so the new program
+        # continues from the state the previous one left behind
+        self.program = program if isinstance(program, Program) else Program(program)
+        # Anything indexable by EWVM code line, used to point errors at the
+        # source the code was generated from
+        self.source_map = source_map
+        self.decoded = [
+            (self.handlers[instruction.opcode], instruction.argument)
+            for instruction in self.program.instructions
+        ]
+        self.pc = 0
+        self.halted = False
+        self.output = []
+
+    def run(self, initial_stack: Sequence[int] = (), profile: bool = False) -> str:
+        self.initial_stack = initial_stack
+        if profile:
+            self.instruction_counts = [0] * len(self.decoded)
+            self.instruction_times = [0] * len(self.decoded)
+
+        try:
+            self._run(profile)
+        except IndexError:
+            raise self._located(VMError("Invalid memory access")) from None
+        except VMError as error:
+            raise self._located(error)
+
+        return "".join(self.output)
+
+    def _run(self, profile: bool) -> None:
+        decoded = self.decoded
+        end = len(decoded)
+        stack = self.stack
+        usage = self.usage
+        max_steps = self.limits.max_steps
+        max_stack_depth = self.limits.max_stack_depth
+
+        steps = usage.steps
+        peak_stack_depth = usage.peak_stack_depth
+        try:
+            while not self.halted and self.pc < end:
+                if max_steps is not None and steps >= max_steps:
+                    raise ResourceLimitExceeded("step", max_steps)
+
+                pc = self.pc
+                handler, argument = decoded[pc]
+                if profile:
+                    start = time.perf_counter_ns()
+                    target = handler(argument)
+                    self.instruction_times[pc] += time.perf_counter_ns() - start
+                    self.instruction_counts[pc] += 1
+                else:
+                    target = handler(argument)
+                steps += 1
+
+                if len(stack) > peak_stack_depth:
+                    peak_stack_depth = len(stack)
+                    if (
+                        max_stack_depth is not None
+                        and peak_stack_depth > max_stack_depth
+                    ):
+                        raise ResourceLimitExceeded("stack depth", max_stack_depth)
+
+                self.pc = pc + 1 if target is None else target
+        finally:
+            usage.steps = steps
+            usage.peak_stack_depth = peak_stack_depth
+            usage.output_size = self.output_size
+
+    def _located(self, error: VMError) -> VMError:
+        if error.pc is None and self.pc < len(self.program):
+            error.pc = self.pc
+            error.instruction = self.program.instructions[self.pc]
+            if self.source_map is not None:
+                error.location = self.source_map[error.instruction.line]
+        return error
+
+    def push(self, value: Value) -> None:
+        self.stack.append(value)
+
+    def pop(self) -> Value:
+        if not self.stack:
+            raise VMError("Stack underflow")
+        return self.stack.pop()
+
+    def pop_int(self) -> int:
+        value = self.pop()
+        if not isinstance(value, int):
+            raise VMError(f"Expected an integer but got {value}")
+        return value
+
+    def pop_address(self) -> Address:
+        value = self.pop()
+        if not isinstance(value, Address):
+            raise VMError(f"Expected an address but got {value}")
+        return value
+
+    def read(self, address: Address, offset: int) -> Value:
+        match address.segment:
+            case Segment.STACK:
+                return self.stack[self._checked(address.offset + offset)]
+            case Segment.STRUCT:
+                return self.structs[address.block][
+                    self._checked(address.offset + offset)
+                ]
+        raise VMError(f"Cannot load from {address}")
+
+    def write(self, address: Address, offset: int, value: Value) -> None:
+        match address.segment:
+            case Segment.STACK:
+                self.stack[self._checked(address.offset + offset)] = value
+                return
+            case Segment.STRUCT:
+                self.structs[address.block][
+                    self._checked(address.offset + offset)
+                ] = value
+                return
+        raise VMError(f"Cannot store into {address}")
+
+    def write_output(self, text: str) -> None:
+        self.output_size += len(text)
+        max_output_size = self.limits.max_output_size
+        if max_output_size is not None and self.output_size > max_output_size:
+            raise ResourceLimitExceeded("output size", max_output_size)
+        self.output.append(text)
+
+    @staticmethod
+    def _checked(index: int) -> int:
+        # Python would silently read from the end of the list otherwise
+        if index < 0:
+            raise IndexError(index)
+        return index
+
+    def _pushi(self, argument):
+        self.stack.append(argument)
+
+    def _pushn(self, argument):
+        self.stack.extend([0] * argument)
+
+    def _pushg(self, argument):
+        self.push(self.stack[self._checked(argument)])
+
+    def _pushl(self, argument):
+        self.push(self.stack[self._checked(self.fp + argument)])
+
+    def _pushs(self, argument):
+        if argument not in self.string_indexes:
+            self.string_indexes[argument] = len(self.strings)
+            self.strings.append(argument)
+        self.push(Address(Segment.STRING, self.string_indexes[argument]))
+
+    def _pushsp(self, _):
+        self.push(Address(Segment.STACK, 0, len(self.stack) - 1))
+
+    def _pushfp(self, _):
+        self.push(Address(Segment.STACK, 0, self.fp))
+
+    def _pushgp(self, _):
+        self.push(Address(Segment.STACK, 0, 0))
+
+    def _pushst(self, argument):
+        if not 0 <= argument < len(self.structs):
+            raise VMError(f"Struct {argument} not allocated")
+        self.push(Address(Segment.STRUCT, argument))
+
+    def _storeg(self, argument):
+        value = self.pop()
+        self.stack[self._checked(argument)] = value
+
+    def _storel(self, argument):
+        value = self.pop()
+        self.stack[self._checked(self.fp + argument)] = value
+
+    def _load(self, argument):
+        address = self.pop_address()
+        self.push(self.read(address, argument))
+
+    def _store(self, argument):
+        value = self.pop()
+        address = self.pop_address()
+        self.write(address, argument, value)
+
+    def _pop(self, argument):
+        if argument > len(self.stack):
+            raise VMError("Stack underflow")
+        del self.stack[len(self.stack) - argument :]
+
+    def _popst(self, _):
+        if not self.structs:
+            raise VMError("No struct to free")
+        self.heap_cells -= len(self.structs.pop())
+
+    def _dup(self, argument):
+        if argument > len(self.stack):
+            raise VMError("Stack underflow")
+        self.stack.extend(self.stack[len(self.stack) - argument :])
+
+    def _swap(self, _):
+        b = self.pop()
+        a = self.pop()
+        self.stack.append(b)
+        self.stack.append(a)
+
+    def _alloc(self, argument):
+        self.heap_cells += argument
+        max_heap_cells = self.limits.max_heap_cells
+        if max_heap_cells is not None and self.heap_cells > max_heap_cells:
+            raise ResourceLimitExceeded("heap cell", max_heap_cells)
+        self.usage.peak_heap_cells = max(self.usage.peak_heap_cells, self.heap_cells)
+
+        self.structs.append([0] * argument)
+        self.push(Address(Segment.STRUCT, len(self.structs) - 1))
+
+    def _add(self, _):
+        b = self.pop_int()
+        self.stack.append(self.pop_int() + b)
+
+    def _sub(self, _):
+        b = self.pop_int()
+        self.stack.append(self.pop_int() - b)
+
+    def _mul(self, _):
+        b = self.pop_int()
+        self.stack.append(self.pop_int() * b)
+
+    def _div(self, _):
+        b = self.pop_int()
+        a = self.pop_int()
+        if b == 0:
+            raise VMError("Division by zero")
+        self.stack.append(truncated_div(a, b))
+
+    def _mod(self, _):
+        b = self.pop_int()
+        a = self.pop_int()
+        if b == 0:
+            raise VMError("Division by zero")
+        self.stack.append(truncated_mod(a, b))
+
+    def _not(self, _):
+        self.stack.append(int(self.pop_int() == 0))
+
+    def _equal(self, _):
+        b = self.pop()
+        self.stack.append(int(self.pop() == b))
+
+    def _inf(self, _):
+        b = self.pop_int()
+        self.stack.append(int(self.pop_int() < b))
+
+    def _infeq(self, _):
+        b = self.pop_int()
+        self.stack.append(int(self.pop_int() <= b))
+
+    def _sup(self, _):
+        b = self.pop_int()
+        self.stack.append(int(self.pop_int() > b))
+
+    def _supeq(self, _):
+        b = self.pop_int()
+        self.stack.append(int(self.pop_int() >= b))
+
+    def _writei(self, _):
+        self.write_output(str(self.pop_int()))
+
+    def _writechr(self, _):
+        self.write_output(chr(self.pop_int()))
+
+    def _writes(self, _):
+        address = self.pop_address()
+        if address.segment != Segment.STRING:
+            raise VMError(f"Expected a string address but got {address}")
+        self.write_output(self.strings[address.block])
+
+    def _jump(self, argument):
+        return argument
+
+    def _jz(self, argument):
+        if self.pop() == 0:
+            return argument
+        return None
+
+    def _start(self, _):
+        self.fp = len(self.stack)
+        self.stack.extend(self.initial_stack)
+
+    def _stop(self, _):
+        self.halted = True
+
+    def _nop(self, _):
+        pass
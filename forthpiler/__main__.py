@@ -1,22 +1,29 @@
+import os
+import sys
 from enum import Enum
-
-from prompt_toolkit import ANSI, PromptSession, print_formatted_text
-from prompt_toolkit.patch_stdout import patch_stdout
+from pathlib import Path
+from typing import Optional
 
 import forthpiler.syntax as ast
-from ewvmapi.ewvm_api import run_code
-from forthpiler.ewvm_translator import EWVMTranslator
-from forthpiler.lexer import ForthLex
-from forthpiler.parser import ForthParser
-from forthpiler.visualizer import visualize
+from forthpiler.modules import default_cache_directory
+from forthpiler.session import Session, SessionError
+from forthpiler.stats import Stats, code_counts, count_nodes, count_tokens, measured
+from forthpiler.warmup import Warmup
+
+# The prompt, the EWVM client, graphviz and the profiler are slow to import,
+# so they are only imported once the mode that needs them is first used
+
+PROFILE_OUTPUT = Path("profile/result.folded")
 
 
 def print_red(text: str) -> None:
+    from prompt_toolkit import ANSI, print_formatted_text
+
     print_formatted_text(ANSI(f"\x1b[31m{text}"))
 
 
 class InterpretingMode(Enum):
-    PARSE, TRANSLATE, RUN, VISUALIZE = range(4)
+    PARSE, TRANSLATE, RUN, VISUALIZE, PROFILE, CFG = range(6)
 
     def get_prefix(self):
         match self:
@@ -28,38 +35,111 @@ class InterpretingMode(Enum):
                 return "run >> "
             case InterpretingMode.VISUALIZE:
                 return "visualize >> "
-
-    def run_action(self, result: ast.AbstractSyntaxTree, standard_lib_words: list[ast.Word]):
+            case InterpretingMode.PROFILE:
+                return "profile >> "
+            case InterpretingMode.CFG:
+                return "cfg >> "
+
+    def run_action(
+        self,
+        result: ast.AbstractSyntaxTree,
+        warmup: Warmup,
+        stats: Optional[Stats] = None,
+    ):
         match self:
             case InterpretingMode.PARSE:
                 print(result.__repr__())
             case InterpretingMode.TRANSLATE:
-                print("\n".join(
-                    EWVMTranslator(standard_lib_words).translate(result)
-                ))
+                code = translate(result, warmup.session, stats, standalone=True)
+                print("\n".join(code))
             case InterpretingMode.RUN:
-                print(run_code(
-                        "\n".join(
-                            EWVMTranslator(standard_lib_words).translate(result)
+                code = translate(result, warmup.session, stats)
+                with measured(stats, "run") as phase:
+                    output = warmup.session.execute(code)
+                    if phase:
+                        phase.count(
+                            steps=warmup.session.vm.usage.steps, output=len(output)
                         )
-                ))
+                print(output)
             case InterpretingMode.VISUALIZE:
+                from forthpiler.visualizer import visualize
+
                 visualize(result)
+            case InterpretingMode.PROFILE:
+                from forthpiler.profiler import profile_session
+
+                report, translation = profile_session(warmup.session, result)
+                print(report.output)
+                print(report.format())
+                print(translation.format())
+                output = Path(
+                    os.environ.get("FORTHPILER_PROFILE_OUTPUT", PROFILE_OUTPUT)
+                )
+                report.write_collapsed_stacks(str(output))
+                print(f"Collapsed stacks written to {output}")
+            case InterpretingMode.CFG:
+                from forthpiler.cfg import session_control_flow_graph
+                from forthpiler.visualizer import has_display
+
+                cfg = session_control_flow_graph(warmup.session, result)
+                if cfg.error is not None:
+                    print_red(f"Run failed, counts stop at the error: {cfg.error}")
+                cfg.to_graphviz().render("visualize/cfg", view=has_display())
+
+
+def translate(
+    result: ast.AbstractSyntaxTree,
+    session: Session,
+    stats: Optional[Stats],
+    standalone: bool = False,
+) -> list[str]:
+    with measured(stats, "translate") as phase:
+        if standalone:
+            code = session.translate_program(result)
+        else:
+            code = session.translate(result)
+        if phase:
+            phase.count(**code_counts(code))
+    return code
 
 
 def main():
-    lexer = ForthLex().build()
-    parser = ForthParser(lexer)
+    if sys.argv[1:2] == ["compile"]:
+        from forthpiler.compiler import main as compile_main
+
+        sys.exit(compile_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["daemon"]:
+        from forthpiler.daemon import main as daemon_main
+
+        sys.exit(daemon_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["visualize"]:
+        from forthpiler.visualizer import main as visualize_main
+
+        sys.exit(visualize_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["cfg"]:
+        from forthpiler.cfg import main as cfg_main
+
+        sys.exit(cfg_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["memory"]:
+        from forthpiler.memory import main as memory_main
+
+        sys.exit(memory_main(sys.argv[2:]))
 
-    commands = ("/parse", "/run", "/translate", "/visualize")
+    # The parser, the standard library and the session are built while the
+    # prompt is imported and the user types the first input
+    warmup = Warmup(default_cache_directory())
+
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+
+    commands = ("/parse", "/run", "/translate", "/visualize", "/profile", "/cfg")
     mode = InterpretingMode.TRANSLATE
     print(f"Starting in {mode.name}.")
     print(f"Change to other interpreter modes with {', '.join(commands)}")
-
-    standard_lib_words = [("spaces", "0 DO SPACE LOOP")]
-    standard_lib_words = [
-        ast.Word(name, parser.parse(f)) for (name, f) in standard_lib_words
-    ]
+    print("Save and restore the session with /save <file> and /restore <file>")
+    print("Show word dependencies with /uses <word> and /who-uses <word>")
+    print("Toggle timing and counts of every phase with /stats")
+    show_stats = "--stats" in sys.argv[1:]
 
     session = PromptSession()
     with patch_stdout():
@@ -73,15 +153,64 @@ def main():
                 mode = InterpretingMode[s[1:].upper()]
                 print(f"Mode changed to {mode.name}")
                 continue
+            if s == "/stats":
+                show_stats = not show_stats
+                print(f"Stats {'on' if show_stats else 'off'}")
+                continue
 
-            result: ast.AbstractSyntaxTree = parser.parse(s)
+            match s.split(maxsplit=1):
+                case ["/save", path]:
+                    try:
+                        warmup.session.save(Path(path))
+                        print(f"Session saved to {path}")
+                    except OSError as e:
+                        print_red(str(e))
+                    continue
+                case ["/restore", path]:
+                    try:
+                        warmup.session = Session.restore(
+                            Path(path),
+                            warmup.standard_lib_words,
+                            modules=warmup.modules,
+                        )
+                        print(f"Session restored from {path}")
+                    except (OSError, SessionError) as e:
+                        print_red(str(e))
+                    continue
+                case ["/uses" | "/who-uses" as query, word]:
+                    translator = warmup.session.translator
+                    word = word.lower()
+                    if word not in translator.user_defined_words:
+                        print_red(f"Word '{word}' not defined")
+                    elif query == "/uses":
+                        print(" ".join(sorted(translator.uses(word))))
+                    else:
+                        print(" ".join(sorted(translator.who_uses(word))))
+                    continue
+
+            stats = Stats() if show_stats else None
+            parser = warmup.parser
+            if stats is not None:
+                with stats.phase("lex") as phase:
+                    phase.count(tokens=count_tokens(parser.lexer, s))
+
+            with measured(stats, "parse") as phase:
+                result: ast.AbstractSyntaxTree = parser.parse(s)
+                if phase and result:
+                    phase.count(bytes=len(s), nodes=count_nodes(result))
 
             if result:
                 try:
-                    mode.run_action(result, standard_lib_words)
+                    result = warmup.session.resolve(result)
+                    mode.run_action(result, warmup, stats)
+                except KeyboardInterrupt:
+                    print_red("Interrupted, the session is as it was before the input")
+                    continue
                 except Exception as e:
                     print_red(str(e))
                     continue
+                if stats is not None:
+                    print(stats.format())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+import functools
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from forthpiler.compiler import CompileResult, compile_files, content_hash
+from forthpiler.modules import standard_library
+
+BUILD_FORMAT = 2
+# Modules whose code decides what a source translates to
+TOOLCHAIN_MODULES = (
+    "lexer.py",
+    "parser.py",
+    "syntax.py",
+    "ewvm_translator.py",
+    "source_map.py",
+    "modules.py",
+)
+
+
+@functools.cache
+def toolchain_hash() -> str:
+    parts = [str(BUILD_FORMAT)]
+    for module in TOOLCHAIN_MODULES:
+        parts.append(content_hash((Path(__file__).parent / module).read_bytes()))
+    return content_hash("\0".join(parts).encode())
+
+
+def library_hashes() -> Dict[str, str]:
+    return {
+        word.name: content_hash(repr(word.ast).encode()) for word in standard_library()
+    }
+
+
+@dataclass
+class BuildEntry:
+    source_hash: str
+    defined: List[str]
+    used: List[str]
+    # Hashes of the definitions the source uses from outside of it
+    dependencies: Dict[str, str]
+    # Hashes of the files it includes
+    includes: Dict[str, str]
+    output: str
+    output_hash: str
+    key: str
+
+
+@dataclass
+class BuildReport:
+    up_to_date: List[Path] = field(default_factory=list)
+    restored: List[Path] = field(default_factory=list)
+    results: List[CompileResult] = field(default_factory=list)
+
+    @property
+    def compiled(self) -> List[CompileResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[CompileResult]:
+        return [result for result in self.results if not result.ok]
+
+
+class IncrementalBuild:
+    # Remembers, for every source, the hash of its contents, the words it
+    # defines and uses and the hash of its output, and keeps a copy of each
+    # output in the build directory addressed by a key over all of those
+    # inputs. A rebuild only translates sources whose key changed, and
+    # restores outputs that were deleted or edited from the copies.
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self.objects = self.directory / "objects"
+        self.library = library_hashes()
+        self.entries: Dict[str, BuildEntry] = self._load()
+
+    def run(
+        self,
+        jobs: Sequence[Tuple[Path, Path]],
+        workers: Optional[int] = None,
+        module_cache_dir: Optional[Path] = None,
+        stats: bool = False,
+        stats_memory: bool = False,
+    ) -> BuildReport:
+        report = BuildReport()
+        stale = []
+        for source, output in jobs:
+            entry = self.entries.get(str(source))
+            if entry is None or not self._is_current(entry, source, output):
+                stale.append((source, output))
+            elif _file_hash(output) == entry.output_hash:
+                report.up_to_date.append(source)
+            elif self._restore(entry, output):
+                report.restored.append(source)
+            else:
+                stale.append((source, output))
+
+        for result in compile_files(
+            stale, workers, module_cache_dir, stats, stats_memory
+        ):
+            report.results.append(result)
+            if result.ok:
+                self._record(result)
+            else:
+                self.entries.pop(str(result.source), None)
+
+        self._save()
+        return report
+
+    def key(
+        self, source_hash: str, dependencies: Dict[str, str], includes: Dict[str, str]
+    ) -> str:
+        inputs = [
+            toolchain_hash(),
+            source_hash,
+            sorted(dependencies.items()),
+            sorted(includes.items()),
+        ]
+        return content_hash(json.dumps(inputs).encode())
+
+    def dependencies(
+        self, used: Iterable[str], defined: Iterable[str]
+    ) -> Dict[str, str]:
+        external = set(used) - set(defined)
+        return {
+            name: self.library[name] for name in sorted(external & self.library.keys())
+        }
+
+    def _is_current(self, entry: BuildEntry, source: Path, output: Path) -> bool:
+        if entry.output != str(output):
+            return False
+        source_hash = _file_hash(source)
+        dependencies = self.dependencies(entry.used, entry.defined)
+        includes = {path: _file_hash(Path(path)) for path in entry.includes}
+        return entry.key == self.key(source_hash, dependencies, includes)
+
+    def _record(self, result: CompileResult) -> None:
+        dependencies = self.dependencies(result.used, result.defined)
+        includes = dict(result.includes)
+        entry = BuildEntry(
+            result.source_hash,
+            list(result.defined),
+            list(result.used),
+            dependencies,
+            includes,
+            str(result.output),
+            result.output_hash,
+            self.key(result.source_hash, dependencies, includes),
+        )
+        self.entries[str(result.source)] = entry
+
+        self.objects.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(result.output, self._object(entry.key))
+
+    def _restore(self, entry: BuildEntry, output: Path) -> bool:
+        saved = self._object(entry.key)
+        if _file_hash(saved) != entry.output_hash:
+            return False
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(saved, output)
+        return True
+
+    def _object(self, key: str) -> Path:
+        return self.objects / f"{key}.ewvm"
+
+    def _load(self) -> Dict[str, BuildEntry]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        # Everything is stale once the compiler itself changed
+        if manifest.get("toolchain") != toolchain_hash():
+            return {}
+        return {
+            source: BuildEntry(**entry) for source, entry in manifest["files"].items()
+        }
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "toolchain": toolchain_hash(),
+            "files": {source: asdict(entry) for source, entry in self.entries.items()},
+        }
+        temporary = self.manifest_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(manifest, indent=1))
+        os.replace(temporary, self.manifest_path)
+
+        # Outputs that no source refers to anymore are dropped
+        keys = {entry.key for entry in self.entries.values()}
+        if self.objects.is_dir():
+            for saved in self.objects.iterdir():
+                if saved.stem not in keys:
+                    saved.unlink(missing_ok=True)
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    try:
+        return content_hash(path.read_bytes())
+    except OSError:
+        return None
@@ -0,0 +1,398 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import forthpiler.syntax as ast
+
+C_RUNTIME = r"""#include <stdio.h>
+#include <stdlib.h>
+
+#define STACK_SIZE 1048576
+#define LOOP_DEPTH 4096
+
+static long long stack[STACK_SIZE];
+static long long sp = 0;
+static long long loops[LOOP_DEPTH][3];
+static long long lp = 0;
+
+static void fail(const char *message) {
+    fflush(stdout);
+    fprintf(stderr, "%s\n", message);
+    exit(1);
+}
+
+static inline void push(long long value) {
+    if (sp >= STACK_SIZE) fail("Stack overflow");
+    stack[sp++] = value;
+}
+
+static inline long long pop(void) {
+    if (sp <= 0) fail("Stack underflow");
+    return stack[--sp];
+}
+
+static inline long long peek(long long depth) {
+    if (sp <= depth) fail("Stack underflow");
+    return stack[sp - 1 - depth];
+}
+
+static inline long long divide(long long a, long long b) {
+    if (b == 0) fail("Division by zero");
+    return a / b;
+}
+
+static inline long long modulo(long long a, long long b) {
+    if (b == 0) fail("Division by zero");
+    return a % b;
+}
+
+static inline long long *enter_loop(void) {
+    if (lp >= LOOP_DEPTH) fail("Loop nesting too deep");
+    long long start = pop();
+    long long limit = pop();
+    loops[lp][0] = limit;
+    loops[lp][1] = start;
+    loops[lp][2] = start;
+    return loops[lp++];
+}
+
+static inline void leave_loop(void) {
+    lp--;
+}
+
+static inline long long loop_index(long long depth) {
+    if (lp <= depth) fail("Loop index used outside of a loop");
+    return loops[lp - 1 - depth][1];
+}
+"""
+
+
+class CBackendError(Exception):
+    pass
+
+
+def indent(lines: List[str]) -> List[str]:
+    return [f"    {line}" for line in lines]
+
+
+def c_string(content: str) -> str:
+    escaped = []
+    for char in content:
+        # Question marks are escaped so that no trigraph, like ??! for |, is
+        # replaced in C99
+        if char in '\\"?':
+            escaped.append(f"\\{char}")
+        elif char.isascii() and char.isprintable():
+            escaped.append(char)
+        else:
+            escaped.extend(f"\\{byte:03o}" for byte in char.encode())
+    return f'"{"".join(escaped)}"'
+
+
+class CTranslator(ast.Translator[List[str]]):
+    def __init__(self, standard_lib_words: List[ast.Word]):
+        self.predefined_words: Dict[str, List[str]] = {
+            ".": ['printf("%lld", pop());'],
+            "emit": ["putchar((int) pop());"],
+            "space": ["putchar(' ');"],
+            "cr": ["putchar('\\n');"],
+            "swap": ["{ long long b = pop(), a = pop(); push(b); push(a); }"],
+            "dup": ["push(peek(0));"],
+            "2dup": ["{ long long b = peek(0), a = peek(1); push(a); push(b); }"],
+            "drop": ["pop();"],
+            "i": ["push(loop_index(0));"],
+            "j": ["push(loop_index(1));"],
+        }
+        self.user_defined_words: Dict[str, str] = {}
+        self.word_definitions: List[str] = []
+
+        self.declared_entities_counter = 0
+        self.user_declared_variables: Dict[str, int] = {}
+        self.user_declared_constants: Dict[str, int] = {}
+
+        self.loop_counter = 0
+        self.loop_depth = 0
+
+        for standard_lib_word in standard_lib_words:
+            self.visit_word(standard_lib_word)
+
+    def visit_number(self, number: ast.Number) -> List[str]:
+        return [f"push({number.number}LL);"]
+
+    def visit_operator(self, operator: ast.Operator) -> List[str]:
+        match operator.operator_type:
+            case ast.OperatorType.PLUS:
+                return self._binary("a + b")
+            case ast.OperatorType.MINUS:
+                return self._binary("a - b")
+            case ast.OperatorType.TIMES:
+                return self._binary("a * b")
+            case ast.OperatorType.DIVIDE:
+                return self._binary("divide(a, b)")
+            case ast.OperatorType.MOD:
+                return self._binary("modulo(a, b)")
+            case ast.OperatorType.SLASH_MOD:
+                return [
+                    "{ long long b = pop(), a = pop(); "
+                    "push(modulo(a, b)); push(divide(a, b)); }"
+                ]
+
+    def visit_comparison_operator(
+        self, comparison_operator: ast.ComparisonOperator
+    ) -> List[str]:
+        match comparison_operator.comparison_operator_type:
+            case ast.ComparisonOperatorType.EQUALS:
+                return self._binary("a == b")
+            case ast.ComparisonOperatorType.NOT_EQUALS:
+                return self._binary("a != b")
+            case ast.ComparisonOperatorType.LESS_THAN:
+                return self._binary("a < b")
+            case ast.ComparisonOperatorType.LESS_THAN_OR_EQUAL_TO:
+                return self._binary("a <= b")
+            case ast.ComparisonOperatorType.GREATER_THAN:
+                return self._binary("a > b")
+            case ast.ComparisonOperatorType.GREATER_THAN_OR_EQUAL_TO:
+                return self._binary("a >= b")
+            case ast.ComparisonOperatorType.ZERO_EQUALS:
+                return ["push(pop() == 0);"]
+            case ast.ComparisonOperatorType.ZERO_LESS_THAN:
+                return ["push(pop() < 0);"]
+            case ast.ComparisonOperatorType.ZERO_LESS_THAN_OR_EQUAL_TO:
+                return ["push(pop() <= 0);"]
+            case ast.ComparisonOperatorType.ZERO_GREATER_THAN:
+                return ["push(pop() > 0);"]
+            case ast.ComparisonOperatorType.ZERO_GREATER_THAN_OR_EQUAL_TO:
+                return ["push(pop() >= 0);"]
+
+    def visit_word(self, word: ast.Word) -> List[str]:
+        if word.name in self.user_defined_words:
+            raise ast.TranslationError(f"Word '{word.name}' already defined")
+
+        # Unlike the EWVM backend, words are not inlined but become C
+        # functions, since the loop indexes live in a runtime loop stack
+        function_name = f"word_{len(self.user_defined_words)}"
+        body = word.ast.evaluate(self)
+        self.word_definitions += [
+            f"/* {word.name} */",
+            f"static void {function_name}(void) {{",
+            *indent(body),
+            "}",
+            "",
+        ]
+        self.user_defined_words[word.name] = function_name
+        return []
+
+    def visit_do_loop_statement(self, do_loop: ast.DoLoopStatement) -> List[str]:
+        loop = self._enter_loop()
+        body = do_loop.body.evaluate(self)
+        self.loop_depth -= 1
+
+        return [
+            "{",
+            f"    long long *{loop} = enter_loop();",
+            f"    while ({loop}[1] < {loop}[0]) {{",
+            *indent(indent(body)),
+            f"        {loop}[1] += 1;",
+            "    }",
+            "    leave_loop();",
+            "}",
+        ]
+
+    def visit_do_plus_loop_statement(
+        self, do_loop: ast.DoPlusLoopStatement
+    ) -> List[str]:
+        loop = self._enter_loop()
+        body = do_loop.body.evaluate(self)
+        self.loop_depth -= 1
+
+        # Counting up while the limit is above the start and down otherwise,
+        # like the EWVM translation does
+        return [
+            "{",
+            f"    long long *{loop} = enter_loop();",
+            f"    while ({loop}[0] > {loop}[2] ? {loop}[0] > {loop}[1] : {loop}[0] < {loop}[1]) {{",
+            *indent(indent(body)),
+            f"        {loop}[1] += pop();",
+            "    }",
+            "    leave_loop();",
+            "}",
+        ]
+
+    def visit_begin_until_statement(
+        self, begin_until: ast.BeginUntilStatement
+    ) -> List[str]:
+        body = begin_until.body.evaluate(self)
+
+        return ["do {", *indent(body), "} while (pop() == 0);"]
+
+    def visit_begin_again_statement(
+        self, begin_again: ast.BeginAgainStatement
+    ) -> List[str]:
+        body = begin_again.body.evaluate(self)
+
+        return ["for (;;) {", *indent(body), "}"]
+
+    def visit_if_statement(self, if_statement: ast.IfStatement) -> List[str]:
+        code = ["if (pop() != 0) {", *indent(if_statement.if_true.evaluate(self))]
+        if if_statement.with_else:
+            code += ["} else {", *indent(if_statement.if_false.evaluate(self))]
+
+        return code + ["}"]
+
+    def visit_variable_declaration(
+        self, variable_declaration: ast.VariableDeclaration
+    ) -> List[str]:
+        self.user_declared_variables[
+            variable_declaration.name
+        ] = self.declared_entities_counter
+        self.declared_entities_counter += 1
+
+        return []
+
+    def visit_constant_declaration(
+        self, constant_declaration: ast.ConstantDeclaration
+    ) -> List[str]:
+        variable_index = self.declared_entities_counter
+        self.declared_entities_counter += 1
+
+        self.user_declared_constants[constant_declaration.name] = variable_index
+
+        return [f"globals[{variable_index}] = pop();"]
+
+    def visit_store_variable(self, store_variable: ast.StoreVariable) -> List[str]:
+        if store_variable.name in self.user_declared_constants:
+            raise ast.TranslationError(
+                f"Cannot reassign a value to constant '{store_variable.name}'"
+            )
+        if store_variable.name not in self.user_declared_variables:
+            raise ast.TranslationError(f"Variable '{store_variable.name}' not declared")
+
+        variable_index = self.user_declared_variables[store_variable.name]
+
+        return [f"globals[{variable_index}] = pop();"]
+
+    def visit_fetch_variable(self, fetch_variable: ast.FetchVariable) -> List[str]:
+        if fetch_variable.name not in self.user_declared_variables:
+            raise ast.TranslationError(f"Variable '{fetch_variable.name}' not declared")
+
+        variable_index = self.user_declared_variables[fetch_variable.name]
+
+        return [f"push(globals[{variable_index}]);"]
+
+    def visit_literal(self, literal: ast.Literal) -> List[str]:
+        value = literal.content.lower()
+
+        if value == "j" and self.loop_depth < 2:
+            raise ast.TranslationError("'j' is only allowed inside a nested loop")
+
+        if value in self.user_defined_words:
+            return [f"{self.user_defined_words[value]}();"]
+
+        if value in self.predefined_words:
+            return self.predefined_words[value]
+
+        if value in self.user_declared_constants:
+            variable_index = self.user_declared_constants[value]
+            return [f"push(globals[{variable_index}]);"]
+
+        if value in self.user_declared_variables:
+            raise ast.TranslationError(f"Bad use of variable '{value}'")
+
+        raise ast.TranslationError(f"Literal '{value}' not found")
+
+    def visit_print_string(self, print_string: ast.PrintString) -> List[str]:
+        return [f"fputs({c_string(print_string.content)}, stdout);"]
+
+    def visit_char_word(self, char_word: ast.CharWord) -> List[str]:
+        return [f"push({char_word.char_code}LL);"]
+
+    def visit_include(self, include: ast.Include) -> List[str]:
+        raise ast.TranslationError(f"File '{include.path}' was not included")
+
+    def visit_ast(self, ast: ast.AbstractSyntaxTree) -> List[str]:
+        return [res for expr in ast.expressions for res in expr.evaluate(self)]
+
+    def translate(self, ast: ast.AbstractSyntaxTree) -> List[str]:
+        body = ast.evaluate(self)
+
+        total_variables = max(self.declared_entities_counter, 1)
+        return [
+            C_RUNTIME,
+            f"static long long globals[{total_variables}];",
+            "",
+            *self.word_definitions,
+            "int main(void) {",
+            *indent(body),
+            "    fflush(stdout);",
+            "    return 0;",
+            "}",
+        ]
+
+    def _binary(self, expression: str) -> List[str]:
+        return [f"{{ long long b = pop(), a = pop(); push({expression}); }}"]
+
+    def _enter_loop(self) -> str:
+        self.loop_depth += 1
+        current_loop_counter = self.loop_counter
+        self.loop_counter += 1
+        return f"loop{current_loop_counter}"
+
+
+class CBackend:
+    def __init__(
+        self,
+        standard_lib_words: List[ast.Word],
+        cache_dir: Optional[Path] = None,
+        compiler: Optional[str] = None,
+    ):
+        self.standard_lib_words = standard_lib_words
+        self.cache_dir = cache_dir or Path(tempfile.gettempdir()) / "forthpiler-c"
+        self.compiler = compiler or os.environ.get("CC", "cc")
+        self.flags = ["-O2", "-std=c99", "-w"]
+
+    def source_hash(self, source: str) -> str:
+        # The generated C, runtime included, is what gets compiled, so any
+        # change to the translator also changes the key
+        key = "\n".join([self.compiler, " ".join(self.flags), source])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def build(self, ast: ast.AbstractSyntaxTree) -> Path:
+        source = "\n".join(CTranslator(self.standard_lib_words).translate(ast))
+        executable = self.cache_dir / self.source_hash(source)
+        if executable.exists():
+            return executable
+
+        compiler = shutil.which(self.compiler)
+        if compiler is None:
+            raise CBackendError(f"C compiler '{self.compiler}' not found")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as build_dir:
+            source_path = Path(build_dir) / "program.c"
+            source_path.write_text(source)
+            output_path = Path(build_dir) / "program"
+
+            result = subprocess.run(
+                [compiler, *self.flags, "-o", str(output_path), str(source_path)],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise CBackendError(f"C compilation failed:\n{result.stderr}")
+
+            # Renaming is atomic, so concurrent builds never see half a binary
+            os.replace(output_path, executable)
+
+        return executable
+
+    def run(self, ast: ast.AbstractSyntaxTree, timeout: Optional[float] = None) -> str:
+        result = subprocess.run(
+            [str(self.build(ast))], capture_output=True, text=True, timeout=timeout
+        )
+        if result.returncode != 0:
+            raise CBackendError(result.stderr.strip() or "Program failed")
+        return result.stdout
@@ -0,0 +1,219 @@
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import graphviz
+
+import forthpiler.syntax as ast
+from ewvmapi.vm import EWVM, ExecutionLimits, Program, VMError
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.session import Session
+
+# Long blocks only show their first and last instructions
+SHOWN_INSTRUCTIONS = 12
+# Profiling runs for the CFG must not hang the REPL
+PROFILE_LIMITS = ExecutionLimits(max_steps=50_000_000)
+
+
+@dataclass
+class BasicBlock:
+    index: int
+    start: int
+    end: int
+    labels: List[str] = field(default_factory=list)
+    # Block index and kind of edge: "jump", "taken", "not taken" or "next"
+    successors: List[Tuple[int, str]] = field(default_factory=list)
+    count: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return self.labels[0] if self.labels else f"block{self.index}"
+
+    def __len__(self):
+        return self.end - self.start
+
+
+class ControlFlowGraph:
+    # Basic blocks of an EWVM program. A block starts at the first
+    # instruction, at every jump target and after every jump or stop
+    def __init__(self, program: Program):
+        self.program = program
+        # Set when the profiling run failed, the counts stop at the error
+        self.error: Optional[VMError] = None
+        instructions = program.instructions
+
+        self.label_names: Dict[int, List[str]] = {}
+        for label, index in program.labels.items():
+            self.label_names.setdefault(index, []).append(label)
+
+        leaders = {0}
+        for index, instruction in enumerate(instructions):
+            match instruction.opcode:
+                case "jump" | "jz":
+                    leaders.add(instruction.argument)
+                    leaders.add(index + 1)
+                case "stop":
+                    leaders.add(index + 1)
+        starts = sorted(leader for leader in leaders if leader < len(instructions))
+
+        self.blocks: List[BasicBlock] = []
+        self.block_at: Dict[int, int] = {}
+        for number, start in enumerate(starts):
+            end = starts[number + 1] if number + 1 < len(starts) else len(instructions)
+            self.block_at[start] = number
+            self.blocks.append(
+                BasicBlock(number, start, end, self.label_names.get(start, []))
+            )
+
+        for block in self.blocks:
+            last = instructions[block.end - 1]
+            following = self.block_at.get(block.end)
+            match last.opcode:
+                case "jump":
+                    block.successors.append((self.block_at[last.argument], "jump"))
+                case "jz":
+                    block.successors.append((self.block_at[last.argument], "taken"))
+                    if following is not None:
+                        block.successors.append((following, "not taken"))
+                case "stop":
+                    pass
+                case _:
+                    if following is not None:
+                        block.successors.append((following, "next"))
+
+    def add_profile(self, instruction_counts: Sequence[int]) -> None:
+        # Every instruction of a block runs as often as its first one
+        for block in self.blocks:
+            block.count = instruction_counts[block.start]
+
+    def instruction_text(self, index: int) -> str:
+        instruction = self.program.instructions[index]
+        if instruction.opcode in ("jump", "jz"):
+            return f"{instruction.opcode} {self.label_names[instruction.argument][0]}"
+        return repr(instruction)
+
+    def to_graphviz(self) -> graphviz.Digraph:
+        graph = graphviz.Digraph(comment="EWVM control-flow graph")
+        graph.attr("node", shape="box", fontname="monospace")
+
+        counts = [block.count for block in self.blocks if block.count is not None]
+        hottest = max(counts, default=0) or 1
+        for block in self.blocks:
+            attributes = {}
+            if block.count is not None:
+                # White for blocks that never ran, red for the hottest one
+                heat = block.count / hottest
+                attributes = {"style": "filled", "fillcolor": f"0.0 {heat:.3f} 1.0"}
+            graph.node(str(block.index), self._label(block), **attributes)
+
+        for block in self.blocks:
+            for successor, kind in block.successors:
+                style = "dashed" if kind == "not taken" else "solid"
+                label = kind if kind in ("taken", "not taken") else ""
+                graph.edge(str(block.index), str(successor), label, style=style)
+        return graph
+
+    def _label(self, block: BasicBlock) -> str:
+        indexes = list(range(block.start, block.end))
+        if len(indexes) > SHOWN_INSTRUCTIONS:
+            half = SHOWN_INSTRUCTIONS // 2
+            hidden = len(indexes) - 2 * half
+            lines = [self.instruction_text(i) for i in indexes[:half]]
+            lines.append(f"... {hidden} more")
+            lines += [self.instruction_text(i) for i in indexes[-half:]]
+        else:
+            lines = [self.instruction_text(i) for i in indexes]
+
+        title = block.name
+        if block.count is not None:
+            title += f" (executed {block.count}x)"
+        return "\\l".join([title, *lines]) + "\\l"
+
+
+def control_flow_graph(
+    result: ast.AbstractSyntaxTree,
+    standard_lib_words: List[ast.Word],
+    run: bool = True,
+    limits: ExecutionLimits = PROFILE_LIMITS,
+) -> ControlFlowGraph:
+    translator = EWVMTranslator(standard_lib_words)
+    program = Program("\n".join(translator.translate(result)))
+    cfg = ControlFlowGraph(program)
+
+    if run:
+        vm = EWVM(program, limits, translator.source_map)
+        try:
+            vm.run(profile=True)
+        except VMError as e:
+            cfg.error = e
+        # A failed run still tells which blocks were reached
+        cfg.add_profile(vm.instruction_counts)
+    return cfg
+
+
+def session_control_flow_graph(
+    session: Session,
+    result: ast.AbstractSyntaxTree,
+    limits: ExecutionLimits = PROFILE_LIMITS,
+) -> ControlFlowGraph:
+    # The graph of an input of a REPL session, which can use the words and
+    # variables of the earlier inputs and keeps what it defines
+    code = session.translate(result)
+    cfg = ControlFlowGraph(Program("\n".join(code)))
+    try:
+        session.execute(code, profile=True, limits=limits)
+    except VMError as e:
+        cfg.error = e
+    cfg.add_profile(session.vm.instruction_counts)
+    return cfg
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler cfg",
+        description="Draw the control-flow graph of the EWVM code of a Forth program",
+    )
+    parser.add_argument("source", type=Path)
+    parser.add_argument(
+        "-o", "--output", help="without extension, next to the source by default"
+    )
+    parser.add_argument("-T", "--format", default="svg")
+    parser.add_argument(
+        "--no-run",
+        dest="run",
+        action="store_false",
+        help="do not run the program to colour blocks by execution counts",
+    )
+    args = parser.parse_args(argv)
+
+    from forthpiler.compiler import Compiler
+    from forthpiler.visualizer import has_display
+
+    compiler = Compiler()
+    try:
+        tree = compiler.parse(
+            args.source.read_text(), str(args.source), args.source.parent
+        )
+        cfg = control_flow_graph(tree, compiler.standard_lib_words, args.run)
+    except (OSError, UnicodeDecodeError, VMError, ast.TranslationError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if cfg.error is not None:
+        print(f"Run failed, counts stop at the error: {cfg.error}", file=sys.stderr)
+
+    graph = cfg.to_graphviz()
+    graph.format = args.format
+    output = args.output or str(args.source.with_suffix(""))
+    try:
+        rendered = graph.render(output + ".cfg", view=has_display())
+    except (graphviz.ExecutableNotFound, graphviz.CalledProcessError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{len(cfg.blocks)} blocks rendered to {rendered}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
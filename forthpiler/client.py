@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence
+
+# Only the standard library is imported here, so that the client starts
+# as fast as Python does
+
+
+def default_socket_path() -> Path:
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(directory) / f"forthpiler-{os.getuid()}.sock"
+
+
+class CompileClientError(Exception):
+    pass
+
+
+class CompileClient:
+    def __init__(self, path: Optional[Path] = None, timeout: Optional[float] = 60.0):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(str(path or default_socket_path()))
+        except OSError as e:
+            self.socket.close()
+            raise CompileClientError(f"Compile daemon is not running: {e}")
+        self.stream = self.socket.makefile("rwb")
+
+    def request(self, op: str, **fields) -> dict:
+        self.stream.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise CompileClientError("Compile daemon closed the connection")
+        return json.loads(line)
+
+    def translate(self, code: str, directory: Path = Path(".")) -> str:
+        return self._checked(
+            self.request("translate", code=code, directory=str(directory.resolve()))
+        )["code"]
+
+    def run(self, code: str, directory: Path = Path(".")) -> str:
+        return self._checked(
+            self.request("run", code=code, directory=str(directory.resolve()))
+        )["output"]
+
+    def compile(self, source: Path, output: Path) -> dict:
+        return self.request(
+            "compile", source=str(source.resolve()), output=str(output.resolve())
+        )
+
+    def close(self) -> None:
+        self.stream.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @staticmethod
+    def _checked(response: dict) -> dict:
+        if not response["ok"]:
+            raise CompileClientError(response["error"])
+        return response
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler.client",
+        description="Compile Forth through a running `python -m forthpiler daemon`",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="translated to .ewvm files next to them; "
+        "without files the program on stdin is translated",
+    )
+    parser.add_argument("--socket", type=Path, default=default_socket_path())
+    parser.add_argument(
+        "--run", action="store_true", help="run the program on stdin instead"
+    )
+    parser.add_argument("--shutdown", action="store_true", help="stop the daemon")
+    args = parser.parse_args(argv)
+
+    try:
+        with CompileClient(args.socket) as client:
+            if args.shutdown:
+                client.request("shutdown")
+                return 0
+
+            if not args.files:
+                code = sys.stdin.read()
+                print(client.run(code) if args.run else client.translate(code))
+                return 0
+
+            failed = 0
+            for source in args.files:
+                response = client.compile(source, source.with_suffix(".ewvm"))
+                if not response["ok"]:
+                    failed += 1
+                    print(f"FAIL {source}: {response['error']}", file=sys.stderr)
+            return 1 if failed else 0
+    except CompileClientError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import forthpiler.syntax as ast
+from forthpiler.dependencies import WordUsage
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.modules import (
+    IncludeResolver,
+    ModuleCache,
+    default_cache_directory,
+    parse_source,
+    standard_library,
+)
+from forthpiler.parser import ForthParser
+from forthpiler.stats import Stats, code_counts, count_nodes, count_tokens, measured
+
+SOURCE_SUFFIX = ".fs"
+OUTPUT_SUFFIX = ".ewvm"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompileResult:
+    source: Path
+    output: Path
+    seconds: float
+    error: Optional[str] = None
+    source_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    defined: Tuple[str, ...] = ()
+    used: Tuple[str, ...] = ()
+    # Files the source included, with the hash of their contents
+    includes: Tuple[Tuple[str, str], ...] = ()
+    stats: Optional[Stats] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Compiler:
+    def __init__(
+        self, module_cache: Optional[ModuleCache] = None, stats: Optional[Stats] = None
+    ):
+        # Phase statistics are only collected when given a Stats, every
+        # compile() then starts a new one and returns it in its result
+        self.stats = stats
+        self.parser = ForthParser(ForthLex().build())
+        self.modules = module_cache or ModuleCache()
+        self.modules.parser = self.parser
+        self.standard_lib_words = standard_library(self.modules)
+
+    def parse(
+        self, code: str, filename: str = "<input>", directory: Path = Path(".")
+    ) -> ast.AbstractSyntaxTree:
+        return self.parse_with_includes(code, filename, directory)[0]
+
+    def parse_with_includes(
+        self, code: str, filename: str = "<input>", directory: Path = Path(".")
+    ) -> Tuple[ast.AbstractSyntaxTree, IncludeResolver]:
+        resolver = IncludeResolver(self.modules)
+        if self.stats is not None:
+            with self.stats.phase("lex") as phase:
+                phase.count(tokens=count_tokens(self.parser.lexer, code))
+            self.stats.measure_memory(
+                "lex", lambda: count_tokens(self.parser.lexer, code)
+            )
+
+        with measured(self.stats, "parse") as phase:
+            tree = parse_source(self.parser, code, filename)
+            tree = resolver.resolve(tree, directory)
+            if phase:
+                phase.count(bytes=len(code), nodes=count_nodes(tree))
+        if self.stats is not None:
+            self.stats.measure_memory(
+                "parse",
+                lambda: IncludeResolver(self.modules).resolve(
+                    parse_source(self.parser, code, filename), directory
+                ),
+            )
+        return tree, resolver
+
+    def translate(
+        self, code: str, filename: str = "<input>", directory: Path = Path(".")
+    ) -> str:
+        return self.translate_tree(self.parse(code, filename, directory))
+
+    def translate_tree(self, tree: ast.AbstractSyntaxTree) -> str:
+        with measured(self.stats, "translate") as phase:
+            code = EWVMTranslator(self.standard_lib_words).translate(tree)
+            if phase:
+                phase.count(**code_counts(code))
+        if self.stats is not None:
+            self.stats.measure_memory(
+                "translate",
+                lambda: EWVMTranslator(self.standard_lib_words).translate(tree),
+            )
+        return "\n".join(code)
+
+    def compile(self, source: Path, output: Path) -> CompileResult:
+        start = time.perf_counter()
+        if self.stats is not None:
+            self.stats = Stats(self.stats.memory)
+        try:
+            content = source.read_bytes()
+            tree, resolver = self.parse_with_includes(
+                content.decode(), str(source), source.parent
+            )
+            code = (self.translate_tree(tree) + "\n").encode()
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_bytes(code)
+        except (OSError, UnicodeDecodeError, ast.TranslationError) as e:
+            return CompileResult(
+                source, output, time.perf_counter() - start, str(e), stats=self.stats
+            )
+
+        usage = WordUsage.of(tree)
+        return CompileResult(
+            source,
+            output,
+            time.perf_counter() - start,
+            source_hash=content_hash(content),
+            output_hash=content_hash(code),
+            defined=tuple(sorted(usage.defined)),
+            used=tuple(sorted(usage.used)),
+            includes=tuple(sorted(resolver.dependencies.items())),
+            stats=self.stats,
+        )
+
+
+# Each worker process builds its own lexer and parser once and reuses them
+# for every file it is given
+worker_compiler: Optional[Compiler] = None
+
+
+def _start_worker(
+    module_cache_dir: Optional[Path], stats: bool, stats_memory: bool
+) -> None:
+    global worker_compiler
+    worker_compiler = Compiler(
+        ModuleCache(module_cache_dir), Stats(stats_memory) if stats else None
+    )
+
+
+def _compile_in_worker(job: Tuple[Path, Path]) -> CompileResult:
+    return worker_compiler.compile(*job)
+
+
+def find_sources(
+    paths: Sequence[Path], output_dir: Optional[Path] = None
+) -> List[Tuple[Path, Path]]:
+    # Pairs each source with its output: next to the source, or under
+    # `output_dir` keeping the layout of the directories that were given
+    jobs = []
+    for path in paths:
+        if path.is_dir():
+            sources = [
+                (source, source.relative_to(path))
+                for source in sorted(path.rglob(f"*{SOURCE_SUFFIX}"))
+            ]
+        else:
+            sources = [(path, Path(path.name))]
+
+        for source, relative in sources:
+            if output_dir is None:
+                output = source.with_suffix(OUTPUT_SUFFIX)
+            else:
+                output = output_dir / relative.with_suffix(OUTPUT_SUFFIX)
+            jobs.append((source, output))
+    return jobs
+
+
+def compile_files(
+    jobs: Sequence[Tuple[Path, Path]],
+    workers: Optional[int] = None,
+    module_cache_dir: Optional[Path] = None,
+    stats: bool = False,
+    stats_memory: bool = False,
+) -> Iterator[CompileResult]:
+    if not jobs:
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        compiler = Compiler(
+            ModuleCache(module_cache_dir), Stats(stats_memory) if stats else None
+        )
+        for source, output in jobs:
+            yield compiler.compile(source, output)
+        return
+
+    # Building the parser once here writes the parse tables before the
+    # workers start, so they only ever read them
+    ForthParser(ForthLex().build())
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_start_worker,
+        initargs=(module_cache_dir, stats, stats_memory),
+    ) as executor:
+        yield from executor.map(_compile_in_worker, jobs, chunksize=chunksize)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler compile",
+        description=f"Translate {SOURCE_SUFFIX} files to EWVM code",
+    )
+    parser.add_argument(
+        "paths", nargs="+", type=Path, help="Forth files or directories with them"
+    )
+    parser.add_argument("-o", "--output-dir", type=Path)
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="worker processes, one per core by default"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="only translate files whose source or dependencies changed",
+    )
+    parser.add_argument("--build-dir", type=Path, default=Path(".forthpiler-build"))
+    parser.add_argument(
+        "--module-cache",
+        type=Path,
+        default=default_cache_directory(),
+        help="where parsed included files are kept",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="report time and counts of every compilation phase",
+    )
+    parser.add_argument(
+        "--stats-memory",
+        action="store_true",
+        help="with --stats, also report the peak memory of every phase, "
+        "measured on a separate run of it",
+    )
+    parser.add_argument(
+        "--no-module-cache",
+        dest="module_cache",
+        action="store_const",
+        const=None,
+        help="parse included files again on every run",
+    )
+    args = parser.parse_args(argv)
+
+    args.stats = args.stats or args.stats_memory
+    jobs = find_sources(args.paths, args.output_dir)
+    start = time.perf_counter()
+    if args.incremental:
+        from forthpiler.build import IncrementalBuild
+
+        report = IncrementalBuild(args.build_dir).run(
+            jobs, args.jobs, args.module_cache, args.stats, args.stats_memory
+        )
+        results = report.results
+        print(f"{len(report.up_to_date)} up to date, {len(report.restored)} restored")
+    else:
+        results = compile_files(
+            jobs, args.jobs, args.module_cache, args.stats, args.stats_memory
+        )
+
+    compiled = failed = 0
+    stats = Stats()
+    for result in results:
+        if result.stats is not None:
+            stats.merge(result.stats)
+        compiled += result.ok
+        if not result.ok:
+            failed += 1
+            print(f"FAIL {result.source}: {result.error}", file=sys.stderr)
+        elif not args.quiet:
+            print(
+                f"ok   {result.source} -> {result.output} ({result.seconds * 1000:.1f} ms)"
+            )
+
+    print(
+        f"{compiled} compiled, {failed} failed "
+        f"in {time.perf_counter() - start:.2f} s"
+    )
+    if args.stats:
+        print(stats.format())
+    return 1 if failed or not jobs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
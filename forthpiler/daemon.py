@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+
+import forthpiler.syntax as ast
+from ewvmapi.vm import EWVM, ExecutionLimits, VMError
+from forthpiler.client import default_socket_path
+from forthpiler.compiler import Compiler
+from forthpiler.modules import ModuleCache, default_cache_directory
+
+# Programs run by the daemon must not keep it busy forever
+RUN_LIMITS = ExecutionLimits(max_steps=10_000_000, max_output_size=1_000_000)
+
+
+class CompileServerError(Exception):
+    pass
+
+
+def is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    # Every line a client sends is a JSON request, answered by one JSON line
+    server: "CompileServer"
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.answer(request)
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+            if response.get("shutdown"):
+                return
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Keeps a lexer, a parser, the translated standard library and the
+    # parsed included files warm between requests
+    daemon_threads = True
+
+    def __init__(self, path: Path, module_cache_dir: Optional[Path] = None):
+        self.path = Path(path)
+        # A socket file nobody listens on is left over by a daemon that died
+        if self.path.exists():
+            if is_listening(self.path):
+                raise CompileServerError(f"A daemon is already listening on {path}")
+            self.path.unlink()
+        super().__init__(str(self.path), CompileRequestHandler)
+
+        self.compiler = Compiler(ModuleCache(module_cache_dir))
+        # The parser and the module cache are not thread safe
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def answer(self, request: dict) -> dict:
+        op = request["op"]
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "requests": self.requests}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True, "shutdown": True}
+
+        try:
+            with self.lock:
+                self.requests += 1
+                response = self._compile(op, request)
+            # Only the translation needs the lock, the program runs while
+            # other requests are answered
+            if op == "run":
+                return {"ok": True, "output": EWVM(response["code"], RUN_LIMITS).run()}
+            return response
+        except (OSError, UnicodeDecodeError, ast.TranslationError, VMError) as e:
+            return {"ok": False, "error": str(e)}
+
+    def _compile(self, op: str, request: dict) -> dict:
+        match op:
+            case "translate" | "run":
+                code = self.compiler.translate(
+                    request["code"],
+                    request.get("filename", "<input>"),
+                    Path(request.get("directory", ".")),
+                )
+                return {"ok": True, "code": code}
+            case "compile":
+                result = self.compiler.compile(
+                    Path(request["source"]), Path(request["output"])
+                )
+                return {
+                    "ok": result.ok,
+                    "error": result.error,
+                    "output": str(result.output),
+                    "seconds": result.seconds,
+                }
+            case _:
+                return {"ok": False, "error": f"Unknown operation '{op}'"}
+
+    def server_close(self):
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler daemon",
+        description="Serve compile, translate and run requests on a Unix socket",
+    )
+    parser.add_argument("--socket", type=Path, default=default_socket_path())
+    parser.add_argument("--module-cache", type=Path, default=default_cache_directory())
+    args = parser.parse_args(argv)
+
+    try:
+        server = CompileServer(args.socket, args.module_cache)
+    except CompileServerError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Listening on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from typing import Set
+
+import forthpiler.syntax as ast
+
+
+class WordUsage(ast.Translator[None]):
+    # Names a program defines (words, variables and constants) and names it
+    # refers to, wherever they appear
+    def __init__(self):
+        self.defined: Set[str] = set()
+        self.used: Set[str] = set()
+
+    @classmethod
+    def of(cls, tree: ast.AbstractSyntaxTree) -> "WordUsage":
+        usage = cls()
+        usage.translate(tree)
+        return usage
+
+    @property
+    def external(self) -> Set[str]:
+        return self.used - self.defined
+
+    def visit_number(self, number: ast.Number) -> None:
+        pass
+
+    def visit_operator(self, operator: ast.Operator) -> None:
+        pass
+
+    def visit_comparison_operator(
+        self, comparison_operator: ast.ComparisonOperator
+    ) -> None:
+        pass
+
+    def visit_word(self, word: ast.Word) -> None:
+        self.defined.add(word.name)
+        word.ast.evaluate(self)
+
+    def visit_do_loop_statement(self, do_loop: ast.DoLoopStatement) -> None:
+        do_loop.body.evaluate(self)
+
+    def visit_do_plus_loop_statement(self, do_loop: ast.DoPlusLoopStatement) -> None:
+        do_loop.body.evaluate(self)
+
+    def visit_begin_until_statement(self, begin_until: ast.BeginUntilStatement) -> None:
+        begin_until.body.evaluate(self)
+
+    def visit_begin_again_statement(self, begin_again: ast.BeginAgainStatement) -> None:
+        begin_again.body.evaluate(self)
+
+    def visit_if_statement(self, if_statement: ast.IfStatement) -> None:
+        if_statement.if_true.evaluate(self)
+        if if_statement.with_else:
+            if_statement.if_false.evaluate(self)
+
+    def visit_variable_declaration(
+        self, variable_declaration: ast.VariableDeclaration
+    ) -> None:
+        self.defined.add(variable_declaration.name)
+
+    def visit_constant_declaration(
+        self, constant_declaration: ast.ConstantDeclaration
+    ) -> None:
+        self.defined.add(constant_declaration.name)
+
+    def visit_store_variable(self, store_variable: ast.StoreVariable) -> None:
+        self.used.add(store_variable.name)
+
+    def visit_fetch_variable(self, fetch_variable: ast.FetchVariable) -> None:
+        self.used.add(fetch_variable.name)
+
+    def visit_literal(self, literal: ast.Literal) -> None:
+        self.used.add(literal.content)
+
+    def visit_print_string(self, print_string: ast.PrintString) -> None:
+        pass
+
+    def visit_char_word(self, char_word: ast.CharWord) -> None:
+        pass
+
+    def visit_include(self, include: ast.Include) -> None:
+        pass
+
+    def visit_ast(self, ast: ast.AbstractSyntaxTree) -> None:
+        for expr in ast.expressions:
+            expr.evaluate(self)
+
+    def translate(self, ast: ast.AbstractSyntaxTree) -> None:
+        ast.evaluate(self)
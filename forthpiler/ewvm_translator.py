@@ -1,10 +1,11 @@
-from typing import Dict, List
+from typing import Dict, FrozenSet, List, Set
 
 import forthpiler.syntax as ast
+from forthpiler.source_map import EWVMInstruction, SourceMap, SourceOrigin, origin_of
 
 
 class EWVMTranslator(ast.Translator[List[str]]):
-    def __init__(self, standard_lib_words: List[ast.Word]):
+    def __init__(self, standard_lib_words: List[ast.Word], redefinable: bool = False):
         self.predefined_words: Dict[str, List[str]] = {
             ".": ["writei"],
             "emit": ["writechr"],
@@ -18,6 +19,13 @@ class EWVMTranslator(ast.Translator[List[str]]):
             "j": ["j"],
         }
         self.user_defined_words: Dict[str, List[str]] = {}
+        # Word bodies are inlined, so redefining a word has to translate again
+        # every word that embeds its old body
+        self.redefinable = redefinable
+        self.word_definitions: Dict[str, ast.Word] = {}
+        self.word_uses: Dict[str, FrozenSet[str]] = {}
+        self.word_users: Dict[str, FrozenSet[str]] = {}
+        self.current_uses: Set[str] = set()
 
         self.declared_entities_counter = 0
         self.user_declared_variables: Dict[str, int] = {}
@@ -28,6 +36,9 @@ class EWVMTranslator(ast.Translator[List[str]]):
         self.loop_depth = 0
         self.heap_counter = 0
 
+        self.current_words: List[str] = []
+        self.source_map = SourceMap()
+
         for standard_lib_word in standard_lib_words:
             self.predefined_words[standard_lib_word.name] = self.visit_word(
                 standard_lib_word
@@ -84,12 +95,69 @@ class EWVMTranslator(ast.Translator[List[str]]):
                 return ["pushi 0", "supeq"]
 
     def visit_word(self, word: ast.Word) -> List[str]:
-        if word.name in self.user_defined_words:
+        redefined = word.name in self.user_defined_words
+        if redefined and not self.redefinable:
             raise ast.TranslationError(f"Word '{word.name}' already defined")
 
-        self.user_defined_words[word.name] = word.ast.evaluate(self)
+        code = self._translate_word(word)
+        if redefined:
+            # The new definition may use words defined after the old one
+            del self.user_defined_words[word.name]
+        self.user_defined_words[word.name] = code
+
+        if redefined:
+            self.retranslate_users(word.name)
         return []
 
+    def uses(self, name: str, transitive: bool = False) -> Set[str]:
+        return self._reachable(self.word_uses, name, transitive)
+
+    def who_uses(self, name: str, transitive: bool = False) -> Set[str]:
+        return self._reachable(self.word_users, name, transitive)
+
+    def retranslate_users(self, name: str) -> List[str]:
+        users = self.who_uses(name, transitive=True) - {name}
+        # Words are kept in definition order, so every word is translated
+        # again after the words it uses
+        retranslated = [word for word in self.user_defined_words if word in users]
+        for word in retranslated:
+            self.user_defined_words[word] = self._translate_word(
+                self.word_definitions[word]
+            )
+        return retranslated
+
+    def _translate_word(self, word: ast.Word) -> List[str]:
+        self.current_words.append(word.name)
+        self.current_uses = set()
+        code = word.ast.evaluate(self)
+        self.current_words.pop()
+
+        uses = frozenset(self.current_uses)
+        old_uses = self.word_uses.get(word.name, frozenset())
+        for used in old_uses - uses:
+            self.word_users[used] -= {word.name}
+        for used in uses - old_uses:
+            self.word_users[used] = self.word_users.get(used, frozenset()) | {word.name}
+        self.word_uses[word.name] = uses
+        self.word_definitions[word.name] = word
+        return code
+
+    @staticmethod
+    def _reachable(
+        edges: Dict[str, FrozenSet[str]], name: str, transitive: bool
+    ) -> Set[str]:
+        if not transitive:
+            return set(edges.get(name, ()))
+
+        reached: Set[str] = set()
+        pending = [name]
+        while pending:
+            for other in edges.get(pending.pop(), ()):
+                if other not in reached:
+                    reached.add(other)
+                    pending.append(other)
+        return reached
+
     def visit_do_loop_statement(self, do_loop: ast.DoLoopStatement) -> List[str]:
         self.loop_depth += 1
         current_loop_counter = self.loop_counter
@@ -234,7 +302,13 @@ class EWVMTranslator(ast.Translator[List[str]]):
             raise ast.TranslationError("'j' is only allowed inside a nested loop")
 
         if value in self.user_defined_words:
-            return self.user_defined_words[value]
+            if not self.current_words:
+                return self.user_defined_words[value]
+            self.current_uses.add(value)
+            return [
+                EWVMInstruction(line, origin_of(line).inlined_into(self.current_words))
+                for line in self.user_defined_words[value]
+            ]
 
         if value in self.predefined_words:
             return self.predefined_words[value]
@@ -254,8 +328,19 @@ class EWVMTranslator(ast.Translator[List[str]]):
     def visit_char_word(self, char_word: ast.CharWord) -> List[str]:
         return [f"pushi {char_word.char_code}"]
 
+    def visit_include(self, include: ast.Include) -> List[str]:
+        raise ast.TranslationError(f"File '{include.path}' was not included")
+
     def visit_ast(self, ast: ast.AbstractSyntaxTree) -> List[str]:
-        return [res for expr in ast.expressions for res in expr.evaluate(self)]
+        code = []
+        for expr in ast.expressions:
+            origin = SourceOrigin(tuple(self.current_words), expr.span)
+            for line in expr.evaluate(self):
+                # Nested expressions were already tagged with a closer origin
+                if origin_of(line) is None:
+                    line = EWVMInstruction(line, origin)
+                code.append(line)
+        return code
 
     def translate(self, ast: ast.AbstractSyntaxTree) -> List[str]:
         code = ast.evaluate(self)
@@ -268,6 +353,8 @@ class EWVMTranslator(ast.Translator[List[str]]):
             code.insert(0, f"pushi 0")
         code.append("stop")
 
+        self.source_map = SourceMap.from_code(code)
+
         return code
 
     def _generate_loop_initialization(self, current_heap_counter: int) -> List[str]:
@@ -338,10 +425,14 @@ class EWVMTranslator(ast.Translator[List[str]]):
     ) -> List[str]:
         for index, line in enumerate(body):
             if line == "i":
-                body[index] = f"pushst {current_heap_counter}\nload 1"
+                body[index] = EWVMInstruction(
+                    f"pushst {current_heap_counter}\nload 1", origin_of(line)
+                )
 
             if line == "j":
-                body[index] = f"pushst {current_heap_counter - 1}\nload 1"
+                body[index] = EWVMInstruction(
+                    f"pushst {current_heap_counter - 1}\nload 1", origin_of(line)
+                )
 
         return body
 
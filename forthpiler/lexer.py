@@ -4,6 +4,7 @@ import ply.lex as lex
 class ForthLex(object):
     def __init__(self):
         self.lexer = None
+        self.print_errors = True
 
     reserved = {
         "if": "IF",
@@ -45,6 +46,8 @@ class ForthLex(object):
         "LITERAL",
         "PRINT_STRING",
         "CHAR_WORD",
+        "INCLUDE",
+        "REQUIRE",
     ] + list(reserved.values())
 
     # Literals are not defined with the built-in `literals` definition
@@ -113,6 +116,12 @@ class ForthLex(object):
         t.value = ord(t.value[len("CHAR ")])
         return t
 
+    def t_INCLUDE(self, t):
+        r"""(?i:INCLUDE|REQUIRE)\s+[^\s]+"""
+        keyword, t.value = t.value.split(maxsplit=1)
+        t.type = keyword.upper()
+        return t
+
     # This is defined as a single rule, in order to avoid conflicts
     # with the operator PLUS
     def t_PLUS_LOOP(self, t):
@@ -143,9 +152,13 @@ class ForthLex(object):
     t_ignore = " \t"
 
     def t_error(self, t):
-        print("Illegal character '%s'" % t.value[0])
+        message = "Illegal character '%s'" % t.value[0]
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
         t.lexer.skip(1)
 
     def build(self, **kwargs):
+        self.errors = []
         self.lexer = lex.lex(module=self, **kwargs)
         return self
@@ -0,0 +1,219 @@
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FunctionType, MethodType, ModuleType
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import forthpiler.syntax as ast
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+# Structures of EWVMTranslator reported on their own, in this order. Strings
+# shared between them are counted in the first one holding them
+TRANSLATOR_STRUCTURES = ("predefined_words", "user_defined_words", "source_map")
+# Smaller allocations are left out of the per-stage lists
+MIN_ALLOCATION = 1024
+
+
+@dataclass
+class StageMemory:
+    name: str
+    # Traced memory once the stage finished, and the highest it got during it
+    current: int
+    peak: int
+    # Source lines that allocated the most during the stage, with the bytes
+    # and blocks they added
+    top: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class Consumer:
+    name: str
+    count: int = 0
+    size: int = 0
+
+
+class MemoryReport:
+    def __init__(self, source_size: int):
+        self.source_size = source_size
+        self.stages: List[StageMemory] = []
+        self.node_classes: Dict[str, Consumer] = {}
+        self.structures: Dict[str, Consumer] = {}
+
+    def format(self, limit: int = 10) -> str:
+        lines = [f"source: {self.source_size / 1e6:.2f} MB", ""]
+        lines.append(f"{'stage':<12} {'retained (MB)':>14} {'peak (MB)':>10}")
+        previous = 0
+        for stage in self.stages:
+            lines.append(
+                f"{stage.name:<12} {(stage.current - previous) / 1e6:>14.2f} "
+                f"{stage.peak / 1e6:>10.2f}"
+            )
+            previous = stage.current
+        lines.append("")
+
+        for title, consumers in (
+            ("syntax node class", self.node_classes),
+            ("data structure", self.structures),
+        ):
+            ranked = sorted(consumers.values(), key=lambda c: c.size, reverse=True)
+            lines.append(f"{title:<30} {'count':>10} {'size (MB)':>10}")
+            for consumer in ranked[:limit]:
+                lines.append(
+                    f"{consumer.name:<30} {consumer.count:>10} "
+                    f"{consumer.size / 1e6:>10.2f}"
+                )
+            lines.append("")
+
+        for stage in self.stages:
+            lines.append(f"top allocations during {stage.name}")
+            for location, size, blocks in stage.top[:limit]:
+                lines.append(f"  {size / 1e6:>8.2f} MB {blocks:>9} blocks  {location}")
+        return "\n".join(lines)
+
+
+def deep_size(obj, seen: Set[int]) -> int:
+    # Size of an object and of everything it holds that was not seen yet
+    if id(obj) in seen or isinstance(obj, (type, ModuleType, FunctionType, MethodType)):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_size(item, seen)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def node_sizes(tree: ast.AbstractSyntaxTree, report: MemoryReport, seen: Set[int]):
+    # Every node is charged for itself, its attributes and its span, while
+    # the nodes below it are charged to their own classes
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        consumer = report.node_classes.setdefault(
+            type(node).__name__, Consumer(type(node).__name__)
+        )
+        consumer.count += 1
+        consumer.size += sys.getsizeof(node) + sys.getsizeof(vars(node))
+        seen.add(id(node))
+
+        for value in vars(node).values():
+            if isinstance(value, (ast.Expression, ast.AbstractSyntaxTree)):
+                pending.append(value)
+            elif (
+                isinstance(value, list)
+                and value
+                and isinstance(value[0], ast.Expression)
+            ):
+                consumer.size += sys.getsizeof(value)
+                seen.add(id(value))
+                pending.extend(value)
+            else:
+                consumer.size += deep_size(value, seen)
+
+
+def memory_report(
+    code: str,
+    filename: str = "<input>",
+    standard_lib_words: Sequence[ast.Word] = (),
+    top: int = 10,
+) -> MemoryReport:
+    # The parse tables are built before tracing starts, they are the same
+    # for every input
+    parser = ForthParser(ForthLex().build())
+    report = MemoryReport(len(code.encode()))
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    tracemalloc.start()
+    try:
+        previous = tracemalloc.take_snapshot().filter_traces(ignored)
+
+        def finish(stage: str) -> None:
+            nonlocal previous
+            snapshot = tracemalloc.take_snapshot().filter_traces(ignored)
+            current, peak = tracemalloc.get_traced_memory()
+            stage_memory = StageMemory(stage, current, peak)
+            for difference in snapshot.compare_to(previous, "lineno")[:top]:
+                if difference.size_diff >= MIN_ALLOCATION:
+                    stage_memory.top.append(
+                        (
+                            str(difference.traceback[0]),
+                            difference.size_diff,
+                            difference.count_diff,
+                        )
+                    )
+            report.stages.append(stage_memory)
+            previous = snapshot
+            tracemalloc.reset_peak()
+
+        # The parser pulls tokens lazily, so they are kept here to show what
+        # all the tokens of the input cost at once
+        lexer = ForthLex().build().lexer
+        lexer.input(code)
+        tokens = list(iter(lexer.token, None))
+        finish("lex")
+
+        tree = parser.parse(code, filename)
+        finish("parse")
+
+        translator = EWVMTranslator(list(standard_lib_words))
+        lines = translator.translate(tree) if tree else []
+        finish("translate")
+
+        text = "\n".join(lines)
+        finish("join")
+    finally:
+        tracemalloc.stop()
+
+    seen: Set[int] = set()
+    tokens_size = sys.getsizeof(tokens) + sum(
+        sys.getsizeof(token) + sys.getsizeof(vars(token)) + sys.getsizeof(token.value)
+        for token in tokens
+    )
+    report.structures["tokens"] = Consumer("tokens", len(tokens), tokens_size)
+    if tree:
+        node_sizes(tree, report, seen)
+    for name in TRANSLATOR_STRUCTURES:
+        structure = getattr(translator, name)
+        report.structures[name] = Consumer(
+            name, len(structure), deep_size(structure, seen)
+        )
+    report.structures["code lines"] = Consumer(
+        "code lines", len(lines), deep_size(lines, seen)
+    )
+    report.structures["joined code"] = Consumer("joined code", 1, sys.getsizeof(text))
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler memory",
+        description="Report where memory goes while a Forth program is compiled",
+    )
+    parser.add_argument("source", type=Path)
+    parser.add_argument("--top", type=int, default=10, help="consumers listed")
+    args = parser.parse_args(argv)
+
+    from forthpiler.modules import standard_library
+
+    try:
+        code = args.source.read_text()
+        report = memory_report(code, str(args.source), standard_library(), args.top)
+    except (OSError, UnicodeDecodeError, ast.TranslationError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(report.format(args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
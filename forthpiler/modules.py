@@ -0,0 +1,187 @@
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import forthpiler.syntax as ast
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+
+# Bumped whenever the layout of the serialized modules changes
+MODULE_FORMAT = 1
+STANDARD_LIBRARY_PATH = Path(__file__).parent / "stdlib.fs"
+
+
+class ModuleError(ast.TranslationError):
+    pass
+
+
+@functools.cache
+def parser_version() -> str:
+    # Serialized trees are only valid for the lexer, parser and syntax
+    # classes that produced them
+    digest = hashlib.sha256(str(MODULE_FORMAT).encode())
+    for module in ("lexer.py", "parser.py", "syntax.py"):
+        digest.update((Path(__file__).parent / module).read_bytes())
+    return digest.hexdigest()
+
+
+def default_cache_directory() -> Path:
+    if "FORTHPILER_CACHE_DIR" in os.environ:
+        return Path(os.environ["FORTHPILER_CACHE_DIR"]) / "modules"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "forthpiler" / "modules"
+
+
+def parse_source(
+    parser: ForthParser, code: str, filename: str = "<input>"
+) -> ast.AbstractSyntaxTree:
+    # The parser reports errors by printing them, they are collected
+    # instead so that they end up next to the file that caused them
+    printing = parser.print_errors, parser.lexer.print_errors
+    parser.print_errors = parser.lexer.print_errors = False
+    try:
+        result = parser.parse(code, filename=filename)
+    finally:
+        parser.print_errors, parser.lexer.print_errors = printing
+    errors = parser.lexer.errors + parser.errors
+    if errors or result is None:
+        raise ModuleError("; ".join(errors) or "Syntax error")
+    return result
+
+
+@dataclass(frozen=True)
+class Module:
+    path: Path
+    source_hash: str
+    tree: ast.AbstractSyntaxTree
+
+
+class ModuleCache:
+    # Parsed Forth files, kept in memory and, when a directory is given,
+    # serialized to it under a hash of their contents and of the parser, so
+    # that later compilations load them without lexing or parsing again
+    def __init__(
+        self, directory: Optional[Path] = None, parser: Optional[ForthParser] = None
+    ):
+        self.directory = Path(directory) if directory is not None else None
+        self.parser = parser
+        self.modules: Dict[str, Module] = {}
+        self.parsed = 0
+        self.loaded = 0
+
+    def load(self, path: Path) -> Module:
+        try:
+            content = path.read_bytes()
+        except OSError as e:
+            raise ModuleError(f"Cannot include '{path}': {e.strerror}")
+
+        source_hash = hashlib.sha256(content).hexdigest()
+        # Trees remember the file they come from in their spans
+        key = f"{parser_version()}:{path}:{source_hash}"
+        key = hashlib.sha256(key.encode()).hexdigest()
+        module = self.modules.get(key)
+        if module is not None:
+            return module
+
+        tree = self._read(key)
+        if tree is None:
+            tree = self._parse(content, path)
+            self._write(key, tree)
+        else:
+            self.loaded += 1
+
+        module = Module(path, source_hash, tree)
+        self.modules[key] = module
+        return module
+
+    def _parse(self, content: bytes, path: Path) -> ast.AbstractSyntaxTree:
+        if self.parser is None:
+            self.parser = ForthParser(ForthLex().build())
+        self.parsed += 1
+        try:
+            code = content.decode()
+        except UnicodeDecodeError as e:
+            raise ModuleError(f"Cannot include '{path}': {e}")
+        return parse_source(self.parser, code, filename=str(path))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.module"
+
+    def _read(self, key: str) -> Optional[ast.AbstractSyntaxTree]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as file:
+                artifact = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+        if artifact.get("format") != MODULE_FORMAT:
+            return None
+        return artifact["tree"]
+
+    def _write(self, key: str, tree: ast.AbstractSyntaxTree) -> None:
+        if self.directory is None:
+            return
+        artifact = {"format": MODULE_FORMAT, "parser": parser_version(), "tree": tree}
+        temporary = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        # The cache is only an optimization, the tree that was just parsed is
+        # used as is when it cannot be written
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "wb") as file:
+                pickle.dump(artifact, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                temporary.unlink()
+
+
+class IncludeResolver:
+    # Replaces the INCLUDE and REQUIRE expressions at the top level of a
+    # program by the contents of the files they name, relative to the file
+    # that includes them. REQUIRE skips files that were already included.
+    def __init__(self, cache: ModuleCache):
+        self.cache = cache
+        self.included: Set[Path] = set()
+        self.including: List[Path] = []
+        # Hash of the contents of every file that was included
+        self.dependencies: Dict[str, str] = {}
+
+    def resolve(
+        self, tree: ast.AbstractSyntaxTree, directory: Path
+    ) -> ast.AbstractSyntaxTree:
+        if not any(isinstance(expr, ast.Include) for expr in tree.expressions):
+            return tree
+
+        expressions = []
+        for expr in tree.expressions:
+            if not isinstance(expr, ast.Include):
+                expressions.append(expr)
+                continue
+
+            path = (directory / expr.path).resolve()
+            if expr.once and path in self.included:
+                continue
+            if path in self.including:
+                raise ModuleError(f"File '{expr.path}' includes itself")
+
+            module = self.cache.load(path)
+            self.included.add(path)
+            self.dependencies[str(path)] = module.source_hash
+
+            self.including.append(path)
+            expressions.extend(self.resolve(module.tree, path.parent).expressions)
+            self.including.pop()
+
+        return ast.AbstractSyntaxTree(expressions)
+
+
+def standard_library(cache: Optional[ModuleCache] = None) -> List[ast.Word]:
+    module = (cache or ModuleCache()).load(STANDARD_LIBRARY_PATH)
+    return [expr for expr in module.tree.expressions if isinstance(expr, ast.Word)]
@@ -8,6 +8,9 @@ class ForthParser:
         self.lexer = lexer
         self.tokens = lexer.tokens
         self.parser = yacc.yacc(module=self)
+        self.filename = "<input>"
+        self.errors = []
+        self.print_errors = True
 
     def p_ast(self, p):
         """ast : grammar"""
@@ -19,6 +22,7 @@ class ForthParser:
 
     def p_grammar_expression(self, p):
         """grammar : expression grammar"""
+        p[1].span = self._span(p, 1)
         p[0] = [p[1]] + p[2]
 
     def p_expression_number(self, p):
@@ -73,6 +77,14 @@ class ForthParser:
         """expression : CHAR_WORD"""
         p[0] = ast.CharWord(p[1])
 
+    def p_expression_include(self, p):
+        """expression : INCLUDE"""
+        p[0] = ast.Include(p[1])
+
+    def p_expression_require(self, p):
+        """expression : REQUIRE"""
+        p[0] = ast.Include(p[1], once=True)
+
     def p_operator_plus(self, p):
         """operator : PLUS"""
         p[0] = ast.Operator(ast.OperatorType.PLUS)
@@ -177,9 +189,23 @@ class ForthParser:
 
     def p_error(self, p):
         if p:
-            print(f"Syntax error at '{p.value}'")
+            message = f"Syntax error at '{p.value}'"
         else:
-            print("Syntax error at EOF")
-
-    def parse(self, data):
-        return self.parser.parse(data, lexer=self.lexer.lexer)
+            message = "Syntax error at EOF"
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
+
+    def parse(self, data, filename="<input>"):
+        self.filename = filename
+        self.errors = []
+        self.lexer.errors = []
+        self.lexer.lexer.lineno = 1
+        return self.parser.parse(data, lexer=self.lexer.lexer, tracking=True)
+
+    def _span(self, p, n):
+        lexpos, end_lexpos = p.lexspan(n)
+        line_start = p.lexer.lexdata.rfind("\n", 0, lexpos) + 1
+        return ast.Span(
+            self.filename, p.lineno(n), lexpos - line_start + 1, lexpos, end_lexpos
+        )
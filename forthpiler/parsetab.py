@@ -0,0 +1,72 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'AGAIN BEGIN CHAR_WORD COLON CONSTANT_DECLARATION DIVIDE DO ELSE EQUALS FETCH GREATER_THAN GREATER_THAN_OR_EQUAL_TO IF INCLUDE LESS_THAN LESS_THAN_OR_EQUAL_TO LITERAL LOOP MINUS MOD NOT_EQUALS NUMBER PLUS PLUS_LOOP PRINT_STRING REQUIRE SEMI_COLON SLASH_MOD STORE THEN TIMES UNTIL VARIABLE_DECLARATION ZERO_EQUALS ZERO_GREATER_THAN ZERO_GREATER_THAN_OR_EQUAL_TO ZERO_LESS_THAN ZERO_LESS_THAN_OR_EQUAL_TOast : grammargrammar :grammar : expression grammarexpression : NUMBERexpression : operatorexpression : comparison_operatorexpression : wordexpression : if_statementexpression : VARIABLE_DECLARATION LITERALexpression : CONSTANT_DECLARATION LITERALexpression : LITERAL STOREexpression : LITERAL FETCHexpression : loop_statementexpression : LITERALexpression : PRINT_STRINGexpression : CHAR_WORDexpression : INCLUDEexpression : REQUIREoperator : PLUSoperator : MINUSoperator : TIMESoperator : DIVIDEoperator : MODoperator : SLASH_MODcomparison_operator : EQUALScomparison_operator : NOT_EQUALScomparison_operator : LESS_THANcomparison_operator : LESS_THAN_OR_EQUAL_TOcomparison_operator : GREATER_THANcomparison_operator : GREATER_THAN_OR_EQUAL_TOcomparison_operator : ZERO_EQUALScomparison_operator : ZERO_LESS_THANcomparison_operator : ZERO_LESS_THAN_OR_EQUAL_TOcomparison_operator : ZERO_GREATER_THANcomparison_operator : ZERO_GREATER_THAN_OR_EQUAL_TOword : COLON LITERAL ast SEMI_COLONif_statement : IF ast THENif_statement : IF ast ELSE ast THENloop_statement : DO ast LOOPloop_statement : DO ast PLUS_LOOPloop_statement : BEGIN ast UNTILloop_statement : BEGIN ast AGAIN'
+    
+_lr_action_items = {'$end':([0,1,2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,38,39,40,41,42,48,50,51,52,53,54,56,],[-2,0,-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-3,-9,-11,-12,-10,-37,-39,-40,-41,-42,-36,-38,]),'NUMBER':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[4,4,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,4,4,4,-9,-11,-12,-10,4,-37,4,-39,-40,-41,-42,-36,-38,]),'VARIABLE_DECLARATION':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[9,9,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,9,9,9,-9,-11,-12,-10,9,-37,9,-39,-40,-41,-42,-36,-38,]),'CONSTANT_DECLARATION':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[11,11,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,11,11,11,-9,-11,-12,-10,11,-37,11,-39,-40,-41,-42,-36,-38,]),'LITERAL':([0,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[10,10,-4,-5,-6,-7,-8,39,-14,42,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,43,10,10,10,-9,-11,-12,-10,10,-37,10,-39,-40,-41,-42,-36,-38,]),'PRINT_STRING':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[13,13,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,13,13,13,-9,-11,-12,-10,13,-37,13,-39,-40,-41,-42,-36,-38,]),'CHAR_WORD':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[14,14,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,14,14,14,-9,-11,-12,-10,14,-37,14,-39,-40,-41,-42,-36,-38,]),'INCLUDE':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[15,15,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,15,15,15,-9,-11,-12,-10,15,-37,15,-39,-40,-41,-42,-36,-38,]),'REQUIRE':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[16,16,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,16,16,16,-9,-11,-12,-10,16,-37,16,-39,-40,-41,-42,-36,-38,]),'PLUS':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[17,17,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,17,17,17,-9,-11,-12,-10,17,-37,17,-39,-40,-41,-42,-36,-38,]),'MINUS':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[18,18,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,18,18,18,-9,-11,-12,-10,18,-37,18,-39,-40,-41,-42,-36,-38,]),'TIMES':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[19,19,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,19,19,19,-9,-11,-12,-10,19,-37,19,-39,-40,-41,-42,-36,-38,]),'DIVIDE':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[20,20,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,20,20,20,-9,-11,-12,-10,20,-37,20,-39,-40,-41,-42,-36,-38,]),'MOD':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[21,21,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,21,21,21,-9,-11,-12,-10,21,-37,21,-39,-40,-41,-42,-36,-38,]),'SLASH_MOD':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[22,22,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,22,22,22,-9,-11,-12,-10,22,-37,22,-39,-40,-41,-42,-36,-38,]),'EQUALS':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[23,23,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,23,23,23,-9,-11,-12,-10,23,-37,23,-39,-40,-41,-42,-36,-38,]),'NOT_EQUALS':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[24,24,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,24,24,24,-9,-11,-12,-10,24,-37,24,-39,-40,-41,-42,-36,-38,]),'LESS_THAN':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[25,25,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,25,25,25,-9,-11,-12,-10,25,-37,25,-39,-40,-41,-42,-36,-38,]),'LESS_THAN_OR_EQUAL_TO':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[26,26,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,26,26,26,-9,-11,-12,-10,26,-37,26,-39,-40,-41,-42,-36,-38,]),'GREATER_THAN':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[27,27,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,27,27,27,-9,-11,-12,-10,27,-37,27,-39,-40,-41,-42,-36,-38,]),'GREATER_THAN_OR_EQUAL_TO':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[28,28,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,28,28,28,-9,-11,-12,-10,28,-37,28,-39,-40,-41,-42,-36,-38,]),'ZERO_EQUALS':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[29,29,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,29,29,29,-9,-11,-12,-10,29,-37,29,-39,-40,-41,-42,-36,-38,]),'ZERO_LESS_THAN':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[30,30,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,30,30,30,-9,-11,-12,-10,30,-37,30,-39,-40,-41,-42,-36,-38,]),'ZERO_LESS_THAN_OR_EQUAL_TO':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[31,31,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,31,31,31,-9,-11,-12,-10,31,-37,31,-39,-40,-41,-42,-36,-38,]),'ZERO_GREATER_THAN':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[32,32,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,32,32,32,-9,-11,-12,-10,32,-37,32,-39,-40,-41,-42,-36,-38,]),'ZERO_GREATER_THAN_OR_EQUAL_TO':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[33,33,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,33,33,33,-9,-11,-12,-10,33,-37,33,-39,-40,-41,-42,-36,-38,]),'COLON':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[34,34,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,34,34,34,-9,-11,-12,-10,34,-37,34,-39,-40,-41,-42,-36,-38,]),'IF':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[35,35,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,35,35,35,-9,-11,-12,-10,35,-37,35,-39,-40,-41,-42,-36,-38,]),'DO':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[36,36,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,36,36,36,-9,-11,-12,-10,36,-37,36,-39,-40,-41,-42,-36,-38,]),'BEGIN':([0,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,36,37,39,40,41,42,43,48,49,50,51,52,53,54,56,],[37,37,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,37,37,37,-9,-11,-12,-10,37,-37,37,-39,-40,-41,-42,-36,-38,]),'THEN':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,38,39,40,41,42,44,48,49,50,51,52,53,54,55,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,48,-37,-2,-39,-40,-41,-42,-36,56,-38,]),'ELSE':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,35,38,39,40,41,42,44,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,49,-37,-39,-40,-41,-42,-36,-38,]),'LOOP':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,36,38,39,40,41,42,45,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,50,-37,-39,-40,-41,-42,-36,-38,]),'PLUS_LOOP':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,36,38,39,40,41,42,45,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,51,-37,-39,-40,-41,-42,-36,-38,]),'UNTIL':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,37,38,39,40,41,42,46,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,52,-37,-39,-40,-41,-42,-36,-38,]),'AGAIN':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,37,38,39,40,41,42,46,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-2,-3,-9,-11,-12,-10,53,-37,-39,-40,-41,-42,-36,-38,]),'SEMI_COLON':([2,3,4,5,6,7,8,10,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,38,39,40,41,42,43,47,48,50,51,52,53,54,56,],[-1,-2,-4,-5,-6,-7,-8,-14,-13,-15,-16,-17,-18,-19,-20,-21,-22,-23,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-3,-9,-11,-12,-10,-2,54,-37,-39,-40,-41,-42,-36,-38,]),'STORE':([10,],[40,]),'FETCH':([10,],[41,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'ast':([0,35,36,37,43,49,],[1,44,45,46,47,55,]),'grammar':([0,3,35,36,37,43,49,],[2,38,2,2,2,2,2,]),'expression':([0,3,35,36,37,43,49,],[3,3,3,3,3,3,3,]),'operator':([0,3,35,36,37,43,49,],[5,5,5,5,5,5,5,]),'comparison_operator':([0,3,35,36,37,43,49,],[6,6,6,6,6,6,6,]),'word':([0,3,35,36,37,43,49,],[7,7,7,7,7,7,7,]),'if_statement':([0,3,35,36,37,43,49,],[8,8,8,8,8,8,8,]),'loop_statement':([0,3,35,36,37,43,49,],[12,12,12,12,12,12,12,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> ast","S'",1,None,None,None),
+  ('ast -> grammar','ast',1,'p_ast','parser.py',15),
+  ('grammar -> <empty>','grammar',0,'p_grammar_empty','parser.py',19),
+  ('grammar -> expression grammar','grammar',2,'p_grammar_expression','parser.py',23),
+  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',28),
+  ('expression -> operator','expression',1,'p_expression_operator','parser.py',32),
+  ('expression -> comparison_operator','expression',1,'p_expression_comparison_operator','parser.py',36),
+  ('expression -> word','expression',1,'p_expression_word','parser.py',40),
+  ('expression -> if_statement','expression',1,'p_expression_if_statement','parser.py',44),
+  ('expression -> VARIABLE_DECLARATION LITERAL','expression',2,'p_expression_variable_declaration','parser.py',48),
+  ('expression -> CONSTANT_DECLARATION LITERAL','expression',2,'p_expression_constant_declaration','parser.py',52),
+  ('expression -> LITERAL STORE','expression',2,'p_expression_store','parser.py',56),
+  ('expression -> LITERAL FETCH','expression',2,'p_expression_fetch','parser.py',60),
+  ('expression -> loop_statement','expression',1,'p_expression_loop_statement','parser.py',64),
+  ('expression -> LITERAL','expression',1,'p_expression_literal','parser.py',68),
+  ('expression -> PRINT_STRING','expression',1,'p_expression_print_string','parser.py',72),
+  ('expression -> CHAR_WORD','expression',1,'p_expression_char_function','parser.py',76),
+  ('expression -> INCLUDE','expression',1,'p_expression_include','parser.py',80),
+  ('expression -> REQUIRE','expression',1,'p_expression_require','parser.py',84),
+  ('operator -> PLUS','operator',1,'p_operator_plus','parser.py',88),
+  ('operator -> MINUS','operator',1,'p_operator_minus','parser.py',92),
+  ('operator -> TIMES','operator',1,'p_operator_times','parser.py',96),
+  ('operator -> DIVIDE','operator',1,'p_operator_divide','parser.py',100),
+  ('operator -> MOD','operator',1,'p_operator_mod','parser.py',104),
+  ('operator -> SLASH_MOD','operator',1,'p_operator_slash_mod','parser.py',108),
+  ('comparison_operator -> EQUALS','comparison_operator',1,'p_comparison_operator_equals','parser.py',112),
+  ('comparison_operator -> NOT_EQUALS','comparison_operator',1,'p_comparison_operator_not_equals','parser.py',116),
+  ('comparison_operator -> LESS_THAN','comparison_operator',1,'p_comparison_operator_less_than','parser.py',120),
+  ('comparison_operator -> LESS_THAN_OR_EQUAL_TO','comparison_operator',1,'p_comparison_operator_less_than_or_equal_to','parser.py',124),
+  ('comparison_operator -> GREATER_THAN','comparison_operator',1,'p_comparison_operator_greater_than','parser.py',128),
+  ('comparison_operator -> GREATER_THAN_OR_EQUAL_TO','comparison_operator',1,'p_comparison_operator_greater_than_or_equal_to','parser.py',132),
+  ('comparison_operator -> ZERO_EQUALS','comparison_operator',1,'p_comparison_operator_zero_equals','parser.py',138),
+  ('comparison_operator -> ZERO_LESS_THAN','comparison_operator',1,'p_comparison_operator_zero_less_than','parser.py',142),
+  ('comparison_operator -> ZERO_LESS_THAN_OR_EQUAL_TO','comparison_operator',1,'p_comparison_operator_zero_less_than_or_equal_to','parser.py',146),
+  ('comparison_operator -> ZERO_GREATER_THAN','comparison_operator',1,'p_comparison_operator_zero_greater_than','parser.py',152),
+  ('comparison_operator -> ZERO_GREATER_THAN_OR_EQUAL_TO','comparison_operator',1,'p_comparison_operator_zero_greater_than_or_equal_to','parser.py',156),
+  ('word -> COLON LITERAL ast SEMI_COLON','word',4,'p_word','parser.py',162),
+  ('if_statement -> IF ast THEN','if_statement',3,'p_if_statement_without_else','parser.py',166),
+  ('if_statement -> IF ast ELSE ast THEN','if_statement',5,'p_if_statement_with_else','parser.py',170),
+  ('loop_statement -> DO ast LOOP','loop_statement',3,'p_do_statement_normal','parser.py',174),
+  ('loop_statement -> DO ast PLUS_LOOP','loop_statement',3,'p_do_statement_plus','parser.py',178),
+  ('loop_statement -> BEGIN ast UNTIL','loop_statement',3,'p_begin_until_statement','parser.py',182),
+  ('loop_statement -> BEGIN ast AGAIN','loop_statement',3,'p_begin_again_statement','parser.py',186),
+]
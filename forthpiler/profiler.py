@@ -0,0 +1,229 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import forthpiler.syntax as ast
+from ewvmapi.vm import EWVM, ExecutionLimits, Program
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.session import Session
+from forthpiler.source_map import SourceLocation, SourceMap
+
+MAIN = "<main>"
+PROFILE_LIMITS = ExecutionLimits(max_steps=50_000_000)
+
+
+@dataclass
+class ProfileEntry:
+    name: str
+    count: int = 0
+    time_ns: int = 0
+
+
+class ProfileReport:
+    def __init__(
+        self,
+        output: str,
+        program: Program,
+        source_map: SourceMap,
+        counts: List[int],
+        times: List[int],
+    ):
+        self.output = output
+        self.by_word: Dict[str, ProfileEntry] = {}
+        self.by_line: Dict[Tuple[str, Optional[str], Optional[int]], ProfileEntry] = {}
+        self.by_stack: Dict[Tuple[str, ...], ProfileEntry] = {}
+
+        for instruction, count, time_ns in zip(program.instructions, counts, times):
+            if count == 0:
+                continue
+
+            location = source_map[instruction.line]
+            words = location.words if location else ()
+            word = words[-1] if words else MAIN
+            line = (
+                (word, location.file, location.lineno)
+                if location
+                else (MAIN, None, None)
+            )
+
+            for entry in (
+                self.by_word.setdefault(word, ProfileEntry(word)),
+                self.by_line.setdefault(line, ProfileEntry(self._line_name(location))),
+                self.by_stack.setdefault(
+                    (MAIN, *words), ProfileEntry(";".join((MAIN, *words)))
+                ),
+            ):
+                entry.count += count
+                entry.time_ns += time_ns
+
+    @property
+    def total_time_ns(self) -> int:
+        return sum(entry.time_ns for entry in self.by_word.values())
+
+    def format(self, limit: int = 10) -> str:
+        total = self.total_time_ns or 1
+        lines = []
+        for title, entries in (("word", self.by_word), ("line", self.by_line)):
+            ranked = sorted(entries.values(), key=lambda e: e.time_ns, reverse=True)
+            lines.append(f"{title:<30} {'executed':>10} {'time (ms)':>10} {'%':>6}")
+            for entry in ranked[:limit]:
+                lines.append(
+                    f"{entry.name:<30} {entry.count:>10} "
+                    f"{entry.time_ns / 1e6:>10.3f} {100 * entry.time_ns / total:>5.1f}%"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> List[str]:
+        return [
+            f"{entry.name} {entry.time_ns}"
+            for entry in self.by_stack.values()
+            if entry.time_ns > 0
+        ]
+
+    def write_collapsed_stacks(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text("\n".join(self.collapsed_stacks()) + "\n")
+
+    @staticmethod
+    def _line_name(location: Optional[SourceLocation]) -> str:
+        if location is None:
+            return "<generated>"
+        return str(location._replace(column=None))
+
+
+def profile(
+    result: ast.AbstractSyntaxTree,
+    standard_lib_words: List[ast.Word],
+    initial_stack: Sequence[int] = (),
+    limits: ExecutionLimits = ExecutionLimits(),
+) -> ProfileReport:
+    translator = EWVMTranslator(standard_lib_words)
+    program = Program("\n".join(translator.translate(result)))
+
+    vm = EWVM(program, limits, translator.source_map)
+    output = vm.run(initial_stack, profile=True)
+
+    return ProfileReport(
+        output,
+        program,
+        translator.source_map,
+        vm.instruction_counts,
+        vm.instruction_times,
+    )
+
+
+@dataclass
+class TranslationEntry:
+    name: str
+    calls: int = 0
+    time_ns: int = 0
+    instructions: int = 0
+
+
+def emitted_size(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, str) and result:
+        return result.count("\n") + 1
+    return 0
+
+
+class TranslationProfiler(ast.VisitorHook):
+    # Attributes the time spent in every visit and the code it emitted to
+    # the node type visited, without the share of its children. Words get
+    # the time spent translating their definition, and the code they put
+    # in the output every time they are inlined or called
+    def __init__(self):
+        self.by_node_type: Dict[str, TranslationEntry] = {}
+        self.by_word: Dict[str, TranslationEntry] = {}
+        # Start time, time and code of the children of every visit in progress
+        self.stack: List[List[int]] = []
+
+    def enter(self, translator: ast.Translator, method: str, node) -> None:
+        self.stack.append([time.perf_counter_ns(), 0, 0])
+
+    def exit(self, translator: ast.Translator, method: str, node, result) -> None:
+        start, children_time, children_code = self.stack.pop()
+        elapsed = time.perf_counter_ns() - start
+        emitted = emitted_size(result)
+        if self.stack:
+            self.stack[-1][1] += elapsed
+            self.stack[-1][2] += emitted
+
+        name = type(node).__name__
+        entry = self.by_node_type.setdefault(name, TranslationEntry(name))
+        entry.calls += 1
+        entry.time_ns += elapsed - children_time
+        # A word definition keeps the code of its body instead of emitting it
+        entry.instructions += max(0, emitted - children_code)
+
+        if isinstance(node, ast.Word):
+            self._word(node.name).time_ns += elapsed
+        elif isinstance(node, ast.Literal):
+            word = node.content.lower()
+            if word in getattr(translator, "user_defined_words", ()):
+                entry = self._word(word)
+                entry.calls += 1
+                entry.instructions += emitted
+
+    def _word(self, name: str) -> TranslationEntry:
+        return self.by_word.setdefault(name, TranslationEntry(name))
+
+    def format(self, limit: int = 10) -> str:
+        lines = []
+        for title, entries, calls in (
+            ("node type", self.by_node_type, "visits"),
+            ("word", self.by_word, "uses"),
+        ):
+            ranked = sorted(
+                entries.values(),
+                key=lambda e: (e.instructions, e.time_ns),
+                reverse=True,
+            )
+            lines.append(
+                f"{title:<30} {calls:>8} {'time (ms)':>10} {'instructions':>13}"
+            )
+            for entry in ranked[:limit]:
+                lines.append(
+                    f"{entry.name:<30} {entry.calls:>8} "
+                    f"{entry.time_ns / 1e6:>10.3f} {entry.instructions:>13}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+
+def profile_translation(
+    result: ast.AbstractSyntaxTree, standard_lib_words: List[ast.Word]
+) -> TranslationProfiler:
+    translator = EWVMTranslator(standard_lib_words)
+    profiler = TranslationProfiler()
+    translator.add_hook(profiler)
+    translator.translate(result)
+    return profiler
+
+
+def profile_session(
+    session: Session,
+    result: ast.AbstractSyntaxTree,
+    limits: ExecutionLimits = PROFILE_LIMITS,
+) -> Tuple[ProfileReport, TranslationProfiler]:
+    # Profiles an input of a REPL session, which can use the words and
+    # variables of the earlier inputs and keeps what it defines
+    translation = TranslationProfiler()
+    session.translator.add_hook(translation)
+    try:
+        code = session.translate(result)
+    finally:
+        session.translator.remove_hook(translation)
+
+    output = session.execute(code, profile=True, limits=limits)
+    report = ProfileReport(
+        output,
+        session.vm.program,
+        session.translator.source_map,
+        session.vm.instruction_counts,
+        session.vm.instruction_times,
+    )
+    return report, translation
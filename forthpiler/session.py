@@ -0,0 +1,164 @@
+import copy
+import pickle
+from pathlib import Path
+from typing import List, Optional, Set
+
+import forthpiler.syntax as ast
+from ewvmapi.vm import EWVM, ExecutionLimits, ResourceUsage, VMError
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.modules import IncludeResolver, ModuleCache
+from forthpiler.source_map import SourceMap
+
+# Bumped whenever the layout of saved sessions changes
+SESSION_FORMAT = 3
+# Attributes of the VM that survive between inputs
+VM_STATE = ("stack", "structs", "strings", "string_indexes", "heap_cells")
+# Every input runs with these limits, so a runaway input cannot hang the REPL
+SESSION_LIMITS = ExecutionLimits(max_steps=10_000_000, max_output_size=1_000_000)
+
+
+class SessionError(Exception):
+    pass
+
+
+class Session:
+    # Keeps the translator and the VM alive between inputs, so words,
+    # variables and constants defined by one input can be used by the next
+    # ones, and every input is translated and run on its own, continuing from
+    # the state the previous inputs left behind. Words can be redefined, which
+    # also redefines the words using them
+    def __init__(
+        self,
+        standard_lib_words: List[ast.Word],
+        limits: ExecutionLimits = SESSION_LIMITS,
+        modules: Optional[ModuleCache] = None,
+    ):
+        self.translator = EWVMTranslator(standard_lib_words, redefinable=True)
+        self.vm = EWVM("", limits)
+        # Globals come first on the VM stack, before the values of the program
+        self.vm_globals = 0
+        self.inputs = 0
+        self.modules = modules or ModuleCache()
+        # Files included by earlier inputs, which REQUIRE skips, and the ones
+        # included by the input being translated, which only count once it
+        # translates
+        self.included: Set[Path] = set()
+        self.pending_included: Set[Path] = set()
+
+    @property
+    def globals(self) -> int:
+        return self.translator.declared_entities_counter
+
+    def resolve(
+        self, tree: ast.AbstractSyntaxTree, directory: Path = Path(".")
+    ) -> ast.AbstractSyntaxTree:
+        resolver = IncludeResolver(self.modules)
+        resolver.included = set(self.included)
+        tree = resolver.resolve(tree, directory)
+        self.pending_included = resolver.included - self.included
+        return tree
+
+    def translate(self, tree: ast.AbstractSyntaxTree) -> List[str]:
+        # Only the code of the new input; the translator is left untouched
+        # when the input does not translate
+        state = self._translator_state()
+        pending_included, self.pending_included = self.pending_included, set()
+        try:
+            code = tree.evaluate(self.translator) + ["stop"]
+        except (ast.TranslationError, KeyboardInterrupt):
+            self.translator.__dict__.update(state)
+            raise
+
+        self.included |= pending_included
+        self.inputs += 1
+        self.translator.source_map = SourceMap.from_code(code)
+        return code
+
+    def translate_program(self, tree: ast.AbstractSyntaxTree) -> List[str]:
+        # A standalone program for the input, with slots for the globals of
+        # the earlier inputs, that leaves the session as it was
+        translator = copy.copy(self.translator)
+        translator.__dict__.update(self._translator_state())
+        return translator.translate(tree)
+
+    def run(self, tree: ast.AbstractSyntaxTree) -> str:
+        return self.execute(self.translate(tree))
+
+    def execute(
+        self,
+        code: List[str],
+        profile: bool = False,
+        limits: Optional[ExecutionLimits] = None,
+    ) -> str:
+        # Runs code returned by translate() against the retained state, with
+        # the limits of the session unless others are given for this input
+        self._allocate_globals()
+
+        # A failed or interrupted run leaves the stack and the heap as they
+        # were before it
+        state = {name: copy.deepcopy(getattr(self.vm, name)) for name in VM_STATE}
+        self.vm.load("\n".join(code), self.translator.source_map)
+        # The limits apply to every input on its own
+        self.vm.usage = ResourceUsage()
+        self.vm.output_size = 0
+        session_limits = self.vm.limits
+        self.vm.limits = limits or session_limits
+        try:
+            return self.vm.run(profile=profile)
+        except (VMError, KeyboardInterrupt):
+            self.vm.__dict__.update(state)
+            raise
+        finally:
+            self.vm.limits = session_limits
+
+    def save(self, path: Path) -> None:
+        translator = self._translator_state()
+        translator.pop("source_map")
+        snapshot = {
+            "format": SESSION_FORMAT,
+            "translator": translator,
+            "vm": {name: getattr(self.vm, name) for name in VM_STATE},
+            "vm_globals": self.vm_globals,
+            "inputs": self.inputs,
+            "included": self.included,
+        }
+        with open(path, "wb") as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def restore(
+        cls,
+        path: Path,
+        standard_lib_words: List[ast.Word],
+        limits: ExecutionLimits = SESSION_LIMITS,
+        modules: Optional[ModuleCache] = None,
+    ) -> "Session":
+        try:
+            with open(path, "rb") as file:
+                snapshot = pickle.load(file)
+        except (pickle.UnpicklingError, EOFError) as e:
+            raise SessionError(f"'{path}' is not a saved session: {e}")
+        if not isinstance(snapshot, dict) or snapshot.get("format") != SESSION_FORMAT:
+            raise SessionError(f"'{path}' was saved by another version")
+
+        session = cls(standard_lib_words, limits, modules)
+        session.translator.__dict__.update(snapshot["translator"])
+        session.vm.__dict__.update(snapshot["vm"])
+        session.vm_globals = snapshot["vm_globals"]
+        session.inputs = snapshot["inputs"]
+        session.included = snapshot["included"]
+        return session
+
+    def _translator_state(self) -> dict:
+        # Shallow copies are enough, the translator replaces the code and the
+        # dependencies of words instead of changing them
+        return {
+            name: value.copy() if isinstance(value, (dict, list, set)) else value
+            for name, value in self.translator.__dict__.items()
+        }
+
+    def _allocate_globals(self) -> None:
+        new_globals = self.globals - self.vm_globals
+        if new_globals:
+            self.vm.stack[self.vm_globals : self.vm_globals] = [0] * new_globals
+            self.vm_globals = self.globals
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import forthpiler.syntax as ast
+
+SOURCE_MAP_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SourceOrigin:
+    words: Tuple[str, ...]
+    span: Optional[ast.Span]
+
+    def inlined_into(self, words: Sequence[str]) -> SourceOrigin:
+        return SourceOrigin(tuple(words) + self.words, self.span)
+
+
+class EWVMInstruction(str):
+    # A line of EWVM code that remembers the Forth source it was generated
+    # from, while still being usable anywhere a plain string is
+    origin: Optional[SourceOrigin] = None
+
+    def __new__(cls, text: str, origin: Optional[SourceOrigin]):
+        instruction = super().__new__(cls, text)
+        instruction.origin = origin
+        return instruction
+
+    def __reduce__(self):
+        return EWVMInstruction, (str(self), self.origin)
+
+
+def origin_of(line: str) -> Optional[SourceOrigin]:
+    return getattr(line, "origin", None)
+
+
+class SourceLocation(NamedTuple):
+    file: Optional[str]
+    lineno: Optional[int]
+    column: Optional[int]
+    words: Tuple[str, ...]
+
+    @property
+    def word(self) -> Optional[str]:
+        return self.words[-1] if self.words else None
+
+    def __str__(self):
+        position = self.file or "<generated>"
+        if self.lineno is not None:
+            position += f":{self.lineno}"
+        if self.column is not None:
+            position += f":{self.column}"
+        return position if self.word is None else f"{position} (in {self.word})"
+
+
+class SourceMap:
+    # Maps every line of the generated EWVM code to the Forth source it came
+    # from. Files and inlining chains are interned, so each line only costs
+    # four integers, with -1 standing for a missing value.
+    FIELDS = 4
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.word_chains: List[Tuple[str, ...]] = []
+        self.entries = array("i")
+
+        self._file_indexes: Dict[str, int] = {}
+        self._chain_indexes: Dict[Tuple[str, ...], int] = {}
+
+    @staticmethod
+    def from_code(code: List[str]) -> SourceMap:
+        source_map = SourceMap()
+        for line in code:
+            origin = origin_of(line)
+            for _ in line.split("\n"):
+                source_map.append(origin)
+        return source_map
+
+    def append(self, origin: Optional[SourceOrigin]) -> None:
+        if origin is None:
+            self.entries.extend((-1, -1, -1, -1))
+            return
+
+        chain = self._intern(self._chain_indexes, self.word_chains, origin.words)
+        if origin.span is None:
+            self.entries.extend((-1, -1, -1, chain))
+            return
+
+        file = self._intern(self._file_indexes, self.files, origin.span.file)
+        self.entries.extend((file, origin.span.lineno, origin.span.column, chain))
+
+    def __len__(self):
+        return len(self.entries) // self.FIELDS
+
+    def __getitem__(self, line: int) -> Optional[SourceLocation]:
+        start = line * self.FIELDS
+        file, lineno, column, chain = self.entries[start : start + self.FIELDS]
+        if chain == -1:
+            return None
+
+        return SourceLocation(
+            self.files[file] if file != -1 else None,
+            lineno if lineno != -1 else None,
+            column if column != -1 else None,
+            self.word_chains[chain],
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": SOURCE_MAP_VERSION,
+                "files": self.files,
+                "words": [list(chain) for chain in self.word_chains],
+                "mappings": self.entries.tolist(),
+            }
+        )
+
+    @staticmethod
+    def from_json(text: str) -> SourceMap:
+        data = json.loads(text)
+        if data.get("version") != SOURCE_MAP_VERSION:
+            raise ValueError(f"Unsupported source map version {data.get('version')}")
+
+        source_map = SourceMap()
+        source_map.files = data["files"]
+        source_map.word_chains = [tuple(chain) for chain in data["words"]]
+        source_map.entries = array("i", data["mappings"])
+        source_map._file_indexes = {f: i for i, f in enumerate(source_map.files)}
+        source_map._chain_indexes = {c: i for i, c in enumerate(source_map.word_chains)}
+        return source_map
+
+    @staticmethod
+    def _intern(indexes: Dict, values: List, value) -> int:
+        if value not in indexes:
+            indexes[value] = len(values)
+            values.append(value)
+        return indexes[value]
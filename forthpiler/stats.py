@@ -0,0 +1,121 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional
+
+import forthpiler.syntax as ast
+from forthpiler.lexer import ForthLex
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    # Highest memory allocated during one call, over what was allocated
+    # before it started, when memory is measured
+    peak_memory: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def count(self, **counts: int) -> None:
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+
+class Stats:
+    # Per-phase timing, counts and, when asked for, memory. Code paths take
+    # an optional Stats and skip every measurement when it is None
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.phases: Dict[str, PhaseStats] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        entry = self.phases.setdefault(name, PhaseStats(name))
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry.seconds += time.perf_counter() - start
+            entry.calls += 1
+
+    def measure_memory(self, name: str, run_phase: Callable[[], object]) -> None:
+        # Tracing slows everything down, so memory is measured on a separate
+        # run of a phase that was already timed
+        if not self.memory:
+            return
+        entry = self.phases.setdefault(name, PhaseStats(name))
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        try:
+            run_phase()
+            peak = tracemalloc.get_traced_memory()[1] - memory_before
+            entry.peak_memory = max(entry.peak_memory, peak)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+    def merge(self, other: "Stats") -> None:
+        self.memory = self.memory or other.memory
+        for name, phase in other.phases.items():
+            entry = self.phases.setdefault(name, PhaseStats(name))
+            entry.calls += phase.calls
+            entry.seconds += phase.seconds
+            entry.peak_memory = max(entry.peak_memory, phase.peak_memory)
+            entry.count(**phase.counts)
+
+    def format(self) -> str:
+        memory_header = f" {'peak (MB)':>10}" if self.memory else ""
+        lines = [f"{'phase':<10} {'calls':>6} {'time (ms)':>10}{memory_header}  counts"]
+        for phase in self.phases.values():
+            counts = ", ".join(
+                f"{name} {value}" for name, value in phase.counts.items()
+            )
+            memory = f" {phase.peak_memory / 1e6:>10.2f}" if self.memory else ""
+            lines.append(
+                f"{phase.name:<10} {phase.calls:>6} {phase.seconds * 1000:>10.2f}"
+                f"{memory}  {counts}"
+            )
+        return "\n".join(lines)
+
+
+def measured(stats: Optional[Stats], name: str) -> ContextManager[Optional[PhaseStats]]:
+    return nullcontext() if stats is None else stats.phase(name)
+
+
+def count_tokens(lexer: ForthLex, code: str) -> int:
+    # The parser pulls tokens from the lexer as it goes, so tokens are
+    # counted on a separate pass that also times the lexer on its own
+    lexer.lexer.input(code)
+    tokens = 0
+    while lexer.lexer.token():
+        tokens += 1
+    return tokens
+
+
+def count_nodes(tree: ast.AbstractSyntaxTree) -> int:
+    nodes = 1
+    for expression in tree.expressions:
+        nodes += 1
+        for name in ("ast", "body", "if_true", "if_false"):
+            body = getattr(expression, name, None)
+            if body is not None:
+                nodes += count_nodes(body)
+    return nodes
+
+
+def code_counts(code: List[str]) -> Dict[str, int]:
+    instructions = labels = allocations = 0
+    for line in code:
+        for instruction in line.split("\n"):
+            if instruction.endswith(":"):
+                labels += 1
+            else:
+                instructions += 1
+                allocations += instruction.startswith("alloc")
+    return {"instructions": instructions, "labels": labels, "allocations": allocations}
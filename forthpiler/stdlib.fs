@@ -0,0 +1,3 @@
+\ Words available to every program, inlined where they are used
+
+: spaces 0 DO SPACE LOOP ;
@@ -2,12 +2,60 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Generic, List, Optional, TypeVar, override
+from typing import Generic, List, NamedTuple, Optional, TypeVar, override
 
 T = TypeVar("T", bound="Translator")
 
 
+class VisitorHook:
+    # Observes every visit_* call of the translators it was added to. The
+    # result is None when the visit raised
+    def enter(self, translator: Translator, method: str, node) -> None:
+        pass
+
+    def exit(self, translator: Translator, method: str, node, result) -> None:
+        pass
+
+
 class Translator(ABC, Generic[T]):
+    def add_hook(self, hook: VisitorHook) -> None:
+        # Without hooks the visit methods are the plain class methods. The
+        # first hook wraps them on this instance only, so translators that
+        # are not observed pay nothing
+        hooks = self.__dict__.get("visitor_hooks")
+        if hooks is None:
+            hooks = self.visitor_hooks = []
+            for name in dir(type(self)):
+                if name.startswith("visit_"):
+                    setattr(self, name, self._hooked(name, getattr(self, name)))
+        hooks.append(hook)
+
+    def remove_hook(self, hook: VisitorHook) -> None:
+        hooks = self.__dict__.get("visitor_hooks")
+        if hooks is None or hook not in hooks:
+            raise ValueError(f"{hook!r} is not a hook of this translator")
+        hooks.remove(hook)
+        if not hooks:
+            for name in [name for name in self.__dict__ if name.startswith("visit_")]:
+                delattr(self, name)
+            del self.visitor_hooks
+
+    def _hooked(self, method: str, visit):
+        hooks = self.visitor_hooks
+
+        def hooked(node):
+            for hook in hooks:
+                hook.enter(self, method, node)
+            result = None
+            try:
+                result = visit(node)
+                return result
+            finally:
+                for hook in reversed(hooks):
+                    hook.exit(self, method, node, result)
+
+        return hooked
+
     @abstractmethod
     def visit_number(self, number: Number) -> T:
         pass
@@ -76,6 +124,10 @@ class Translator(ABC, Generic[T]):
     def visit_char_word(self, char_word: CharWord) -> T:
         pass
 
+    @abstractmethod
+    def visit_include(self, include: Include) -> T:
+        pass
+
     @abstractmethod
     def visit_ast(self, ast: AbstractSyntaxTree) -> T:
         pass
@@ -89,9 +141,21 @@ class TranslationError(Exception):
     pass
 
 
+class Span(NamedTuple):
+    file: str
+    lineno: int
+    column: int
+    lexpos: int
+    # Position where the last token of the node starts
+    end_lexpos: int
+
+    def __str__(self):
+        return f"{self.file}:{self.lineno}:{self.column}"
+
+
 class Expression(ABC):
     def __init__(self):
-        pass
+        self.span: Optional[Span] = None
 
     @abstractmethod
     def __repr__(self):
@@ -435,9 +499,35 @@ class CharWord(Expression):
         return translator.visit_char_word(self)
 
 
+class Include(Expression):
+    def __init__(self, path: str, once: bool = False):
+        super().__init__()
+        self.path = path
+        # REQUIRE only includes files that were not included before
+        self.once = once
+
+    @override
+    def __repr__(self):
+        return f"Include(path={self.path}, once={self.once})"
+
+    @override
+    def __eq__(self, other):
+        return self.path == other.path and self.once == other.once
+
+    @override
+    def evaluate(self, translator: Translator):
+        return translator.visit_include(self)
+
+
 class AbstractSyntaxTree:
     def __init__(self, expressions: List[Expression]):
         self.expressions = expressions
+        self.span: Optional[Span] = None
+
+        if expressions and expressions[0].span and expressions[-1].span:
+            self.span = expressions[0].span._replace(
+                end_lexpos=expressions[-1].span.end_lexpos
+            )
 
     def __repr__(self):
         expressions_repr = ", ".join([str(expr) for expr in self.expressions])
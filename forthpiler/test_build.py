@@ -0,0 +1,66 @@
+from forthpiler.build import IncrementalBuild
+from forthpiler.compiler import find_sources
+
+
+def write_sources(directory):
+    (directory / "square.fs").write_text(": sq dup * ;\n7 sq .")
+    (directory / "padded.fs").write_text("1 . 2 spaces 2 .")
+    return find_sources([directory])
+
+
+def rebuild(tmp_path, jobs):
+    return IncrementalBuild(tmp_path / "build").run(jobs, workers=1)
+
+
+def test_rebuild_without_changes_does_nothing(tmp_path):
+    jobs = write_sources(tmp_path)
+
+    first = rebuild(tmp_path, jobs)
+    assert len(first.compiled) == 2 and not first.up_to_date
+
+    second = rebuild(tmp_path, jobs)
+    assert not second.results and len(second.up_to_date) == 2
+
+
+def test_rebuild_translates_changed_sources(tmp_path):
+    jobs = write_sources(tmp_path)
+    rebuild(tmp_path, jobs)
+
+    (tmp_path / "square.fs").write_text(": sq dup * ;\n8 sq .")
+    report = rebuild(tmp_path, jobs)
+
+    assert [result.source.name for result in report.compiled] == ["square.fs"]
+    assert report.up_to_date == [tmp_path / "padded.fs"]
+    assert "pushi 8" in (tmp_path / "square.ewvm").read_text()
+
+
+def test_rebuild_follows_library_words(tmp_path):
+    jobs = write_sources(tmp_path)
+    rebuild(tmp_path, jobs)
+
+    build = IncrementalBuild(tmp_path / "build")
+    assert build.entries[str(tmp_path / "padded.fs")].dependencies.keys() == {"spaces"}
+
+    build.library["spaces"] = "changed"
+    report = build.run(jobs, workers=1)
+    assert [result.source.name for result in report.compiled] == ["padded.fs"]
+
+
+def test_rebuild_restores_outputs(tmp_path):
+    jobs = write_sources(tmp_path)
+    rebuild(tmp_path, jobs)
+    expected = (tmp_path / "square.ewvm").read_text()
+
+    (tmp_path / "square.ewvm").unlink()
+    report = rebuild(tmp_path, jobs)
+
+    assert report.restored == [tmp_path / "square.fs"] and not report.results
+    assert (tmp_path / "square.ewvm").read_text() == expected
+
+
+def test_failed_sources_are_retried(tmp_path):
+    jobs = write_sources(tmp_path)
+    (tmp_path / "square.fs").write_text("1 IF")
+
+    assert len(rebuild(tmp_path, jobs).failed) == 1
+    assert len(rebuild(tmp_path, jobs).failed) == 1
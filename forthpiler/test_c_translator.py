@@ -0,0 +1,65 @@
+import shutil
+
+import pytest
+
+from ewvmapi.vm import EWVM
+from forthpiler import c_translator
+from forthpiler.c_translator import CBackend, CBackendError
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.parser import ForthParser
+from forthpiler.syntax import *
+
+lexer = ForthLex().build()
+parser = ForthParser(lexer)
+standard_lib_words = [Word("spaces", parser.parse("0 DO SPACE LOOP"))]
+
+pytestmark = pytest.mark.skipif(shutil.which("cc") is None, reason="no C compiler")
+
+PROGRAMS = [
+    "1 2 + 3 * .",
+    "17 5 /MOD . . -7 2 / . -7 2 MOD .",
+    "1 2 2DUP . . . . 3 4 SWAP . . 5 DUP . . 6 7 DROP .",
+    "1 2 = . 1 2 <> . 1 2 < . 2 2 <= . 3 2 > . 2 2 >= . 0 0= . -1 0< . 1 0> .",
+    "10 0 DO I . LOOP",
+    ": sq dup * ; 3 0 DO 3 0 DO I J * sq . SPACE LOOP CR LOOP",
+    "10 0 DO I . 2 +LOOP 0 10 DO I . -2 +LOOP",
+    "0 BEGIN 1 + DUP . DUP 5 = UNTIL",
+    "3 4 < IF 1 . ELSE 2 . THEN 4 3 < IF 3 . THEN",
+    "variable x 5 x ! x @ x @ * . 220 CONSTANT LIMIT 10 LIMIT + .",
+    '." hello \\ world" 3 spaces CHAR A EMIT CR',
+    '." what??! ??/ ??= ?" CR',
+    """
+    variable steps
+    : collatz BEGIN DUP 2 MOD IF 3 * 1 + ELSE 2 / THEN
+              steps @ 1 + steps ! DUP 1 = UNTIL ;
+    0 steps ! 27 collatz drop steps @ .
+    """,
+]
+
+
+@pytest.mark.parametrize("code", PROGRAMS)
+def test_c_backend_matches_ewvm(code, tmp_path):
+    result = parser.parse(code)
+    expected = EWVM(
+        "\n".join(EWVMTranslator(standard_lib_words).translate(result))
+    ).run()
+
+    assert CBackend(standard_lib_words, cache_dir=tmp_path).run(result) == expected
+
+
+def test_c_backend_caches_builds(tmp_path, monkeypatch):
+    backend = CBackend(standard_lib_words, cache_dir=tmp_path)
+    executable = backend.build(parser.parse("1 2 + ."))
+
+    assert backend.build(parser.parse("1  2 +  .")) == executable
+    assert backend.build(parser.parse("1 3 + .")) != executable
+
+    # Changes to the generated C invalidate the cached builds
+    monkeypatch.setattr(c_translator, "C_RUNTIME", c_translator.C_RUNTIME + "\n")
+    assert backend.build(parser.parse("1 2 + .")) != executable
+
+
+def test_c_backend_runtime_error(tmp_path):
+    with pytest.raises(CBackendError, match="Stack underflow"):
+        CBackend(standard_lib_words, cache_dir=tmp_path).run(parser.parse("1 + ."))
@@ -0,0 +1,72 @@
+from ewvmapi.vm import EWVM
+from forthpiler.compiler import compile_files, find_sources, main
+
+
+def write_sources(directory):
+    (directory / "nested").mkdir()
+    (directory / "square.fs").write_text(": sq dup * ;\n7 sq .")
+    (directory / "nested" / "loop.fs").write_text("3 0 DO I . LOOP 2 spaces")
+    (directory / "notes.txt").write_text("not forth")
+
+
+def test_find_sources_keeps_layout(tmp_path):
+    write_sources(tmp_path)
+    jobs = find_sources([tmp_path], tmp_path / "out")
+
+    assert jobs == [
+        (tmp_path / "nested" / "loop.fs", tmp_path / "out" / "nested" / "loop.ewvm"),
+        (tmp_path / "square.fs", tmp_path / "out" / "square.ewvm"),
+    ]
+    assert find_sources([tmp_path / "square.fs"]) == [
+        (tmp_path / "square.fs", tmp_path / "square.ewvm")
+    ]
+
+
+def test_compile_files_in_parallel(tmp_path):
+    write_sources(tmp_path)
+    results = list(compile_files(find_sources([tmp_path]), workers=2))
+
+    assert all(result.ok for result in results)
+    assert EWVM((tmp_path / "square.ewvm").read_text()).run() == "49"
+    assert EWVM((tmp_path / "nested" / "loop.ewvm").read_text()).run() == "012  "
+
+
+def test_compile_reports_failures(tmp_path, capsys):
+    write_sources(tmp_path)
+    (tmp_path / "broken.fs").write_text("1 IF")
+    (tmp_path / "undefined.fs").write_text("1 x !")
+
+    assert main([str(tmp_path), "-j", "1", "-q", "--no-module-cache"]) == 1
+
+    out, err = capsys.readouterr()
+    assert "2 compiled, 2 failed" in out
+    assert "broken.fs: Syntax error at EOF" in err
+    assert "undefined.fs: Variable 'x' not declared" in err
+    assert not (tmp_path / "broken.ewvm").exists()
+
+
+def test_compile_reports_phase_stats(tmp_path, capsys):
+    write_sources(tmp_path)
+    results = list(compile_files(find_sources([tmp_path]), workers=2, stats=True))
+
+    square = next(r for r in results if r.source.name == "square.fs").stats
+    assert list(square.phases) == ["lex", "parse", "translate"]
+    assert square.phases["lex"].counts == {"tokens": 8}
+    assert square.phases["parse"].counts["nodes"] == 8
+    assert square.phases["translate"].counts["allocations"] == 0
+    assert all(r.stats.phases["translate"].calls == 1 for r in results)
+
+    assert square.phases["translate"].peak_memory == 0
+
+    assert main([str(tmp_path), "-q", "--stats", "--no-module-cache"]) == 0
+    report = capsys.readouterr().out
+    assert "translate       2" in report
+    assert "allocations 2" in report
+    assert "peak (MB)" not in report
+
+    assert main([str(tmp_path), "-q", "--stats-memory", "--no-module-cache"]) == 0
+    assert "peak (MB)" in capsys.readouterr().out
+    results = compile_files(find_sources([tmp_path]), 1, stats=True, stats_memory=True)
+    assert all(r.stats.phases["translate"].peak_memory > 0 for r in results)
+
+    assert all(r.stats is None for r in compile_files(find_sources([tmp_path])))
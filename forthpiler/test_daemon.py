@@ -0,0 +1,75 @@
+import socket
+import threading
+
+import pytest
+
+import forthpiler.daemon
+from forthpiler.client import CompileClient, CompileClientError
+from forthpiler.daemon import CompileServer, CompileServerError
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    server = CompileServer(tmp_path / "forthpiler.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_daemon_translates_and_runs(daemon):
+    with CompileClient(daemon.path) as client:
+        assert "writei" in client.translate("1 .")
+        assert client.run(": sq dup * ; 7 sq . 2 spaces") == "49  "
+        assert client.request("ping")["requests"] == 2
+
+
+def test_daemon_runs_without_the_lock(daemon, monkeypatch):
+    class EWVM:
+        def __init__(self, code, limits):
+            pass
+
+        def run(self):
+            return "locked" if daemon.lock.locked() else "unlocked"
+
+    monkeypatch.setattr(forthpiler.daemon, "EWVM", EWVM)
+    with CompileClient(daemon.path) as client:
+        assert client.run("1 .") == "unlocked"
+
+
+def test_daemon_compiles_files(daemon, tmp_path):
+    (tmp_path / "lib.fs").write_text(": answer 42 ;")
+    (tmp_path / "main.fs").write_text("INCLUDE lib.fs answer .")
+
+    with CompileClient(daemon.path) as client:
+        response = client.compile(tmp_path / "main.fs", tmp_path / "main.ewvm")
+        assert response["ok"] and (tmp_path / "main.ewvm").exists()
+        assert client.run("INCLUDE lib.fs answer .", directory=tmp_path) == "42"
+
+
+def test_daemon_reports_errors(daemon):
+    with CompileClient(daemon.path) as client:
+        with pytest.raises(CompileClientError, match="Syntax error"):
+            client.translate("1 IF")
+        with pytest.raises(CompileClientError, match="not found"):
+            client.run("undefined")
+        assert client.request("frobnicate")["error"] == "Unknown operation 'frobnicate'"
+        assert "Bad request" in client.request("translate")["error"]
+
+
+def test_client_without_daemon(tmp_path):
+    with pytest.raises(CompileClientError, match="not running"):
+        CompileClient(tmp_path / "missing.sock")
+
+
+def test_daemon_socket_in_use(daemon, tmp_path):
+    with pytest.raises(CompileServerError, match="already listening"):
+        CompileServer(daemon.path)
+
+    # The socket file of a daemon that died is replaced
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:
+        dead.bind(str(stale))
+    server = CompileServer(stale)
+    server.server_close()
@@ -1,3 +1,7 @@
+import io
+
+import pytest
+
 from forthpiler.lexer import ForthLex
 from forthpiler.parser import ForthParser
 from forthpiler.syntax import *
@@ -414,3 +418,207 @@ def test_char_char():
             CharWord(ord("C")),
         ]
     )
+
+
+def test_spans():
+    code = """1 2 +
+    : square dup *
+      ;
+    square"""
+    result = parser.parse(code, filename="square.fs")
+    word = result.expressions[3]
+
+    assert word.span == Span("square.fs", 2, 5, 10, 31)
+    assert word.ast.span == Span("square.fs", 2, 14, 19, 23)
+    assert str(result.expressions[4].span) == "square.fs:4:5"
+
+
+def test_line_numbers():
+    code = """1 2 +
+    : square dup *
+      ;
+    square"""
+    result = parser.parse(code)
+    assert [e.span.lineno for e in result.expressions] == [1, 1, 1, 2, 4]
+    assert [e.span.lineno for e in result.expressions[3].ast.expressions] == [2, 2]
+
+
+def test_profile_attributes_instructions_to_words():
+    from forthpiler.profiler import profile
+
+    code = """: sq dup * ;
+    : cube dup sq * ;
+    10 0 DO I cube . LOOP"""
+    report = profile(parser.parse(code), [])
+
+    assert report.output == "".join(str(i**3) for i in range(10))
+    assert report.by_word["sq"].count == 10 * 2
+    assert report.by_word["cube"].count == 10 * 2
+    assert ("cube", "<input>", 2) in report.by_line
+    assert any(line.startswith("<main>;cube;sq ") for line in report.collapsed_stacks())
+
+
+def test_profile_session_input():
+    from ewvmapi.vm import ExecutionLimits, ResourceLimitExceeded
+    from forthpiler.profiler import profile_session
+    from forthpiler.session import SESSION_LIMITS, Session
+
+    session = Session([])
+    session.run(parser.parse(": sq dup * ; variable x 4 x !"))
+    report, translation = profile_session(session, parser.parse("x @ sq . : y 1 ;"))
+    assert report.output == "16"
+    assert report.by_word["sq"].count == 2
+    assert "y" in translation.by_word and "y" in session.translator.user_defined_words
+
+    with pytest.raises(ResourceLimitExceeded):
+        profile_session(
+            session, parser.parse("BEGIN 0 UNTIL"), ExecutionLimits(max_steps=1000)
+        )
+    assert session.vm.limits == SESSION_LIMITS
+
+
+def test_source_map():
+    from forthpiler.ewvm_translator import EWVMTranslator
+    from forthpiler.source_map import SourceMap
+
+    code = """: sq dup * ;
+    3 sq ."""
+    translator = EWVMTranslator([])
+    lines = "\n".join(translator.translate(parser.parse(code, "sq.fs"))).split("\n")
+    source_map = SourceMap.from_json(translator.source_map.to_json())
+
+    assert len(source_map) == len(lines)
+    assert lines[1] == "pushi 3" and str(source_map[1]) == "sq.fs:2:5"
+    assert lines[2] == "dup 1" and source_map[2].words == ("sq",)
+    assert str(source_map[3]) == "sq.fs:1:10 (in sq)"
+    assert source_map[0] is None and source_map[len(lines) - 1] is None
+
+
+def test_dot_writer_shares_folds_and_caps():
+    from forthpiler.visualizer import DotWriter
+
+    code = """
+    : a 1 2 3 4 5 6 7 8 + . ;
+    : b 1 if 2 else 3 then ;
+    : c 1 if 2 else 3 then ;
+    """
+    out = io.StringIO()
+    writer = DotWriter(out)
+    writer.translate(parser.parse(code))
+    assert (writer.collapsed, writer.folded, writer.omitted) == (1, 9, 0)
+    assert out.getvalue().count("IfStatement") == 1
+    assert out.getvalue().startswith("// Visualize AST\ndigraph {\n")
+
+    out = io.StringIO()
+    DotWriter(out, max_depth=1).translate(parser.parse(code))
+    assert "IfStatement ..." in out.getvalue()
+
+    out = io.StringIO()
+    writer = DotWriter(out, max_nodes=4)
+    writer.translate(parser.parse(code))
+    assert writer.nodes == 4
+    assert '"2 more subtrees not shown"' in out.getvalue()
+
+
+def test_control_flow_graph_with_execution_counts():
+    from forthpiler.cfg import control_flow_graph
+
+    cfg = control_flow_graph(parser.parse("3 0 do i 1 = if 7 . then loop"), [])
+    by_name = {block.name: block for block in cfg.blocks}
+
+    loop = by_name["startloop0"]
+    assert loop.count == 4
+    assert [cfg.blocks[b].name for b, kind in loop.successors] == [
+        "endloop0",
+        "block2",
+    ]
+    assert by_name["endif0"].count == 3
+    assert cfg.blocks[0].successors == [(loop.index, "next")]
+    assert cfg.error is None
+
+    source = cfg.to_graphviz().source
+    assert "jz endloop0" in source
+    assert 'fillcolor="0.0 1.000 1.0"' in source
+
+
+def test_session_control_flow_graph():
+    from ewvmapi.vm import ExecutionLimits
+    from forthpiler.cfg import session_control_flow_graph
+    from forthpiler.session import Session
+
+    session = Session([])
+    session.run(parser.parse(": sq dup * ;"))
+    cfg = session_control_flow_graph(session, parser.parse("3 sq . : cube 1 ;"))
+    assert cfg.error is None and cfg.blocks[0].count == 1
+    assert "cube" in session.translator.user_defined_words
+
+    limits = ExecutionLimits(max_steps=100)
+    cfg = session_control_flow_graph(session, parser.parse("BEGIN 1 AGAIN"), limits)
+    assert cfg.error is not None and max(b.count for b in cfg.blocks) > 1
+
+
+def test_visitor_hooks():
+    from forthpiler.ewvm_translator import EWVMTranslator
+    from forthpiler.profiler import TranslationProfiler
+
+    class Recorder(VisitorHook):
+        def __init__(self):
+            self.calls = []
+
+        def enter(self, translator, method, node):
+            self.calls.append(("enter", method))
+
+        def exit(self, translator, method, node, result):
+            self.calls.append(("exit", method, list(result)))
+
+    translator = EWVMTranslator([])
+    recorder = Recorder()
+    translator.add_hook(recorder)
+    code = translator.translate(parser.parse("1 ."))
+    assert code == ["start", "pushi 1", "writei", "stop"]
+    assert recorder.calls == [
+        ("enter", "visit_ast"),
+        ("enter", "visit_number"),
+        ("exit", "visit_number", ["pushi 1"]),
+        ("enter", "visit_literal"),
+        ("exit", "visit_literal", ["writei"]),
+        ("exit", "visit_ast", ["pushi 1", "writei"]),
+    ]
+
+    # Translators without hooks run the plain class methods
+    translator.remove_hook(recorder)
+    assert not any(name.startswith("visit") for name in vars(translator))
+    with pytest.raises(ValueError, match="not a hook"):
+        translator.remove_hook(recorder)
+    translator.add_hook(Recorder())
+    with pytest.raises(ValueError, match="not a hook"):
+        translator.remove_hook(recorder)
+
+    profiler = TranslationProfiler()
+    translator = EWVMTranslator([])
+    translator.add_hook(profiler)
+    translator.translate(parser.parse(": sq dup * ; : quad sq sq ; 3 quad ."))
+    sq, quad = profiler.by_word["sq"], profiler.by_word["quad"]
+    assert (sq.calls, sq.instructions) == (2, 4)
+    assert (quad.calls, quad.instructions) == (1, 4)
+    assert profiler.by_node_type["Word"].instructions == 0
+    assert profiler.by_node_type["Literal"].calls == 5
+    assert "quad" in profiler.format()
+
+
+def test_memory_report():
+    from forthpiler.memory import memory_report
+
+    report = memory_report(": sq DUP * ;\n3 sq . 4 sq .")
+    assert [stage.name for stage in report.stages] == [
+        "lex",
+        "parse",
+        "translate",
+        "join",
+    ]
+    assert report.node_classes["Word"].count == 1
+    assert report.node_classes["Number"].count == 2
+    assert report.structures["tokens"].count == 11
+    assert report.structures["user_defined_words"].count == 1
+    assert report.structures["user_defined_words"].size > 0
+    assert "syntax node class" in report.format()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow machines, but below what pulling in requests,
+# graphviz or prompt_toolkit costs
+IMPORT_BUDGET = 0.1
+HEAVY_MODULES = ("prompt_toolkit", "graphviz", "requests", "bs4", "dotenv")
+
+
+def top_level_imports(statement: str) -> dict:
+    # Cumulative import time in seconds of each module imported directly by
+    # the statement, as reported by `python -X importtime`
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith(" ") or name.startswith("  "):
+            continue
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def import_time(module: str) -> float:
+    startup = top_level_imports("pass")
+    return sum(
+        seconds
+        for name, seconds in top_level_imports(f"import {module}").items()
+        if name not in startup
+    )
+
+
+@pytest.mark.parametrize("module", ["forthpiler.parser", "forthpiler.ewvm_translator"])
+def test_import_time(module):
+    assert min(import_time(module) for _ in range(3)) < IMPORT_BUDGET
+
+
+def test_cli_imports_heavy_dependencies_lazily():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, forthpiler.__main__; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
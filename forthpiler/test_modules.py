@@ -0,0 +1,96 @@
+import pytest
+
+from ewvmapi.vm import EWVM
+from forthpiler.build import IncrementalBuild
+from forthpiler.compiler import Compiler, find_sources
+from forthpiler.lexer import ForthLex
+from forthpiler.modules import IncludeResolver, ModuleCache, ModuleError
+from forthpiler.parser import ForthParser
+from forthpiler.syntax import *
+
+lexer = ForthLex().build()
+parser = ForthParser(lexer)
+
+
+def test_parse_include():
+    assert parser.parse("INCLUDE lib/math.fs 1 require ../util.fs") == (
+        AbstractSyntaxTree(
+            [
+                Include("lib/math.fs"),
+                Number(1),
+                Include("../util.fs", once=True),
+            ]
+        )
+    )
+
+
+def test_include_runs_included_code(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "square.fs").write_text("REQUIRE twice.fs : sq dup * ;")
+    (tmp_path / "lib" / "twice.fs").write_text(": twice 2 * ;")
+    code = "REQUIRE lib/square.fs REQUIRE lib/twice.fs 3 sq twice . 1 spaces"
+
+    result = Compiler().translate(code, directory=tmp_path)
+    assert EWVM(result).run() == "18 "
+
+
+def test_include_again_redefines(tmp_path):
+    (tmp_path / "x.fs").write_text(": x 1 ;")
+    with pytest.raises(TranslationError, match="already defined"):
+        Compiler().translate("INCLUDE x.fs INCLUDE x.fs", directory=tmp_path)
+
+
+def test_include_errors(tmp_path, capsys):
+    (tmp_path / "loop.fs").write_text("INCLUDE loop.fs")
+    (tmp_path / "broken.fs").write_text("1 IF")
+    resolver = IncludeResolver(ModuleCache())
+
+    with pytest.raises(ModuleError, match="includes itself"):
+        resolver.resolve(parser.parse("INCLUDE loop.fs"), tmp_path)
+    with pytest.raises(ModuleError, match="Cannot include"):
+        resolver.resolve(parser.parse("INCLUDE missing.fs"), tmp_path)
+    with pytest.raises(ModuleError, match="Syntax error"):
+        resolver.resolve(parser.parse("INCLUDE broken.fs"), tmp_path)
+    # Errors end up in the exception, not on the terminal
+    assert capsys.readouterr().out == ""
+    assert resolver.cache.parser.print_errors
+
+
+def test_module_cache_loads_without_parsing(tmp_path):
+    source = tmp_path / "words.fs"
+    source.write_text(": sq dup * ;")
+
+    first = ModuleCache(tmp_path / "cache")
+    tree = first.load(source).tree
+    assert first.parsed == 1
+
+    second = ModuleCache(tmp_path / "cache")
+    assert second.load(source).tree == tree
+    assert second.parsed == 0 and second.loaded == 1
+
+    source.write_text(": sq dup dup * * ;")
+    assert second.load(source).tree != tree
+    assert second.parsed == 1
+
+
+def test_module_cache_is_best_effort(tmp_path):
+    (tmp_path / "notadir").write_text("")
+    cache = ModuleCache(tmp_path / "notadir" / "cache")
+
+    compiler = Compiler(cache)
+    assert cache.parsed == 1 and compiler.standard_lib_words
+    assert EWVM(compiler.translate("2 3 + .")).run() == "5"
+
+
+def test_rebuild_follows_included_files(tmp_path):
+    (tmp_path / "lib.inc").write_text(": answer 42 ;")
+    (tmp_path / "main.fs").write_text("INCLUDE lib.inc answer .")
+    (tmp_path / "other.fs").write_text("1 .")
+    jobs = find_sources([tmp_path])
+
+    IncrementalBuild(tmp_path / "build").run(jobs, workers=1)
+    (tmp_path / "lib.inc").write_text(": answer 43 ;")
+    report = IncrementalBuild(tmp_path / "build").run(jobs, workers=1)
+
+    assert [result.source.name for result in report.compiled] == ["main.fs"]
+    assert EWVM((tmp_path / "main.ewvm").read_text()).run() == "43"
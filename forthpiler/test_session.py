@@ -0,0 +1,165 @@
+import pytest
+
+from ewvmapi.vm import ExecutionLimits, ResourceLimitExceeded, VMError
+from forthpiler.ewvm_translator import EWVMTranslator
+from forthpiler.lexer import ForthLex
+from forthpiler.modules import standard_library
+from forthpiler.parser import ForthParser
+from forthpiler.session import Session, SessionError
+from forthpiler.warmup import Warmup
+from forthpiler.syntax import *
+
+lexer = ForthLex().build()
+parser = ForthParser(lexer)
+
+
+def run_all(session: Session, *inputs: str) -> list[str]:
+    return [session.run(parser.parse(code)) for code in inputs]
+
+
+def test_session_keeps_definitions_and_variables():
+    session = Session(standard_library())
+    assert run_all(
+        session,
+        ": sq dup * ;",
+        "variable x 3 sq x !",
+        "10 constant ten",
+        "x @ ten + . 2 spaces",
+        "x @ 1 + x ! x @ .",
+    ) == ["", "", "", "19  ", "10"]
+
+
+def test_session_keeps_the_stack_between_inputs():
+    session = Session(standard_library())
+    assert run_all(session, "1 2", "variable x 5 x !", "+ . x @ .") == ["", "", "35"]
+
+
+def test_session_translates_only_the_new_input():
+    session = Session(standard_library())
+    session.translate(parser.parse(": sq dup * ;"))
+    code = session.translate(parser.parse("2 sq ."))
+    assert code == ["pushi 2", "dup 1", "mul", "writei", "stop"]
+
+
+def test_session_rolls_back_failed_inputs():
+    session = Session(standard_library())
+    run_all(session, "variable x 4 x !")
+
+    with pytest.raises(TranslationError):
+        session.run(parser.parse(": bad undefined ; variable y"))
+    with pytest.raises(VMError):
+        session.run(parser.parse("1 x ! 0 0 /"))
+
+    assert run_all(session, ": bad 1 ; x @ . bad .") == ["41"]
+
+
+def test_session_snapshot_round_trip(tmp_path):
+    session = Session(standard_library())
+    run_all(session, ": double 2 * ;", "variable x 21 x !", "7")
+    session.save(tmp_path / "session.pickle")
+
+    restored = Session.restore(tmp_path / "session.pickle", standard_library())
+    assert run_all(restored, "x @ double . .") == ["427"]
+
+    (tmp_path / "bad.pickle").write_bytes(b"not a session")
+    with pytest.raises(SessionError):
+        Session.restore(tmp_path / "bad.pickle", standard_library())
+
+
+def test_session_limits_and_interrupts(monkeypatch):
+    assert Session(standard_library()).vm.limits.max_steps is not None
+
+    session = Session(standard_library(), ExecutionLimits(max_steps=1000))
+    run_all(session, "1 2")
+    with pytest.raises(ResourceLimitExceeded):
+        session.run(parser.parse("BEGIN 1 . AGAIN"))
+
+    def interrupted(*args, **kwargs):
+        session.vm.stack.append(99)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(session.vm, "run", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        session.run(parser.parse("3"))
+    monkeypatch.undo()
+    assert run_all(session, ". .") == ["21"]
+
+
+def test_session_translates_standalone_programs():
+    from ewvmapi.vm import EWVM
+
+    session = Session(standard_library())
+    run_all(session, ": double 2 * ; variable y")
+    code = session.translate_program(parser.parse("variable x 5 x ! x @ double ."))
+
+    assert code[:3] == ["pushi 0", "pushi 0", "start"] and code[-1] == "stop"
+    assert EWVM("\n".join(code)).run() == "10"
+    # The session does not see what was only translated
+    assert "x" not in session.translator.user_declared_variables
+    assert session.translate_program(parser.parse(": w ;")) == [
+        "pushi 0",
+        "start",
+        "stop",
+    ]
+
+
+def test_session_requires_files_once(tmp_path):
+    (tmp_path / "double.fs").write_text(": double 2 * ;")
+    session = Session(standard_library())
+
+    def run_input(code: str) -> str:
+        return session.run(session.resolve(parser.parse(code), tmp_path))
+
+    # An input that does not translate does not count as including the file
+    with pytest.raises(TranslationError):
+        run_input("REQUIRE double.fs 1 missing")
+    assert run_input("REQUIRE double.fs 3 double .") == "6"
+    required = parser.parse("REQUIRE double.fs")
+    assert session.resolve(required, tmp_path).expressions == []
+
+    session.save(tmp_path / "session.pickle")
+    restored = Session.restore(tmp_path / "session.pickle", standard_library())
+    assert restored.resolve(required, tmp_path).expressions == []
+
+
+def test_word_dependency_index():
+    translator = EWVMTranslator([], redefinable=True)
+    translator.translate(
+        parser.parse(": a 1 ; : b a a + ; : c b 2 * ; : d 3 ; : e c d + ;")
+    )
+
+    assert translator.uses("e") == {"c", "d"}
+    assert translator.uses("e", transitive=True) == {"a", "b", "c", "d"}
+    assert translator.who_uses("a") == {"b"}
+    assert translator.who_uses("a", transitive=True) == {"b", "c", "e"}
+    assert translator.retranslate_users("a") == ["b", "c", "e"]
+    assert translator.retranslate_users("d") == ["e"]
+
+
+def test_redefinition_retranslates_users():
+    session = Session(standard_library())
+    run_all(session, ": a 1 ; : b a a + ; : c b . ; : d 7 ;")
+    assert run_all(session, ": a 5 ; c d .") == ["107"]
+
+    # The new body uses a word defined after the old one, which drops the
+    # old dependency
+    assert run_all(session, ": b d ; c a .") == ["75"]
+    assert session.translator.who_uses("a") == set()
+    assert session.translator.who_uses("d") == {"b"}
+
+
+def test_redefinition_is_an_error_when_compiling():
+    with pytest.raises(TranslationError, match="already defined"):
+        EWVMTranslator([]).translate(parser.parse(": a 1 ; : a 2 ;"))
+
+
+def test_warmup_builds_the_session_in_the_background(tmp_path):
+    warmup = Warmup(tmp_path)
+    tree = warmup.parser.parse(": sq dup * ; 3 sq . 1 spaces")
+    assert warmup.session.run(tree) == "9 "
+    assert [word.name for word in warmup.standard_lib_words] == ["spaces"]
+    assert warmup.modules.parser is not warmup.parser
+
+    warmup.session = Session(warmup.standard_lib_words)
+    with pytest.raises(TranslationError):
+        warmup.session.run(warmup.parser.parse("sq"))
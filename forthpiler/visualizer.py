@@ -1,8 +1,18 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, TextIO
+
 import graphviz
 
 from forthpiler import syntax
 from forthpiler.syntax import *
 
+# Straight-line runs at least this long are drawn as a single node
+FOLD_RUN = 8
+FOLDED_EXPRESSIONS = (Number, Operator, ComparisonOperator)
+
 
 class GraphvizTranslator(syntax.Translator[str]):
     def __init__(self):
@@ -83,14 +93,14 @@ class GraphvizTranslator(syntax.Translator[str]):
         return e_id
 
     def visit_variable_declaration(
-            self, variable_declaration: VariableDeclaration
+        self, variable_declaration: VariableDeclaration
     ) -> str:
         e_id = self.get_new_id()
         self.graph.node(e_id, str(variable_declaration), shape="box")
         return e_id
 
     def visit_constant_declaration(
-            self, constant_declaration: ConstantDeclaration
+        self, constant_declaration: ConstantDeclaration
     ) -> str:
         e_id = self.get_new_id()
         self.graph.node(e_id, str(constant_declaration), shape="box")
@@ -121,6 +131,11 @@ class GraphvizTranslator(syntax.Translator[str]):
         self.graph.node(e_id, str(char_word), shape="box")
         return e_id
 
+    def visit_include(self, include: Include) -> str:
+        e_id = self.get_new_id()
+        self.graph.node(e_id, str(include), shape="box")
+        return e_id
+
     def visit_ast(self, ast: AbstractSyntaxTree) -> str:
         e_id = self.get_new_id()
         self.graph.node(e_id, f"AST(len={len(ast.expressions)})")
@@ -133,8 +148,359 @@ class GraphvizTranslator(syntax.Translator[str]):
         return self.visit_ast(ast)
 
 
-def visualize(ast: syntax.AbstractSyntaxTree):
-    translator = GraphvizTranslator()
-    translator.translate(ast)
+class StructuralHash(syntax.Translator[int]):
+    # Numbers every distinct subtree, so that equal subtrees get equal numbers
+    # wherever they appear. Compound nodes are memoized, so hashing a whole
+    # tree visits every node once
+    def __init__(self):
+        self.keys: Dict[tuple, int] = {}
+        self.memo: Dict[int, int] = {}
+
+    def of(self, node) -> int:
+        key = self.memo.get(id(node))
+        if key is None:
+            key = self.memo[id(node)] = node.evaluate(self)
+        return key
+
+    def _key(self, *parts) -> int:
+        return self.keys.setdefault(parts, len(self.keys))
+
+    def _leaf(self, expression: Expression) -> int:
+        return self._key(str(expression))
+
+    def visit_number(self, number: Number) -> int:
+        return self._leaf(number)
+
+    def visit_operator(self, operator: Operator) -> int:
+        return self._leaf(operator)
+
+    def visit_comparison_operator(self, comparison_operator: ComparisonOperator) -> int:
+        return self._leaf(comparison_operator)
+
+    def visit_word(self, word: Word) -> int:
+        return self._key("Word", word.name, self.of(word.ast))
+
+    def visit_do_loop_statement(self, do_loop: DoLoopStatement) -> int:
+        return self._key("DoLoopStatement", self.of(do_loop.body))
+
+    def visit_do_plus_loop_statement(self, do_loop: DoPlusLoopStatement) -> int:
+        return self._key("DoPlusLoopStatement", self.of(do_loop.body))
+
+    def visit_begin_until_statement(self, begin_until_loop: BeginUntilStatement) -> int:
+        return self._key("BeginUntilStatement", self.of(begin_until_loop.body))
+
+    def visit_begin_again_statement(self, begin_again_loop: BeginAgainStatement) -> int:
+        return self._key("BeginAgainStatement", self.of(begin_again_loop.body))
+
+    def visit_if_statement(self, if_statement: IfStatement) -> int:
+        if_false = if_statement.if_false
+        return self._key(
+            "IfStatement",
+            self.of(if_statement.if_true),
+            None if if_false is None else self.of(if_false),
+        )
+
+    def visit_variable_declaration(
+        self, variable_declaration: VariableDeclaration
+    ) -> int:
+        return self._leaf(variable_declaration)
+
+    def visit_constant_declaration(
+        self, constant_declaration: ConstantDeclaration
+    ) -> int:
+        return self._leaf(constant_declaration)
+
+    def visit_store_variable(self, store_variable: StoreVariable) -> int:
+        return self._leaf(store_variable)
+
+    def visit_fetch_variable(self, fetch_variable: FetchVariable) -> int:
+        return self._leaf(fetch_variable)
+
+    def visit_literal(self, literal: Literal) -> int:
+        return self._leaf(literal)
+
+    def visit_print_string(self, print_string: PrintString) -> int:
+        return self._leaf(print_string)
+
+    def visit_char_word(self, char_word: CharWord) -> int:
+        return self._leaf(char_word)
+
+    def visit_include(self, include: Include) -> int:
+        return self._leaf(include)
+
+    def visit_ast(self, ast: AbstractSyntaxTree) -> int:
+        return self._key("AST", *(self.of(expr) for expr in ast.expressions))
+
+    def translate(self, ast: AbstractSyntaxTree) -> int:
+        return self.of(ast)
+
+
+class DotNode(NamedTuple):
+    # None once the node limit was reached and the node was left out
+    id: Optional[str]
+
+
+class DotWriter(syntax.Translator[DotNode]):
+    # Writes the AST as DOT while walking it, instead of building a
+    # graphviz.Digraph. Repeated subtrees are drawn once and shared, long
+    # runs of numbers and operators become one node, bodies hang directly
+    # from the statement owning them, and the depth and the number of nodes
+    # can be capped
+    def __init__(
+        self,
+        out: TextIO,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        fold_run: int = FOLD_RUN,
+    ):
+        self.out = out
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.fold_run = fold_run
+
+        self.hashes = StructuralHash()
+        self.shared: Dict[int, DotNode] = {}
+        self.depth = 0
+        self.nodes = 0
+        self.collapsed = 0
+        self.folded = 0
+        self.omitted = 0
+
+    def _node(self, label: str, shape: Optional[str] = None) -> DotNode:
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.omitted += 1
+            return DotNode(None)
+
+        self.nodes += 1
+        node_id = str(self.nodes)
+        shape_attribute = f" shape={shape}" if shape else ""
+        self.out.write(f"  {node_id} [label={dot_quoted(label)}{shape_attribute}]\n")
+        return DotNode(node_id)
+
+    def _edge(self, parent: DotNode, child: DotNode, label: str = "") -> None:
+        if parent.id is None or child.id is None:
+            return
+        label_attribute = f" [label={dot_quoted(label)}]" if label else ""
+        self.out.write(f"  {parent.id} -> {child.id}{label_attribute}\n")
+
+    def _compound(
+        self, expression: Expression, label: str, bodies: List[tuple]
+    ) -> DotNode:
+        key = self.hashes.of(expression)
+        if key in self.shared:
+            self.collapsed += 1
+            return self.shared[key]
+
+        if self.max_depth is not None and self.depth >= self.max_depth:
+            node = self._node(f"{label} ...")
+        else:
+            node = self._node(label)
+            if node.id is not None:
+                self.depth += 1
+                for edge_label, body in bodies:
+                    for child in self._children(body):
+                        self._edge(node, child, edge_label)
+                self.depth -= 1
+
+        self.shared[key] = node
+        return node
+
+    def _children(self, ast: AbstractSyntaxTree) -> List[DotNode]:
+        children = []
+        run: List[Expression] = []
+        for expression in ast.expressions + [None]:
+            if isinstance(expression, FOLDED_EXPRESSIONS):
+                run.append(expression)
+                continue
+
+            if len(run) >= self.fold_run:
+                self.folded += len(run)
+                shown = " ".join(str(expr) for expr in run[:4])
+                children.append(
+                    self._node(f"{len(run)} numbers and operators\n{shown} ...", "box")
+                )
+            else:
+                children.extend(expr.evaluate(self) for expr in run)
+            run = []
+
+            if expression is not None:
+                children.append(expression.evaluate(self))
+        return children
+
+    def visit_number(self, number: Number) -> DotNode:
+        return self._node(str(number), "box")
+
+    def visit_operator(self, operator: Operator) -> DotNode:
+        return self._node(str(operator), "box")
+
+    def visit_comparison_operator(
+        self, comparison_operator: ComparisonOperator
+    ) -> DotNode:
+        return self._node(str(comparison_operator), "box")
+
+    def visit_word(self, word: Word) -> DotNode:
+        return self._compound(word, f"Word(name={word.name})", [("", word.ast)])
+
+    def visit_do_loop_statement(self, do_loop: DoLoopStatement) -> DotNode:
+        return self._compound(do_loop, "DoLoopStatement", [("", do_loop.body)])
+
+    def visit_do_plus_loop_statement(self, do_loop: DoPlusLoopStatement) -> DotNode:
+        return self._compound(do_loop, "DoPlusLoopStatement", [("", do_loop.body)])
+
+    def visit_begin_until_statement(
+        self, begin_until_loop: BeginUntilStatement
+    ) -> DotNode:
+        return self._compound(
+            begin_until_loop, "BeginUntilStatement", [("", begin_until_loop.body)]
+        )
+
+    def visit_begin_again_statement(
+        self, begin_again_loop: BeginAgainStatement
+    ) -> DotNode:
+        return self._compound(
+            begin_again_loop, "BeginAgainStatement", [("", begin_again_loop.body)]
+        )
+
+    def visit_if_statement(self, if_statement: IfStatement) -> DotNode:
+        bodies = [("true", if_statement.if_true)]
+        if if_statement.if_false is not None:
+            bodies.append(("false", if_statement.if_false))
+        return self._compound(if_statement, "IfStatement", bodies)
+
+    def visit_variable_declaration(
+        self, variable_declaration: VariableDeclaration
+    ) -> DotNode:
+        return self._node(str(variable_declaration), "box")
+
+    def visit_constant_declaration(
+        self, constant_declaration: ConstantDeclaration
+    ) -> DotNode:
+        return self._node(str(constant_declaration), "box")
+
+    def visit_store_variable(self, store_variable: StoreVariable) -> DotNode:
+        return self._node(str(store_variable), "box")
+
+    def visit_fetch_variable(self, fetch_variable: FetchVariable) -> DotNode:
+        return self._node(str(fetch_variable), "box")
+
+    def visit_literal(self, literal: Literal) -> DotNode:
+        return self._node(str(literal), "box")
+
+    def visit_print_string(self, print_string: PrintString) -> DotNode:
+        return self._node(str(print_string), "box")
+
+    def visit_char_word(self, char_word: CharWord) -> DotNode:
+        return self._node(str(char_word), "box")
+
+    def visit_include(self, include: Include) -> DotNode:
+        return self._node(str(include), "box")
+
+    def visit_ast(self, ast: AbstractSyntaxTree) -> DotNode:
+        node = self._node(f"AST(len={len(ast.expressions)})")
+        if node.id is not None:
+            for child in self._children(ast):
+                self._edge(node, child)
+        return node
+
+    def translate(self, ast: AbstractSyntaxTree) -> DotNode:
+        self.out.write("// Visualize AST\ndigraph {\n")
+        root = self.visit_ast(ast)
+        if self.omitted:
+            label = dot_quoted(f"{self.omitted} more subtrees not shown")
+            self.out.write(f"  omitted [label={label} shape=note]\n")
+        self.out.write("}\n")
+        return root
+
+
+def dot_quoted(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def has_display() -> bool:
+    if sys.platform in ("darwin", "win32"):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def write_dot(
+    ast: syntax.AbstractSyntaxTree,
+    path: Path,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    fold_run: int = FOLD_RUN,
+) -> DotWriter:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as out:
+        writer = DotWriter(out, max_depth, max_nodes, fold_run)
+        writer.translate(ast)
+    return writer
+
+
+def visualize(ast: syntax.AbstractSyntaxTree, view: Optional[bool] = None) -> DotWriter:
+    writer = write_dot(ast, Path("visualize/result"))
+    rendered = graphviz.render("dot", "pdf", "visualize/result")
+
+    # Opening a viewer fails without a display, the file is still rendered
+    if has_display() if view is None else view:
+        graphviz.view(rendered)
+    return writer
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m forthpiler visualize",
+        description="Draw the AST of a Forth program, however large",
+    )
+    parser.add_argument("source", type=Path)
+    parser.add_argument(
+        "-o", "--output", type=Path, help="DOT file, next to the source by default"
+    )
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--max-nodes", type=int)
+    parser.add_argument(
+        "--fold",
+        type=int,
+        default=FOLD_RUN,
+        help="shortest run of numbers and operators drawn as one node",
+    )
+    parser.add_argument(
+        "-T", "--format", help="also render the DOT file, e.g. svg or png"
+    )
+    parser.add_argument(
+        "--view", action=argparse.BooleanOptionalAction, help="open the rendered file"
+    )
+    args = parser.parse_args(argv)
+
+    from forthpiler.compiler import Compiler
+
+    try:
+        tree = Compiler().parse(
+            args.source.read_text(), str(args.source), args.source.parent
+        )
+    except (OSError, UnicodeDecodeError, TranslationError) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    output = args.output or args.source.with_suffix(".dot")
+    writer = write_dot(tree, output, args.max_depth, args.max_nodes, args.fold)
+    print(
+        f"{writer.nodes} nodes written to {output}, {writer.collapsed} repeated "
+        f"subtrees shared, {writer.folded} expressions folded, "
+        f"{writer.omitted} subtrees left out"
+    )
+
+    if args.format:
+        try:
+            rendered = graphviz.render("dot", args.format, output)
+        except (graphviz.ExecutableNotFound, graphviz.CalledProcessError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"Rendered {rendered}")
+        if has_display() if args.view is None else args.view:
+            graphviz.view(rendered)
+    return 0
+
 
-    translator.graph.render("visualize/result", view=True)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import forthpiler.syntax as ast
+from forthpiler.lexer import ForthLex
+from forthpiler.modules import ModuleCache, standard_library
+from forthpiler.parser import ForthParser
+from forthpiler.session import Session
+
+
+class Warmup:
+    # Builds what the REPL needs on a background thread, so the prompt shows
+    # up at once and every input only waits for the parts it uses. The parts
+    # are built one after the other, in the order inputs usually need them.
+    def __init__(self, module_cache_dir: Optional[Path] = None):
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="forthpiler-warmup"
+        )
+        self._parser: Future[ForthParser] = executor.submit(self._build_parser)
+        # PLY parsers are not thread safe and the REPL may already parse with
+        # `parser` while the standard library is parsed here, so the module
+        # cache builds a parser of its own
+        self._modules: Future[ModuleCache] = executor.submit(
+            lambda: ModuleCache(module_cache_dir)
+        )
+        self._standard_lib_words: Future[List[ast.Word]] = executor.submit(
+            lambda: standard_library(self.modules)
+        )
+        self._session: Future[Session] = executor.submit(
+            lambda: Session(self.standard_lib_words, modules=self.modules)
+        )
+        executor.shutdown(wait=False)
+
+    @property
+    def parser(self) -> ForthParser:
+        return self._parser.result()
+
+    @property
+    def modules(self) -> ModuleCache:
+        return self._modules.result()
+
+    @property
+    def standard_lib_words(self) -> List[ast.Word]:
+        return self._standard_lib_words.result()
+
+    @property
+    def session(self) -> Session:
+        return self._session.result()
+
+    @session.setter
+    def session(self, session: Session) -> None:
+        self._session = Future()
+        self._session.set_result(session)
+
+    @staticmethod
+    def _build_parser() -> ForthParser:
+        return ForthParser(ForthLex().build())